@@ -13,6 +13,11 @@ fetching part details and a graphical user interface.
 from .api_config import load_ebay_env_config
 from .ebay_item import EBAYHandler, CONDITION_MAP
 from .scrape_open_eper import EPERHandler, CAR_BRANDS_DATA
+from .eper_cache import EPERCache
+from .category_cache import CategoryCache
+from .category_tree import CategoryTree
+from .part_record import PartRecord
+from .fitment import FitmentMatcher
 from .gui import EbayListingApp
 import logging
 
@@ -24,6 +29,11 @@ __all__ = [
     "CONDITION_MAP",         # From ebay_item.py
     "EPERHandler",           # From scrape_open_eper.py
     "CAR_BRANDS_DATA",       # From scrape_open_eper.py
+    "EPERCache",             # From eper_cache.py
+    "CategoryCache",         # From category_cache.py
+    "CategoryTree",          # From category_tree.py
+    "PartRecord",            # From part_record.py
+    "FitmentMatcher",        # From fitment.py
     "EbayListingApp"         # From gui.py
 ]
 
@@ -0,0 +1,300 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+try:
+    import aiohttp
+except ImportError: # Optional dependency: pip install ebay_lister_pkg[async]
+    aiohttp = None
+
+from .clearance import ClearanceJar, get_default_clearance_jar
+from .eper_cache import TRANSIENT_FAILURE
+from .http_archive import ArchivedResponse
+from .scrape_open_eper import EPERHandler, EPER_PART_URL, normalize_part_number
+from .throttle import THROTTLE_STATUS_CODES, retry_after_seconds
+
+DEFAULT_MAX_CONCURRENCY = 20 # Open ePER requests at the same time
+DEFAULT_TIMEOUT = 30 # Seconds per request
+THROTTLE_POLL_INTERVAL = 0.05 # Seconds between checks for a free throttle slot
+DEFAULT_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+class AsyncEPERClient:
+    """
+    asyncio client for ePER lookups of many part numbers at once.
+
+    Thousands of lookups can be in flight as cheap coroutines instead of threads; at most
+    'max_concurrency' requests are open at the same time and every request still takes a
+    token from the shared rate limiter. Pages are parsed with the same extractors as
+    EPERHandler, the replacement chain is merged by the same rules and the same cache is used.
+    Parsing and every blocking call (cache, rate limiter, archive) run in the default
+    thread pool, so a slow or locked cache file does not stall the event loop.
+
+    Unlike cloudscraper, aiohttp does not solve Cloudflare challenges. By default the
+    clearance cookies and user agent that the threaded handlers stored in the ClearanceJar
+    are used; they can also be passed via 'cookies' and 'headers'.
+
+    Requests also hold a slot of the shared AdaptiveThrottle, so the number of open requests
+    shrinks below 'max_concurrency' while ePER answers with 403/429/503 and no request is
+    sent while its circuit breaker is open.
+
+    Usage:
+        async with AsyncEPERClient() as client:
+            async for handler in client.fetch_many(part_numbers):
+                print(handler['title'])
+    """
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, url_template: str = EPER_PART_URL,
+                 headers: Optional[Dict[str, str]] = None, cookies: Optional[Dict[str, str]] = None,
+                 timeout: float = DEFAULT_TIMEOUT, clearance_jar: Optional[ClearanceJar] = None, **handler_options):
+        """
+        Args:
+            max_concurrency (int): Maximum number of open requests.
+            url_template (str): ePER part URL with a '{part_number}' placeholder.
+            headers (Optional[Dict[str, str]]): Extra request headers, merged over DEFAULT_HEADERS.
+            cookies (Optional[Dict[str, str]]): Cookies sent with every request.
+            timeout (float): Seconds per request.
+            clearance_jar (Optional[ClearanceJar]): Source of stored Cloudflare cookies and user agent
+                if 'cookies' is not given. Defaults to the process-wide jar; False disables it.
+            **handler_options: use_cache, cache, graph, archive, page_store, rate_limiter, throttle, parser and
+                max_workers as for EPERHandler.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncEPERClient requires aiohttp (pip install aiohttp).")
+        if max_concurrency < 1:
+            raise ValueError("AsyncEPERClient max_concurrency must be at least 1.")
+        self.max_concurrency = max_concurrency
+        self.url_template = url_template
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.cookies = dict(cookies or {})
+        if clearance_jar is None:
+            clearance_jar = get_default_clearance_jar()
+        stored_clearance = clearance_jar.load() if clearance_jar and cookies is None else None
+        if stored_clearance:
+            # The clearance cookie is only valid together with the user agent that earned it
+            self.cookies = {cookie['name']: cookie['value'] for cookie in stored_clearance['cookies']}
+            self.headers['User-Agent'] = stored_clearance['user_agent']
+        self.timeout = timeout
+        self.handler_options = handler_options
+        # Extraction and aggregation rules are shared with the synchronous handler
+        self._extractor = EPERHandler.__new__(EPERHandler)
+        self._extractor._configure(**handler_options)
+        self._session = None
+        self._semaphore = None
+        self._in_flight = {} # Normalized part number -> page load task
+        self._page_users = {} # Page load task -> number of lookups (memos) using it
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Creates the HTTP session. Called automatically by 'async with'."""
+        if self._session is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._session = aiohttp.ClientSession(
+                headers=self.headers, cookies=self.cookies,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def close(self):
+        """Closes the HTTP session and its connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _fetch_html(self, part_number: str) -> Optional[str]:
+        if self._session is None:
+            raise RuntimeError("AsyncEPERClient is not open; use 'async with AsyncEPERClient() as client'.")
+        url = self.url_template.format(part_number=part_number)
+        archive = self._extractor.archive
+        if archive and archive.replaying:
+            archived = await self._run_blocking(archive.replay, url) # Offline: no request, no rate limiting
+            if archived is None: # Not recorded; says nothing about ePER, so no negative entry
+                logging.warning(f"No recorded ePER response for {part_number} in the archive.")
+                return None
+            if not archived.ok:
+                await self._record_failure(part_number, self._extractor._failure_reason(archived.status_code))
+                return None
+            return archived.text
+        throttle = self._extractor.throttle
+        async with self._semaphore:
+            for attempt in range(throttle.max_retries + 1):
+                await self._acquire_throttle_slot()
+                retry_delay = None
+                try:
+                    delay = await self._run_blocking(self._extractor.rate_limiter.next_delay)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    async with self._session.get(url) as response:
+                        body = await response.read()
+                        encoding = response.get_encoding()
+                        if archive:
+                            await self._run_blocking(archive.record, url, ArchivedResponse(
+                                url, response.status, dict(response.headers), body, encoding))
+                        if response.status in THROTTLE_STATUS_CODES:
+                            throttle.record_throttle(retry_after_seconds(response))
+                        else:
+                            throttle.record_success()
+                        response.raise_for_status()
+                        html = body.decode(encoding, errors='replace')
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    status = getattr(e, 'status', None)
+                    if status not in THROTTLE_STATUS_CODES or attempt == throttle.max_retries:
+                        logging.error(f"Error fetching ePER page for {part_number}: {e}")
+                        await self._record_failure(part_number, self._extractor._failure_reason(status))
+                        return None
+                    retry_delay = throttle.retry_delay(attempt, retry_after_seconds(e))
+                    logging.warning(f"ePER throttled the request for {part_number} (HTTP {status}), "
+                                    f"retrying in {retry_delay:.1f}s ({attempt + 1}/{throttle.max_retries})...")
+                finally:
+                    throttle.release()
+                await asyncio.sleep(retry_delay) # Outside the throttle slot
+        if not html.strip():
+            logging.warning(f"Empty ePER response for {part_number}.")
+            await self._record_failure(part_number, TRANSIENT_FAILURE)
+            return None
+        return html
+
+    @staticmethod
+    async def _run_blocking(function, *args):
+        """Runs a blocking call (SQLite cache, rate limiter file lock, archive) in the default thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def _record_failure(self, part_number: str, reason: str):
+        await self._run_blocking(self._extractor._record_failure, part_number, reason)
+
+    async def _acquire_throttle_slot(self):
+        """Waits without blocking the event loop until the adaptive throttle hands out a slot."""
+        throttle = self._extractor.throttle
+        while not throttle.try_acquire():
+            await asyncio.sleep(max(throttle.breaker_delay(), THROTTLE_POLL_INTERVAL))
+
+    def _parse_and_store(self, part_number: str, html: Optional[str]):
+        if html and self._extractor.page_store:
+            self._extractor.page_store.put(part_number, html)
+        soup = self._extractor._parse_page(html) if html else None
+        return self._extractor._store_page_fields(part_number, soup)
+
+    def _get_cached_or_failure(self, part_number: str):
+        """Returns (cached page fields or None, True if a recent lookup failed)."""
+        cached_fields = self._extractor._get_cached_page_fields(part_number)
+        if cached_fields is not None:
+            return cached_fields, False
+        return None, bool(self._extractor._get_known_failure(part_number))
+
+    async def _load_page_fields(self, part_number: str):
+        cached_fields, known_failure = await self._run_blocking(self._get_cached_or_failure, part_number)
+        if cached_fields is not None:
+            return cached_fields
+        if known_failure:
+            return None
+        html = await self._fetch_html(part_number)
+        return await self._run_blocking(self._parse_and_store, part_number, html)
+
+    async def _get_page_fields(self, part_number: str, page_memo: Dict[str, asyncio.Future]):
+        # One task per page and batch, so parts that share replacements fetch them once.
+        # Concurrent lookups on this client (other batches, single calls) join a page load
+        # that is already in flight for the same normalized part number.
+        # shield() keeps a shared page loading when only one of its waiters is cancelled.
+        if part_number not in page_memo:
+            key = normalize_part_number(part_number)
+            page_task = self._in_flight.get(key)
+            if page_task is None:
+                page_task = self._in_flight[key] = asyncio.ensure_future(self._load_page_fields(part_number))
+                page_task.add_done_callback(lambda _, key=key: self._in_flight.pop(key, None))
+            self._page_users[page_task] = self._page_users.get(page_task, 0) + 1
+            page_memo[part_number] = page_task
+        return await asyncio.shield(page_memo[part_number])
+
+    def _release_pages(self, page_memo: Dict[str, asyncio.Future]):
+        """Drops a lookup's claim on its page loads; loads nobody waits for any more are cancelled."""
+        for page_task in page_memo.values():
+            users = self._page_users.get(page_task, 1) - 1
+            if users > 0:
+                self._page_users[page_task] = users
+            else:
+                self._page_users.pop(page_task, None)
+                page_task.cancel()
+
+    async def get_part_details(self, part_number: str, _page_memo: Optional[Dict[str, asyncio.Future]] = None):
+        """
+        Returns the same part details as EPERHandler(part_number).data.
+
+        Args:
+            part_number (str): The part number to look up.
+
+        Returns:
+            PartRecord: Part details (title, price, weight_kg, fitting_cars, comparison_numbers, ...).
+        """
+        cached_details = await self._run_blocking(self._extractor._get_cached_part_details, part_number)
+        if cached_details is not None:
+            return cached_details
+
+        page_memo = {} if _page_memo is None else _page_memo
+        aggregation = self._extractor._aggregate_part_details(part_number)
+        try:
+            # The aggregation reads the supersession graph and writes the cache, so it
+            # advances in the thread pool as well
+            finished, result = await self._run_blocking(self._advance, aggregation)
+            while not finished:
+                pages = await asyncio.gather(*(self._get_page_fields(num, page_memo) for num in result))
+                finished, result = await self._run_blocking(self._advance, aggregation, list(pages))
+            return result
+        finally:
+            if _page_memo is None:
+                self._release_pages(page_memo)
+
+    @staticmethod
+    def _advance(aggregation, pages=None):
+        """
+        Runs the aggregation generator to its next request. Returns (False, requested part
+        numbers) or (True, part details); StopIteration cannot cross into an asyncio future.
+        """
+        try:
+            return False, next(aggregation) if pages is None else aggregation.send(pages)
+        except StopIteration as finished:
+            return True, finished.value
+
+    async def fetch_many(self, part_numbers: Iterable[str]) -> AsyncIterator[EPERHandler]:
+        """
+        Looks up many part numbers concurrently and yields an EPERHandler per part as soon as
+        its details are complete (completion order, duplicates are looked up once).
+
+        Replacement pages shared between the parts are fetched only once. Leaving the
+        'async for' loop early, or cancelling the consuming task, cancels all lookups that
+        are still running.
+
+        Args:
+            part_numbers (Iterable[str]): The part numbers to look up.
+
+        Yields:
+            EPERHandler: A handler with its data already loaded.
+        """
+        page_memo = {}
+        lookups = {
+            asyncio.ensure_future(self.get_part_details(part_number, page_memo)): part_number
+            for part_number in dict.fromkeys(part_numbers)
+        }
+        pending = set(lookups)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for lookup in done:
+                    part_number = lookups[lookup]
+                    if lookup.exception() is not None:
+                        logging.error(f"Error fetching ePER data for {part_number}: {lookup.exception()}")
+                        continue
+                    yield EPERHandler._from_data(part_number, lookup.result(), **self.handler_options)
+        finally:
+            for lookup in lookups:
+                lookup.cancel()
+            self._release_pages(page_memo)
@@ -0,0 +1,202 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+# Location of the category cache. Like the ePER cache it lives in the working
+# directory unless EBAY_CATEGORY_CACHE_PATH points somewhere else.
+DEFAULT_CATEGORY_CACHE_PATH = 'ebay_categories.sqlite3'
+
+DAY = 24 * 60 * 60
+
+# eBay rarely moves a part into another category, so a category found by a search is
+# kept for a long time. A search without results falls back to the default category
+# ('185012' Sonstige); that answer is only kept briefly, since new listings of other
+# sellers may turn up a real category soon.
+DEFAULT_CATEGORY_TTL = 90 * DAY
+DEFAULT_FALLBACK_TTL = 12 * 60 * 60
+
+
+class CategoryCache:
+    """
+    Persistent cache of eBay category IDs per part number.
+
+    Besides the category found for each part number, the cache keeps the equivalence
+    classes of part numbers that ePER lists as comparison numbers of each other
+    (previous and replacement numbers). A part number without an own entry reuses the
+    category of any other number in its class, so superseded numbers need no new search.
+    Fallback results (no search hits) are stored with a short TTL and are never shared
+    through a class. The cache is safe to share between threads; SQLite's WAL mode lets
+    several processes use the same file.
+    """
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_CATEGORY_TTL,
+                 fallback_ttl: float = DEFAULT_FALLBACK_TTL):
+        """
+        Args:
+            path (Optional[str]): Path to the SQLite file. Defaults to EBAY_CATEGORY_CACHE_PATH
+                                  from the environment or DEFAULT_CATEGORY_CACHE_PATH.
+            ttl (float): Seconds a category found by a search stays valid.
+            fallback_ttl (float): Seconds a fallback result stays valid.
+        """
+        self.path = path or os.getenv('EBAY_CATEGORY_CACHE_PATH', DEFAULT_CATEGORY_CACHE_PATH)
+        self.ttl = ttl
+        self.fallback_ttl = fallback_ttl
+        self._lock = threading.Lock()
+        self._tree = None
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS part_categories ("
+                " part_number TEXT PRIMARY KEY,"
+                " category_id TEXT NOT NULL,"
+                " is_fallback INTEGER NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+            # class_id is the smallest part number of the class
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS part_classes ("
+                " part_number TEXT PRIMARY KEY,"
+                " class_id TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS part_classes_class ON part_classes (class_id)")
+            self._conn.commit()
+
+    @property
+    def tree(self):
+        """The eBay category tree mirror (CategoryTree) stored in the same SQLite file, created on first use."""
+        from .category_tree import CategoryTree # category_tree imports this module
+        with self._lock:
+            if self._tree is None:
+                self._tree = CategoryTree(self.path)
+            return self._tree
+
+    def link(self, part_numbers: Iterable[str]):
+        """Puts the given part numbers (e.g. a part and its comparison numbers) into one class."""
+        numbers = sorted({num for num in part_numbers if num})
+        if len(numbers) < 2:
+            return
+        placeholders = ', '.join('?' for _ in numbers)
+        with self._lock:
+            with self._conn:
+                class_ids = [row[0] for row in self._conn.execute(
+                    f"SELECT DISTINCT class_id FROM part_classes WHERE part_number IN ({placeholders})", numbers
+                )]
+                class_id = min(class_ids + numbers)
+                if class_ids: # Merge the classes the numbers already belong to
+                    self._conn.execute(
+                        f"UPDATE part_classes SET class_id = ? WHERE class_id IN ({', '.join('?' for _ in class_ids)})",
+                        [class_id] + class_ids
+                    )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO part_classes (part_number, class_id) VALUES (?, ?)",
+                    [(num, class_id) for num in numbers]
+                )
+
+    def class_members(self, part_number: str) -> List[str]:
+        """All part numbers in the class of part_number (at least the number itself)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT part_number FROM part_classes WHERE class_id = "
+                "(SELECT class_id FROM part_classes WHERE part_number = ?)", (part_number,)
+            ).fetchall()
+        return sorted({row[0] for row in rows} | {part_number})
+
+    def get(self, part_number: str) -> Optional[str]:
+        """
+        Returns the cached category ID of a part number, or None on a miss.
+
+        An own fresh search result wins; otherwise the most recent fresh search result of
+        the part's class is used. A fresh own fallback entry is returned last, so a class
+        member found since then replaces it.
+        """
+        now = time.time()
+        with self._lock:
+            own = self._conn.execute(
+                "SELECT category_id, is_fallback, fetched_at FROM part_categories WHERE part_number = ?",
+                (part_number,)
+            ).fetchone()
+            if own is not None and not own[1] and now - own[2] <= self.ttl:
+                return own[0]
+            shared = self._conn.execute(
+                "SELECT c.category_id FROM part_categories c JOIN part_classes m ON c.part_number = m.part_number"
+                " WHERE m.class_id = (SELECT class_id FROM part_classes WHERE part_number = ?)"
+                " AND c.is_fallback = 0 AND c.fetched_at >= ? ORDER BY c.fetched_at DESC LIMIT 1",
+                (part_number, now - self.ttl)
+            ).fetchone()
+        if shared is not None:
+            logging.debug(f"Category ID '{shared[0]}' for {part_number} taken from its comparison numbers.")
+            return shared[0]
+        if own is not None and own[1] and now - own[2] <= self.fallback_ttl:
+            return own[0]
+        return None
+
+    def get_many(self, part_numbers: Iterable[str]) -> Dict[str, str]:
+        """Returns {part_number: category_id} for the part numbers with a cached category."""
+        found = {}
+        for part_number in part_numbers:
+            category_id = self.get(part_number)
+            if category_id is not None:
+                found[part_number] = category_id
+        return found
+
+    def set(self, part_number: str, category_id: str, is_fallback: bool = False, fetched_at: Optional[float] = None):
+        """Stores the category found for a part number; is_fallback marks the default category."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO part_categories (part_number, category_id, is_fallback, fetched_at)"
+                " VALUES (?, ?, ?, ?)",
+                (part_number, category_id, int(is_fallback), fetched_at)
+            )
+            self._conn.commit()
+
+    def invalidate(self, part_number: Optional[str] = None, fallbacks_only: bool = False) -> int:
+        """
+        Removes cached categories (the classes are kept). Without arguments all are removed.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        clauses, params = [], []
+        if part_number is not None:
+            clauses.append("part_number = ?")
+            params.append(part_number)
+        if fallbacks_only:
+            clauses.append("is_fallback = 1")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM part_categories{where}", params)
+            self._conn.commit()
+        logging.info(f"Invalidated {cursor.rowcount} cached category ID(s).")
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            if self._tree is not None:
+                self._tree.close()
+            self._conn.close()
+
+
+_default_category_cache = None
+_default_category_cache_lock = threading.Lock()
+
+
+def get_default_category_cache() -> Optional[CategoryCache]:
+    """
+    Returns the process-wide category cache shared by all EBAYHandler instances.
+    If the cache file cannot be opened, caching is disabled and None is returned.
+    """
+    global _default_category_cache
+    with _default_category_cache_lock:
+        if _default_category_cache is None:
+            try:
+                _default_category_cache = CategoryCache()
+            except (sqlite3.Error, OSError) as e:
+                logging.warning(f"eBay category cache unavailable, continuing without cache: {e}")
+                return None
+        return _default_category_cache
@@ -0,0 +1,330 @@
+"""
+Local mirror of the eBay category tree with an offline title -> category index.
+
+The Auto & Motorrad: Teile subtree of eBay.de is downloaded with the Trading API call
+GetCategories and stored next to the category cache. A later sync first asks eBay only
+for the current CategoryVersion and downloads the tree again only if it has changed:
+
+    python -m ebay_lister_fiat_item.category_tree          # Sync if the version changed
+    python -m ebay_lister_fiat_item.category_tree --force  # Download again in any case
+"""
+import argparse
+import logging
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .category_cache import DEFAULT_CATEGORY_CACHE_PATH
+from .ebay_response import as_list
+from .scrape_open_eper import CAR_BRANDS_DATA
+
+EBAY_DE_SITE_ID = '77'
+PARTS_ROOT_CATEGORY_ID = '131090' # Auto & Motorrad: Teile
+
+# Tokens of the parent categories count less than those of the category itself,
+# e.g. "Bremsen" for "Bremsscheiben" below it.
+ANCESTOR_WEIGHT = 0.3
+# Weight of a token that occurs in every one of our listings in a category
+LISTING_WEIGHT = 1.0
+# Matches scoring lower than this are too vague; the caller then falls back to a search
+DEFAULT_MIN_SCORE = 0.5
+# The runner-up may score at most this share below the best match, otherwise the title is ambiguous
+DEFAULT_MIN_MARGIN = 0.25
+
+_TOKEN_PATTERN = re.compile(r'[A-Z0-9]+')
+# 'BELÄGE' and the ASCII spelling 'BELAEGE' both become 'BELAGE'
+_UMLAUTS = str.maketrans({'Ä': 'A', 'Ö': 'O', 'Ü': 'U', 'ß': 'SS'})
+_UMLAUT_SPELLINGS = re.compile(r'([AOU])E')
+_SUFFIXES = ('EN', 'ER', 'E', 'N', 'S') # German plural/inflection endings
+
+
+def _stem(token: str) -> str:
+    for suffix in _SUFFIXES:
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def _words(text) -> List[str]:
+    """Upper-cased, umlaut-folded words of a text, without words containing digits (part numbers, codes)."""
+    if not isinstance(text, str):
+        return []
+    text = unicodedata.normalize('NFKD', text.upper().translate(_UMLAUTS))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = _UMLAUT_SPELLINGS.sub(r'\1', text)
+    return [token for token in _TOKEN_PATTERN.findall(text) if len(token) > 2 and not any(c.isdigit() for c in token)]
+
+
+# Words that say nothing about the kind of part. Brands and models of CAR_BRANDS_DATA are in
+# almost every title of our own listings ("... OEM 1234 FIAT PANDA"), so they would tie every
+# part to the categories we listed most.
+STOPWORDS = frozenset({'UND', 'FUR', 'MIT', 'OHNE', 'DER', 'DIE', 'DAS', 'VON', 'AUTO', 'TEIL', 'TEILE',
+                       'SONSTIGE', 'WEITERE', 'ANDERE', 'KFZ', 'OEM', 'ORIGINAL', 'NEU'}
+                      | {word for brand, models in CAR_BRANDS_DATA.items() for name in (brand, *models)
+                         for word in _words(name)})
+
+
+def tokenize(text) -> List[str]:
+    """Upper-cased, umlaut-folded and roughly stemmed words of a category name or part description."""
+    return [_stem(token) for token in _words(text) if token not in STOPWORDS]
+
+
+def _first(value):
+    values = as_list(value)
+    return values[0] if values else None
+
+
+class CategoryTree:
+    """
+    Local copy of one eBay category subtree plus the titles of our own listings.
+
+    match() maps a part description to a leaf category with a token index: each word
+    scores for the categories whose name (or, weaker, whose parents' names) contains it
+    and for the categories of our own listings that used it, weighted by how rare the word
+    is among all categories. The index is built in memory on first use and again after a
+    sync or new listings. The tables can share the SQLite file of a CategoryCache
+    (see CategoryCache.tree).
+    """
+    def __init__(self, path: Optional[str] = None, site_id: str = EBAY_DE_SITE_ID,
+                 root_category_id: str = PARTS_ROOT_CATEGORY_ID):
+        """
+        Args:
+            path (Optional[str]): Path to the SQLite file. Defaults to EBAY_CATEGORY_CACHE_PATH
+                                  from the environment or DEFAULT_CATEGORY_CACHE_PATH.
+            site_id (str): eBay site of the tree ('77' is eBay.de).
+            root_category_id (str): Root of the mirrored subtree.
+        """
+        self.path = path or os.getenv('EBAY_CATEGORY_CACHE_PATH', DEFAULT_CATEGORY_CACHE_PATH)
+        self.site_id = site_id
+        self.root_category_id = root_category_id
+        self._lock = threading.Lock()
+        self._index = None
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS category_tree_versions ("
+                " site_id TEXT NOT NULL,"
+                " root_id TEXT NOT NULL,"
+                " version TEXT NOT NULL,"
+                " synced_at REAL NOT NULL,"
+                " PRIMARY KEY (site_id, root_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ebay_categories ("
+                " site_id TEXT NOT NULL,"
+                " category_id TEXT NOT NULL,"
+                " parent_id TEXT,"
+                " name TEXT NOT NULL,"
+                " level INTEGER NOT NULL,"
+                " is_leaf INTEGER NOT NULL,"
+                " PRIMARY KEY (site_id, category_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS listing_categories ("
+                " listing_id TEXT PRIMARY KEY,"
+                " title TEXT NOT NULL,"
+                " category_id TEXT NOT NULL,"
+                " recorded_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    @property
+    def version(self) -> Optional[str]:
+        """CategoryVersion of the stored tree, None if it was never downloaded."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM category_tree_versions WHERE site_id = ? AND root_id = ?",
+                (self.site_id, self.root_category_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    def sync(self, api_trading, force: bool = False) -> bool:
+        """
+        Downloads the subtree with GetCategories if eBay reports a new CategoryVersion.
+
+        Args:
+            api_trading: An ebaysdk Trading connection (e.g. EBAYHandler.api_trading).
+            force (bool): Download even if the version is unchanged.
+
+        Returns:
+            bool: True if the tree was downloaded, False if the stored one is current.
+        """
+        base_request = {'CategorySiteID': self.site_id}
+        # Without DetailLevel GetCategories returns only the version, not the categories
+        version = str(api_trading.execute('GetCategories', base_request).dict().get('CategoryVersion') or '')
+        if not force and version and version == self.version:
+            logging.info(f"eBay category tree {self.root_category_id} is current (version {version}).")
+            return False
+
+        response = api_trading.execute('GetCategories', dict(
+            base_request, CategoryParent=self.root_category_id, DetailLevel='ReturnAll', ViewAllNodes='true'
+        )).dict()
+        categories = self._parse_categories(response)
+        if not categories:
+            raise ValueError(f"GetCategories returned no categories below {self.root_category_id}.")
+        version = str(response.get('CategoryVersion') or version)
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM ebay_categories WHERE site_id = ?", (self.site_id,))
+                self._conn.executemany(
+                    "INSERT INTO ebay_categories (site_id, category_id, parent_id, name, level, is_leaf)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [(self.site_id, *category) for category in categories]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO category_tree_versions (site_id, root_id, version, synced_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (self.site_id, self.root_category_id, version, time.time())
+                )
+            self._index = None
+        logging.info(f"Downloaded {len(categories)} eBay categories below {self.root_category_id} (version {version}).")
+        return True
+
+    @staticmethod
+    def _parse_categories(response: Dict) -> List[Tuple[str, Optional[str], str, int, int]]:
+        """(category_id, parent_id, name, level, is_leaf) rows of a GetCategories response dict."""
+        rows = []
+        for category in as_list((response.get('CategoryArray') or {}).get('Category')):
+            category_id = str(category.get('CategoryID'))
+            parent_id = _first(category.get('CategoryParentID'))
+            rows.append((
+                category_id,
+                str(parent_id) if parent_id is not None and str(parent_id) != category_id else None,
+                category.get('CategoryName') or '',
+                int(category.get('CategoryLevel') or 0),
+                int(str(category.get('LeafCategory')).lower() == 'true'),
+            ))
+        return rows
+
+    def add_listing(self, listing_id: str, title: str, category_id: str):
+        """Records one of our own listings; its title words then point to its category."""
+        self.add_listings([(listing_id, title, category_id)])
+
+    def add_listings(self, listings: Iterable[Tuple[str, str, str]]):
+        """Records (listing_id, title, category_id) triples, e.g. from past GetSellerList results."""
+        now = time.time()
+        rows = [(str(listing_id), title, str(category_id), now) for listing_id, title, category_id in listings
+                if listing_id and title and category_id]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO listing_categories (listing_id, title, category_id, recorded_at)"
+                " VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+            self._index = None
+
+    def category(self, category_id: str) -> Optional[Dict]:
+        """The stored category as {'category_id', 'parent_id', 'name', 'level', 'is_leaf'}, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT category_id, parent_id, name, level, is_leaf FROM ebay_categories"
+                " WHERE site_id = ? AND category_id = ?", (self.site_id, category_id)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('category_id', 'parent_id', 'name', 'level', 'is_leaf'), row[:4] + (bool(row[4]),)))
+
+    def _build_index(self) -> Dict[str, Dict[str, float]]:
+        """token -> {leaf category_id: weight}, already multiplied by the token's IDF."""
+        with self._lock:
+            categories = self._conn.execute(
+                "SELECT category_id, parent_id, name, is_leaf FROM ebay_categories WHERE site_id = ?",
+                (self.site_id,)
+            ).fetchall()
+            listings = self._conn.execute("SELECT title, category_id FROM listing_categories").fetchall()
+
+        parents = {category_id: parent_id for category_id, parent_id, _, _ in categories}
+        names = {category_id: name for category_id, _, name, _ in categories}
+        leaves = {category_id for category_id, _, _, is_leaf in categories if is_leaf}
+        weights = defaultdict(dict)
+        for leaf in leaves:
+            ancestor, seen = parents.get(leaf), set()
+            while ancestor and ancestor not in seen:
+                seen.add(ancestor)
+                for token in tokenize(names.get(ancestor)):
+                    weights[token][leaf] = max(weights[token].get(leaf, 0.0), ANCESTOR_WEIGHT)
+                ancestor = parents.get(ancestor)
+            for token in tokenize(names[leaf]):
+                weights[token][leaf] = 1.0
+
+        # Our own listings also count for categories outside the mirrored tree
+        listing_counts = Counter(category_id for _, category_id in listings)
+        token_counts = defaultdict(Counter)
+        for title, category_id in listings:
+            for token in set(tokenize(title)):
+                token_counts[token][category_id] += 1
+        for token, counts in token_counts.items():
+            for category_id, count in counts.items():
+                share = LISTING_WEIGHT * count / listing_counts[category_id]
+                weights[token][category_id] = weights[token].get(category_id, 0.0) + share
+
+        total = max(1, len(leaves | set(listing_counts)))
+        return {
+            token: {category_id: weight * math.log(1 + total / len(by_category))
+                    for category_id, weight in by_category.items()}
+            for token, by_category in weights.items()
+        }
+
+    def scores(self, title: str) -> List[Tuple[str, float]]:
+        """All candidate categories for a title with their scores, best first."""
+        with self._lock:
+            index = self._index
+        if index is None:
+            index = self._build_index()
+            with self._lock:
+                self._index = index
+        totals = Counter()
+        for token in set(tokenize(title)):
+            for category_id, weight in index.get(token, {}).items():
+                totals[category_id] += weight
+        return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+    def match(self, title: str, min_score: float = DEFAULT_MIN_SCORE,
+              min_margin: float = DEFAULT_MIN_MARGIN) -> Optional[str]:
+        """
+        The best category for a part description, or None if no category scores at least
+        min_score or the runner-up comes within min_margin (a share of the best score) of it.
+        """
+        candidates = self.scores(title)
+        if not candidates or candidates[0][1] < min_score:
+            return None
+        category_id, score = candidates[0]
+        if len(candidates) > 1 and candidates[1][1] > score * (1 - min_margin):
+            logging.debug(f"Title '{title}' is ambiguous between categories {category_id} and {candidates[1][0]}.")
+            return None
+        logging.debug(f"Matched title '{title}' to category {category_id} (score {score:.2f}).")
+        return category_id
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Mirror the eBay.de parts category tree locally.")
+    arg_parser.add_argument('--force', action='store_true', help="Download even if the version is unchanged.")
+    arg_parser.add_argument('--dotenv', help="Path to the .env file with the eBay API credentials.")
+    args = arg_parser.parse_args(argv)
+
+    from .ebay_item import EBAYHandler # Needs ebaysdk and API credentials, so imported only here
+    handler = EBAYHandler(dotenv_path=args.dotenv)
+    if handler.category_tree is None:
+        print("The category cache file cannot be opened.")
+        return 1
+    changed = handler.sync_category_tree(force=args.force)
+    print(f"Category tree version {handler.category_tree.version}: {'downloaded' if changed else 'unchanged'}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
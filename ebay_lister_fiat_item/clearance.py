@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_CLEARANCE_PATH = 'eper_clearance.json'
+CLEARANCE_COOKIE = 'cf_clearance'
+# Cloudflare cookies that belong to a solved challenge
+CLOUDFLARE_COOKIE_PREFIXES = ('cf_', '__cf')
+
+
+class ClearanceJar:
+    """
+    Small JSON file that keeps the Cloudflare clearance cookies and the matching user agent
+    of a cloudscraper session across process restarts.
+
+    cloudscraper solves a challenge once per session; the resulting cf_clearance cookie is
+    only accepted together with the user agent that solved it. New sessions created by the
+    ScraperPool load both from the jar, so the first request of a new process does not have
+    to solve the challenge again. The jar is refreshed when a session brings back a new
+    clearance cookie and cleared when ePER answers with a challenge (HTTP 403) again.
+    """
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path (Optional[str]): Path to the JSON file. Defaults to EPER_CLEARANCE_PATH
+                                  from the environment or DEFAULT_CLEARANCE_PATH.
+        """
+        self.path = path or os.getenv('EPER_CLEARANCE_PATH', DEFAULT_CLEARANCE_PATH)
+        self._lock = threading.Lock()
+        self._saved_clearance = None
+
+    def load(self) -> Optional[Dict]:
+        """
+        Returns {'user_agent': str, 'cookies': [...]} if the jar holds a clearance cookie that has
+        not expired yet, otherwise None.
+        """
+        with self._lock:
+            try:
+                with open(self.path, encoding='utf-8') as handle:
+                    state = json.load(handle)
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not read Cloudflare clearance jar {self.path}: {e}")
+                return None
+        cookies = [cookie for cookie in state.get('cookies', []) if not self._expired(cookie)]
+        clearance = [cookie for cookie in cookies if cookie.get('name') == CLEARANCE_COOKIE]
+        if not clearance or not state.get('user_agent'):
+            logging.debug("Stored Cloudflare clearance is missing or expired.")
+            return None
+        self._saved_clearance = clearance[0].get('value')
+        return {'user_agent': state['user_agent'], 'cookies': cookies}
+
+    @staticmethod
+    def _expired(cookie: Dict) -> bool:
+        expires = cookie.get('expires')
+        return expires is not None and expires <= time.time()
+
+    def apply(self, session) -> bool:
+        """Loads the stored clearance into a requests/cloudscraper session. Returns False if there is none."""
+        state = self.load()
+        if state is None:
+            return False
+        session.headers['User-Agent'] = state['user_agent']
+        for cookie in state['cookies']:
+            session.cookies.set(
+                cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path', '/'),
+                expires=cookie.get('expires'), secure=cookie.get('secure', False)
+            )
+        logging.info("Reusing stored Cloudflare clearance for new scraper session.")
+        return True
+
+    @staticmethod
+    def _cloudflare_cookies(session) -> List[Dict]:
+        return [
+            {'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path,
+             'expires': cookie.expires, 'secure': bool(cookie.secure)}
+            for cookie in session.cookies
+            if cookie.name.startswith(CLOUDFLARE_COOKIE_PREFIXES)
+        ]
+
+    def save(self, session) -> bool:
+        """
+        Stores the clearance cookies and user agent of a session if its cf_clearance cookie is
+        new. Returns True if the jar was written.
+        """
+        cookies = self._cloudflare_cookies(session)
+        clearance = next((cookie['value'] for cookie in cookies if cookie['name'] == CLEARANCE_COOKIE), None)
+        if clearance is None or clearance == self._saved_clearance:
+            return False
+        state = {'user_agent': session.headers.get('User-Agent'), 'cookies': cookies, 'saved_at': time.time()}
+        with self._lock:
+            try:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as handle:
+                    json.dump(state, handle)
+                os.replace(temp_path, self.path) # Atomic, other processes never see half a file
+            except OSError as e:
+                logging.warning(f"Could not write Cloudflare clearance jar {self.path}: {e}")
+                return False
+            self._saved_clearance = clearance
+        logging.info("Stored new Cloudflare clearance for later sessions.")
+        return True
+
+    def invalidate(self):
+        """Deletes the stored clearance, e.g. after ePER answered with a challenge again."""
+        with self._lock:
+            self._saved_clearance = None
+            try:
+                os.remove(self.path)
+                logging.info("Stored Cloudflare clearance was rejected and has been removed.")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Could not remove Cloudflare clearance jar {self.path}: {e}")
+
+
+_default_jar = None
+_default_jar_lock = threading.Lock()
+
+
+def get_default_clearance_jar() -> ClearanceJar:
+    """Returns the process-wide clearance jar used by the default ScraperPool."""
+    global _default_jar
+    with _default_jar_lock:
+        if _default_jar is None:
+            _default_jar = ClearanceJar()
+        return _default_jar
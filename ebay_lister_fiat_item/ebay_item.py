@@ -1,9 +1,17 @@
 from .scrape_open_eper import EPERHandler # Assuming this module exists and is correctly implemented
 from .api_config import load_ebay_env_config #
+from .category_cache import get_default_category_cache
+from .ebay_response import as_list
 from ebaysdk.trading import Connection as Trading
 from ebaysdk.finding import Connection as Finding
 import logging
-from typing import Optional, Dict, List
+import re
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Iterable, List, Tuple
 
 CONDITION_MAP = {
     '1000': 'New',
@@ -18,6 +26,75 @@ CONDITION_MAP = {
     '7000': 'For parts or not working'
 }
 
+# Parallel Finding API searches of EBAYHandler.get_category_ids
+DEFAULT_CATEGORY_WORKERS = 4
+
+# AddItems accepts at most 5 items per call
+ADD_ITEMS_BATCH_SIZE = 5
+# How often create_items sends an item again after a system error or a lost answer (not after request errors)
+DEFAULT_ADD_ITEMS_RETRIES = 2
+# ReviseInventoryStatus accepts at most 4 listings per call
+REVISE_INVENTORY_BATCH_SIZE = 4
+# How often revise_inventory_status sends an update again after a system error or a failed call
+DEFAULT_REVISE_RETRIES = 2
+# eBay rejects an Item.UUID it has already listed with this error; it names the existing ItemID
+DUPLICATE_UUID_ERROR_CODE = '488'
+
+
+def _chunks(items: List, size: int) -> List[List]:
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def _item_result(sku: str, item_id: Optional[str], errors: List[Dict]) -> Dict:
+    """Result of one listing in create_items: {'sku', 'item_id', 'ack', 'errors'}."""
+    if not item_id or any(error.get('SeverityCode') == 'Error' for error in errors):
+        ack = 'Failure'
+    else:
+        ack = 'Warning' if errors else 'Success'
+    return {'sku': sku, 'item_id': item_id if ack != 'Failure' else None, 'ack': ack, 'errors': errors}
+
+
+def _item_uuid() -> str:
+    """A fresh Item.UUID: 32 upper-case hex digits, as eBay wants."""
+    return uuid.uuid4().hex.upper()
+
+
+def _duplicate_item_id(error: Dict) -> Optional[str]:
+    """The ItemID an eBay 'UUID already used' error names, or None."""
+    if str(error.get('ErrorCode')) != DUPLICATE_UUID_ERROR_CODE:
+        return None
+    match = re.search(r'item ?ID\s*=\s*(\d+)', str(error.get('LongMessage', '')), re.IGNORECASE)
+    if match:
+        return match.group(1)
+    parameters = as_list(error.get('ErrorParameters'))
+    values = [str(parameter.get('Value')) for parameter in parameters if isinstance(parameter, dict)]
+    return next((value for value in values if value.isdigit()), None)
+
+
+def _inventory_request(update: Dict) -> Dict:
+    """One InventoryStatus element of ReviseInventoryStatus for an update of revise_inventory_status."""
+    status = {'ItemID': str(update['item_id'])} if update.get('item_id') else {'SKU': update['sku']}
+    if update.get('price') is not None:
+        status['StartPrice'] = f"{float(update['price']):.2f}"
+    if update.get('quantity') is not None:
+        status['Quantity'] = str(int(update['quantity']))
+    return status
+
+
+def _error_mentions(error: Dict, values: Iterable[str]) -> bool:
+    """True if one of the ErrorParameters of an eBay error names one of 'values' (an ItemID or SKU)."""
+    wanted = {str(value) for value in values if value}
+    parameters = as_list(error.get('ErrorParameters'))
+    return any(str(parameter.get('Value')) in wanted for parameter in parameters if isinstance(parameter, dict))
+
+
+def _is_retryable(result: Dict) -> bool:
+    """Failures caused by eBay (SystemError) or a lost answer may succeed later; request errors will not."""
+    errors = result['errors']
+    return result['ack'] == 'Failure' and (
+        not errors or any(error.get('ErrorClassification') == 'SystemError' for error in errors)
+    )
+
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 class EBAYHandler:
@@ -25,7 +102,8 @@ class EBAYHandler:
     Handles interactions with the eBay API for listing items.
     It uses EPERHandler to fetch item details.
     """
-    def __init__(self, dotenv_path: Optional[str] = None, api_config_override: Optional[Dict] = None):
+    def __init__(self, dotenv_path: Optional[str] = None, api_config_override: Optional[Dict] = None,
+                 category_cache=None, category_tree=None):
         """
         Initializes the eBay API connections.
 
@@ -34,6 +112,10 @@ class EBAYHandler:
                                          If None, default .env loading behavior is used.
             api_config_override (Optional[Dict]): A dictionary to override specific API_CONFIG values
                                                   after loading from .env.
+            category_cache: CategoryCache for get_category_id. None uses the process-wide
+                            cache (see category_cache.get_default_category_cache), False disables caching.
+            category_tree: CategoryTree used to pick categories offline. None uses the tree
+                           stored with the category cache (CategoryCache.tree), False disables it.
         """
         # 1. Lade die Basiskonfiguration aus der .env Datei
         config = load_ebay_env_config(dotenv_path=dotenv_path) #
@@ -74,32 +156,85 @@ class EBAYHandler:
             logging.error(f"Failed to initialize eBay API connections: {e}") #
             raise
 
-    def get_category_id(self, part_number: str, default_category_id: str = '185012') -> str:
+        self.category_cache = get_default_category_cache() if category_cache is None else (category_cache or None)
+        if category_tree is None and self.category_cache:
+            try:
+                category_tree = self.category_cache.tree
+            except (sqlite3.Error, OSError) as e:
+                logging.warning(f"eBay category tree unavailable, continuing without it: {e}") #
+        self.category_tree = category_tree or None
+        # ebaysdk connections keep the last request/response on the instance, so threads
+        # other than the creating one get their own connections
+        self._owner_thread = threading.get_ident()
+        self._thread_apis = threading.local()
+
+    def _finding_api(self):
+        """The Finding connection for the calling thread."""
+        return self._thread_api('api_finding', Finding)
+
+    def _trading_api(self):
+        """The Trading connection for the calling thread."""
+        return self._thread_api('api_trading', Trading)
+
+    def _thread_api(self, name: str, connection_class):
+        if threading.get_ident() == self._owner_thread:
+            return getattr(self, name)
+        api = getattr(self._thread_apis, name, None)
+        if api is None:
+            api = connection_class(config_file=None, **self.config) #
+            setattr(self._thread_apis, name, api)
+        return api
+
+    def get_category_id(self, part_number: str, default_category_id: str = '185012', use_cache: bool = True) -> str:
         """
         Finds the eBay Category ID for a given part number using keywords.
 
+        The result is kept in the category cache; a part number without an own entry
+        reuses the category of a comparison number (see CategoryCache.link). Fallbacks to
+        the default category are cached only briefly, failed searches not at all.
+
         Args:
             part_number (str): The part number to search for.
             default_category_id (str): The category ID to return if no item is found.
                                        '185012' is "Sonstige" (Other) in Auto & Motorrad: Teile on eBay DE.
+            use_cache (bool): With False the cache is not read, but the result is still stored.
 
         Returns:
             str: The eBay Category ID.
         """
+        if self.category_cache and use_cache:
+            cached = self.category_cache.get(part_number)
+            if cached is not None:
+                logging.info(f"Using cached category ID '{cached}' for part number '{part_number}'.") #
+                return cached
+
+        category_id, is_fallback = self._search_category_id(part_number, default_category_id)
+        if self.category_cache and is_fallback is not None:
+            self.category_cache.set(part_number, category_id, is_fallback=is_fallback)
+        return category_id
+
+    def _search_category_id(self, part_number: str, default_category_id: str) -> Tuple[str, Optional[bool]]:
+        """
+        One Finding API search. Returns (category_id, is_fallback); is_fallback is None
+        if the search failed, so the default category must not be cached.
+        """
         try:
             # Splitting part_number into keywords can be refined based on part_number structure
             keywords = part_number # Ganze Teilenummer als Keyword kann besser sein
-            response = self.api_finding.execute('findItemsByKeywords', {'keywords': keywords}) #
+            response = self._finding_api().execute('findItemsByKeywords', {'keywords': keywords}) #
 
             if response.reply.ack == 'Success' and response.reply.searchResult._count != '0': #
                 # Prüfe, ob searchResult und item existieren und nicht leer sind
                 if hasattr(response.reply.searchResult, 'item') and response.reply.searchResult.item: #
                     category_id = response.reply.searchResult.item[0].primaryCategory.categoryId #
                     logging.info(f"Found category ID '{category_id}' for part number '{part_number}'.") #
-                    return category_id #
+                    return category_id, False #
                 else:
                     logging.warning(f"Search result for part number '{part_number}' was successful but contained no items. Using default category: '{default_category_id}'.") #
-                    return default_category_id #
+                    return default_category_id, True #
+            elif response.reply.ack == 'Success': # Keine Treffer
+                logging.warning(f"No items found for part number '{part_number}'. Using default: '{default_category_id}'.") #
+                return default_category_id, True #
             else:
                 ack_status = response.reply.ack if hasattr(response.reply, 'ack') else 'N/A' #
                 error_message = "" #
@@ -108,10 +243,98 @@ class EBAYHandler:
 
 
                 logging.warning(f"No category found or error for part number '{part_number}'. Ack: {ack_status}. API Error: {error_message}. Using default: '{default_category_id}'.") #
-                return default_category_id #
+                return default_category_id, None #
         except Exception as e:
             logging.error(f"Error getting category ID for '{part_number}': {e}") #
-            return default_category_id #
+            return default_category_id, None #
+
+    def get_category_ids(self, part_numbers: Iterable[str], default_category_id: str = '185012',
+                         comparison_numbers: Optional[Dict[str, Iterable[str]]] = None,
+                         max_workers: int = DEFAULT_CATEGORY_WORKERS, use_cache: bool = True) -> Dict[str, str]:
+        """
+        Resolves the category IDs of many part numbers, searching eBay in parallel.
+
+        Cached numbers need no search. Of the remaining numbers only one per comparison-number
+        class is searched first; the others then get its category from the cache and are only
+        searched themselves if that search fell back to the default category.
+
+        Args:
+            part_numbers (Iterable[str]): The part numbers to resolve.
+            default_category_id (str): Category for numbers without search results.
+            comparison_numbers (Optional[Dict[str, Iterable[str]]]): Known comparison numbers per
+                part number (e.g. PartRecord.comparison_numbers), linked in the cache first.
+            max_workers (int): Number of parallel Finding API searches.
+            use_cache (bool): With False every number is searched (results are still stored).
+
+        Returns:
+            Dict[str, str]: {part_number: category_id} in the order of part_numbers.
+        """
+        part_numbers = list(dict.fromkeys(num for num in part_numbers if num))
+        cache = self.category_cache
+        if cache:
+            for part_number, numbers in (comparison_numbers or {}).items():
+                cache.link([part_number, *numbers])
+
+        resolved = cache.get_many(part_numbers) if cache and use_cache else {}
+        missing = [num for num in part_numbers if num not in resolved]
+
+        if cache and missing:
+            # One search per class; the other members read its result from the cache below
+            representatives = {}
+            for num in missing:
+                representatives.setdefault(cache.class_members(num)[0] if use_cache else num, num)
+            first_round = list(representatives.values())
+            resolved.update(self._search_category_ids(first_round, default_category_id, max_workers))
+            rest = [num for num in missing if num not in resolved]
+            resolved.update(cache.get_many(rest))
+            missing = [num for num in rest if num not in resolved]
+        resolved.update(self._search_category_ids(missing, default_category_id, max_workers))
+
+        logging.info(f"Resolved {len(part_numbers)} category ID(s).") #
+        return {num: resolved[num] for num in part_numbers}
+
+    def _search_category_ids(self, part_numbers: List[str], default_category_id: str, max_workers: int) -> Dict[str, str]:
+        """Searches and caches the categories of part_numbers with up to max_workers threads."""
+        if not part_numbers:
+            return {}
+
+        def resolve(part_number):
+            return self.get_category_id(part_number, default_category_id=default_category_id, use_cache=False)
+
+        if max_workers <= 1 or len(part_numbers) == 1:
+            return {num: resolve(num) for num in part_numbers}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(part_numbers)),
+                                thread_name_prefix='ebay-category') as executor:
+            return dict(zip(part_numbers, executor.map(resolve, part_numbers)))
+
+    def sync_category_tree(self, force: bool = False) -> bool:
+        """
+        Updates the local category tree with GetCategories; the tree is only downloaded
+        again if eBay reports a new CategoryVersion (or force is True).
+
+        Returns:
+            bool: True if the tree was downloaded.
+        """
+        if self.category_tree is None:
+            raise ValueError("No category tree configured for this EBAYHandler.")
+        return self.category_tree.sync(self.api_trading, force=force)
+
+    def match_category(self, title: str) -> Optional[str]:
+        """
+        Maps a part description (the ePER description, not the generated title) to a
+        category ID with the local category tree and our own past listings, without any
+        API call. Returns None if there is no tree or no confident match.
+        """
+        if self.category_tree is None or not title:
+            return None
+        try:
+            category_id = self.category_tree.match(title)
+        except sqlite3.Error as e:
+            logging.warning(f"Offline category match for '{title}' failed: {e}") #
+            return None
+        if category_id:
+            logging.info(f"Matched title '{title}' to category ID '{category_id}' offline.") #
+        return category_id
 
     @staticmethod
     def get_shipping_profile_id_by_weight(weight_kg: float, default_profile_id: str) -> str:
@@ -157,11 +380,14 @@ class EBAYHandler:
                        picture_urls: Optional[List[str]] = None, # Geändert zu picture_urls und List[str]
                        manufacturer_override: Optional[str] = None,
                        description_override: Optional[str] = None, # Geändert von description zu description_override
-                       title_override: Optional[str] = None # Hinzugefügt für Titel-Override
+                       title_override: Optional[str] = None, # Hinzugefügt für Titel-Override
+                       eper_handler: Optional[EPERHandler] = None # Vorab gestarteter (lazy) EPERHandler
                        ) -> dict:
         """
         Prepares the item dictionary (payload) for an eBay listing.
         (Args-Beschreibung wie in der Originaldatei)
+        If eper_handler is given (e.g. a prefetch started with EPERHandler(..., lazy=True)),
+        its data is used instead of starting a new ePER lookup.
         """
         if condition_id not in CONDITION_MAP:
             logging.warning(f"Condition ID '{condition_id}' not in known CONDITION_MAP. Using it directly.") #
@@ -173,7 +399,11 @@ class EBAYHandler:
 
 
         try:
-            eper_item = EPERHandler(part_number_str) # Assuming EPERHandler raises an error if part not found
+            if eper_handler is not None:
+                eper_item = eper_handler
+                eper_item.data # Wait for a pending prefetch so its errors are reported here
+            else:
+                eper_item = EPERHandler(part_number_str) # Assuming EPERHandler raises an error if part not found
         except Exception as e:
             logging.error(f"Failed to initialize EPERHandler for part number {part_number_str}: {e}") #
             raise ValueError(f"EPERHandler could not be initialized for part number {part_number_str}. Error: {e}") #
@@ -212,7 +442,14 @@ class EBAYHandler:
             logging.error(error_msg) #
             raise ValueError(error_msg) #
 
-        category_id = self.get_category_id(part_number_specific, default_category_id='185012') # Nutze spezifische Teilenummer für Kategorie
+        if self.category_cache: # Ersatz- und Vorgängernummern teilen sich die Kategorie
+            self.category_cache.link([part_number_str, part_number_specific, *comparison_numbers_list])
+        # Zuerst offline über den lokalen Kategoriebaum, sonst per Suche. Abgeglichen wird nur die
+        # ePER-Bezeichnung: der generierte Titel enthält auch Marke, Modelle und Teilenummer
+        eper_description = getattr(eper_item.data, 'description', None)
+        category_id = self.match_category(eper_description) if isinstance(eper_description, str) else None
+        if not category_id:
+            category_id = self.get_category_id(part_number_specific, default_category_id='185012') # Nutze spezifische Teilenummer für Kategorie
 
         new_item_payload = { #
             'Item': {
@@ -293,6 +530,7 @@ class EBAYHandler:
             if response.reply.Ack == 'Success' or response.reply.Ack == 'Warning': #
                 item_id = response_data.get('ItemID') #
                 logging.info(f"Item created successfully with ID: {item_id}. SKU: {item_payload.get('Item', {}).get('SKU', 'N/A')}") #
+                self._record_listing(item_id, item_payload) #
                 if response.reply.Ack == 'Warning' and response_data.get('Errors'): #
                      for error in response_data.get('Errors'): #
                         logging.warning(f"eBay AddItem Warning: {error.get('SeverityCode')} - {error.get('ShortMessage')} - {error.get('LongMessage')}") #
@@ -307,6 +545,157 @@ class EBAYHandler:
             logging.error(f"Exception creating item. SKU: {item_payload.get('Item', {}).get('SKU', 'N/A')}: {e}") #
             return None #
 
+    @staticmethod
+    def _send_in_batches(entries: List, batch_size: int, max_retries: int, send, failed_result) -> Tuple[List[Dict], int]:
+        """
+        Sends entries in calls of up to batch_size and returns (results in entry order, number of calls).
+
+        send(batch) returns one result per entry ({'ack', 'errors', ...}), or None if the call
+        failed as a whole; then the batch is split in halves and sent again, and a single entry
+        is sent up to max_retries more times before failed_result(entry) is used. A result of
+        None for one entry of a larger batch means its outcome is unknown; it is sent again alone.
+        Entries that failed with a system error are sent again, packed into new calls.
+        """
+        results = [None] * len(entries)
+        queue = deque((batch, 0) for batch in _chunks(list(range(len(entries))), batch_size))
+        calls = 0
+        while queue:
+            batch, attempt = queue.popleft()
+            batch_results = send([entries[index] for index in batch])
+            calls += 1
+            if batch_results is None: # Die ganze Anfrage ist gescheitert
+                if len(batch) > 1:
+                    middle = (len(batch) + 1) // 2
+                    queue.extend([(batch[:middle], attempt), (batch[middle:], attempt)])
+                elif attempt < max_retries:
+                    queue.append((batch, attempt + 1))
+                else:
+                    results[batch[0]] = failed_result(entries[batch[0]])
+                continue
+
+            retry = []
+            for index, result in zip(batch, batch_results):
+                if result is None:
+                    if len(batch) > 1:
+                        queue.append(([index], attempt))
+                    else:
+                        results[index] = failed_result(entries[index])
+                elif _is_retryable(result) and attempt < max_retries:
+                    retry.append(index)
+                else:
+                    results[index] = result
+            queue.extend((chunk, attempt + 1) for chunk in _chunks(retry, batch_size))
+        return results, calls
+
+    def create_items(self, item_payloads: Iterable[dict], batch_size: int = ADD_ITEMS_BATCH_SIZE,
+                     max_retries: int = DEFAULT_ADD_ITEMS_RETRIES) -> Dict[str, Dict]:
+        """
+        Lists many items with AddItems calls of up to 5 items each.
+
+        The per-item answers are mapped back to the SKUs. If a whole call fails (no
+        per-item answers), its items are split in halves and sent again, so one bad payload
+        only fails itself. Items that failed with a system error are sent again up to
+        max_retries times, packed into new calls; request errors are final.
+
+        eBay may have listed the items of a call whose answer was lost (e.g. a timeout), so
+        every item gets a random Item.UUID per create_items call (unless the payload sets one)
+        that all its resends within the call reuse. A resent item that eBay already listed is
+        rejected as a duplicate; its result then reports the existing ItemID instead of a
+        second listing. A later call lists the same draft again, e.g. a second copy on purpose.
+
+        Args:
+            item_payloads (Iterable[dict]): Payloads from draft_item_payload; every Item needs a unique SKU.
+            batch_size (int): Items per AddItems call (1 to 5).
+            max_retries (int): Repeats for items that failed with a system error.
+
+        Returns:
+            Dict[str, Dict]: {sku: {'sku', 'item_id', 'ack', 'errors'}} in input order.
+                'ack' is 'Success', 'Warning' or 'Failure'; 'item_id' is None on failure.
+        """
+        if not 1 <= batch_size <= ADD_ITEMS_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {ADD_ITEMS_BATCH_SIZE}.")
+        payloads = list(item_payloads)
+        skus = [payload.get('Item', {}).get('SKU') for payload in payloads] #
+        if not all(skus) or len(set(skus)) != len(skus):
+            raise ValueError("Every payload in create_items needs a unique SKU.")
+        payloads = [dict(payload, Item=dict(payload['Item'],
+                                            UUID=payload['Item'].get('UUID') or _item_uuid()))
+                    for payload in payloads]
+
+        call_failed = {'SeverityCode': 'Error', 'LongMessage': 'AddItems call failed.'}
+        result_list, calls = self._send_in_batches(
+            payloads, batch_size, max_retries, self._add_items_call,
+            lambda payload: _item_result(payload['Item']['SKU'], None, [call_failed])
+        )
+        results = {result['sku']: result for result in result_list}
+
+        for payload in payloads:
+            result = results[payload['Item']['SKU']]
+            if result['item_id']:
+                self._record_listing(result['item_id'], payload)
+            for error in result['errors']:
+                log = logging.error if result['ack'] == 'Failure' else logging.warning
+                log(f"eBay AddItems {error.get('SeverityCode')} for SKU {result['sku']}: {error.get('ShortMessage')} - {error.get('LongMessage')}") #
+        created = sum(1 for result in results.values() if result['item_id'])
+        logging.info(f"AddItems: {created} of {len(payloads)} item(s) created in {calls} call(s).") #
+        return {sku: results[sku] for sku in skus}
+
+    def _add_items_call(self, batch: List[dict]) -> Optional[List[Dict]]:
+        """
+        Sends one AddItems call. Returns one result per payload (see _item_result), or None
+        if the call failed as a whole and no per-item answer came back.
+        """
+        request = {'AddItemRequestContainer': [
+            {'MessageID': str(index), 'Item': payload['Item']} for index, payload in enumerate(batch)
+        ]}
+        try:
+            response_data = self._trading_api().execute('AddItems', request).dict() #
+        except Exception as e:
+            # ebaysdk raises on Ack 'Failure' but keeps the response, which still has the per-item answers
+            response = getattr(e, 'response', None)
+            response_data = response.dict() if response is not None and hasattr(response, 'dict') else {}
+            if not response_data.get('AddItemResponseContainer'):
+                logging.error(f"Exception in AddItems for {len(batch)} item(s): {e}") #
+                return None
+        logging.debug(f"AddItems API Response: {response_data}") #
+
+        containers = as_list(response_data.get('AddItemResponseContainer'))
+        if not containers:
+            logging.error(f"AddItems returned no item results (Ack: {response_data.get('Ack')}).") #
+            return None
+        by_message_id = {}
+        for position, container in enumerate(containers):
+            message_id = container.get('CorrelationID') or container.get('MessageID')
+            by_message_id[str(message_id) if message_id is not None else str(position)] = container
+
+        results = []
+        for index, payload in enumerate(batch):
+            sku = payload['Item']['SKU']
+            container = by_message_id.get(str(index))
+            if container is None: # Keine Antwort für dieses Item: wie ein Systemfehler behandeln
+                results.append(_item_result(sku, None, []))
+                continue
+            errors = [dict(error) for error in as_list(container.get('Errors'))]
+            item_id = container.get('ItemID')
+            existing_id = next((_duplicate_item_id(error) for error in errors if _duplicate_item_id(error)), None)
+            if not item_id and existing_id: # Listed by an earlier attempt whose answer was lost
+                logging.info(f"SKU {sku} was already listed as item {existing_id} by an earlier AddItems attempt.") #
+                item_id = existing_id
+                errors = [dict(error, SeverityCode='Warning') if _duplicate_item_id(error) else error for error in errors]
+            results.append(_item_result(sku, item_id, errors))
+        return results
+
+    def _record_listing(self, item_id: Optional[str], item_payload: dict):
+        """Adds a new listing's title and category to the offline category index."""
+        item = item_payload.get('Item', {}) #
+        category_id = (item.get('PrimaryCategory') or {}).get('CategoryID') #
+        if self.category_tree is None or not item_id or not category_id:
+            return
+        try:
+            self.category_tree.add_listing(item_id, item.get('Title', ''), category_id) #
+        except sqlite3.Error as e:
+            logging.warning(f"Could not record listing {item_id} for the category index: {e}") #
+
     def revise_item(self, item_id: str, revised_item_fields: dict) -> Optional[str]:
         """
         Revises an existing eBay listing.
@@ -334,4 +723,102 @@ class EBAYHandler:
                 return None #
         except Exception as e:
             logging.error(f"Exception revising item '{item_id}': {e}") #
-            return None #
\ No newline at end of file
+            return None #
+
+    def revise_inventory_status(self, updates: Iterable[Dict], batch_size: int = REVISE_INVENTORY_BATCH_SIZE,
+                                max_retries: int = DEFAULT_REVISE_RETRIES) -> List[Dict]:
+        """
+        Updates price and/or quantity of many listings with ReviseInventoryStatus (up to 4 per call).
+
+        Much cheaper than revise_item for a stock or price sync: only the inventory status
+        is sent, and four listings share one call. Errors that name a listing (ErrorParameters)
+        are assigned to it; if a failed call does not say which listing caused it, the listings
+        without a confirmed status are sent again one by one. Calls that fail as a whole are
+        split like in create_items.
+
+        Args:
+            updates (Iterable[Dict]): {'item_id' or 'sku', 'price' and/or 'quantity'} per listing.
+                                      A SKU only works for listings whose inventory is tracked by SKU.
+            batch_size (int): Listings per call (1 to 4).
+            max_retries (int): Repeats for listings that failed with a system error.
+
+        Returns:
+            List[Dict]: One result per update in input order: {'item_id', 'sku', 'price', 'quantity',
+                'ack', 'errors'}, with the ItemID, price and quantity eBay reports after the update.
+        """
+        if not 1 <= batch_size <= REVISE_INVENTORY_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {REVISE_INVENTORY_BATCH_SIZE}.")
+        updates = [dict(update) for update in updates]
+        keys = []
+        for update in updates:
+            if not (update.get('item_id') or update.get('sku')):
+                raise ValueError(f"Inventory update {update} needs an item_id or a sku.")
+            if update.get('price') is None and update.get('quantity') is None:
+                raise ValueError(f"Inventory update {update} needs a price or a quantity.")
+            keys.append(str(update.get('item_id') or update.get('sku')))
+        if len(set(keys)) != len(keys):
+            raise ValueError("Every listing may occur only once in revise_inventory_status.")
+
+        call_failed = {'SeverityCode': 'Error', 'LongMessage': 'ReviseInventoryStatus call failed.'}
+        results, calls = self._send_in_batches(
+            updates, batch_size, max_retries, self._revise_inventory_call,
+            lambda update: self._inventory_result(update, None, [call_failed])
+        )
+        for result in results:
+            for error in result['errors']:
+                log = logging.error if result['ack'] == 'Failure' else logging.warning
+                log(f"eBay ReviseInventoryStatus {error.get('SeverityCode')} for {result['item_id'] or result['sku']}: {error.get('ShortMessage')} - {error.get('LongMessage')}") #
+        revised = sum(1 for result in results if result['ack'] != 'Failure')
+        logging.info(f"ReviseInventoryStatus: {revised} of {len(updates)} listing(s) updated in {calls} call(s).") #
+        return results
+
+    @staticmethod
+    def _inventory_result(update: Dict, status: Optional[Dict], errors: List[Dict]) -> Dict:
+        """Result of one update: the reported status if eBay confirmed it, the requested values otherwise."""
+        status = status or {}
+        if not status or any(error.get('SeverityCode') == 'Error' for error in errors):
+            ack = 'Failure'
+        else:
+            ack = 'Warning' if errors else 'Success'
+        return {
+            'item_id': status.get('ItemID') or update.get('item_id'),
+            'sku': status.get('SKU') or update.get('sku'),
+            'price': float(status['StartPrice']) if status.get('StartPrice') else update.get('price'),
+            'quantity': int(status['Quantity']) if status.get('Quantity') else update.get('quantity'),
+            'ack': ack,
+            'errors': errors,
+        }
+
+    def _revise_inventory_call(self, batch: List[Dict]) -> Optional[List[Optional[Dict]]]:
+        """
+        Sends one ReviseInventoryStatus call. Returns one result per update, None for an update
+        whose outcome cannot be told from the answer, or None if the call failed as a whole.
+        """
+        request = {'InventoryStatus': [_inventory_request(update) for update in batch]}
+        try:
+            response_data = self._trading_api().execute('ReviseInventoryStatus', request).dict() #
+        except Exception as e:
+            # ebaysdk raises on Ack 'Failure' but keeps the response with the errors
+            response = getattr(e, 'response', None)
+            response_data = response.dict() if response is not None and hasattr(response, 'dict') else {}
+            if not response_data.get('Errors') and not response_data.get('InventoryStatus'):
+                logging.error(f"Exception in ReviseInventoryStatus for {len(batch)} listing(s): {e}") #
+                return None
+        logging.debug(f"ReviseInventoryStatus API Response: {response_data}") #
+
+        statuses = [status for status in as_list(response_data.get('InventoryStatus')) if isinstance(status, dict)]
+        errors = [dict(error) for error in as_list(response_data.get('Errors'))]
+        results = []
+        for update in batch:
+            names = (update.get('item_id'), update.get('sku'))
+            status = next((status for status in statuses
+                           if (update.get('item_id') and str(status.get('ItemID')) == str(update['item_id']))
+                           or (update.get('sku') and status.get('SKU') == update['sku'])), None)
+            own_errors = [error for error in errors if _error_mentions(error, names)]
+            if status is None and not own_errors:
+                if len(batch) > 1:
+                    results.append(None) # Not confirmed, but no error names it either: ask again alone
+                    continue
+                own_errors = errors # A single listing: all errors are its own
+            results.append(self._inventory_result(update, status, own_errors))
+        return results
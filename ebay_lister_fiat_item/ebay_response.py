@@ -0,0 +1,8 @@
+"""Helpers for reading the parsed responses of ebaysdk calls."""
+
+
+def as_list(value) -> list:
+    """ebaysdk returns a single repeated element as a dict instead of a list."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
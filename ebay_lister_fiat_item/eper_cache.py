@@ -0,0 +1,289 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from .supersession import SupersessionGraph
+from .page_store import PageStore
+
+# Location of the on-disk cache. Like the GUI log file it lives in the working
+# directory unless EPER_CACHE_PATH points somewhere else.
+DEFAULT_CACHE_PATH = 'eper_cache.sqlite3'
+# Offline replays of an HTTPArchive cache in memory, so they never write to the cache file
+REPLAY_CACHE_PATH = ':memory:'
+
+DAY = 24 * 60 * 60
+
+# Time-to-live per field in seconds. Prices change far more often than
+# weights, descriptions or fitment, so they expire first. The summary text
+# is not stored; PartRecord renders it from the other fields.
+DEFAULT_FIELD_TTLS = {
+    'eper_price_str': 1 * DAY,
+    'weight_kg': 180 * DAY,
+    'title': 30 * DAY,
+    'description': 30 * DAY,
+    'fitting_cars': 30 * DAY,
+    'comparison_numbers': 30 * DAY,
+    'previous_numbers': 30 * DAY,
+    'replacement_numbers': 30 * DAY,
+}
+DEFAULT_TTL = 30 * DAY
+
+# Failed lookups are cached separately. A network error or throttling may be gone in a
+# few minutes, while a part number ePER does not know (typo, obsolete number) stays unknown.
+TRANSIENT_FAILURE = 'transient'
+NOT_FOUND = 'not_found'
+DEFAULT_FAILURE_TTLS = {
+    TRANSIENT_FAILURE: 10 * 60,
+    NOT_FOUND: 7 * DAY,
+}
+
+# 'part' holds the fields of the PartRecord produced by EPERHandler.get_part_details,
+# 'page' holds the fields extracted from a single ePER page.
+PART_SCOPE = 'part'
+PAGE_SCOPE = 'page'
+
+SCOPE_FIELDS = {
+    PART_SCOPE: ('part_number', 'eper_price_str', 'weight_kg', 'fitting_cars',
+                 'comparison_numbers', 'title', 'description'),
+    PAGE_SCOPE: ('title', 'eper_price_str', 'weight_kg', 'fitting_cars',
+                 'previous_numbers', 'replacement_numbers'),
+}
+
+
+class EPERCache:
+    """
+    Local SQLite cache for ePER lookups.
+
+    Every field is stored with its own fetch timestamp and checked against its
+    own TTL, so a stale price does not throw away weight or fitment data.
+    A lookup only counts as a hit if all requested fields are present and fresh.
+    Failed lookups are kept in a separate negative cache with their own TTLs
+    (see DEFAULT_FAILURE_TTLS), so unknown part numbers are not fetched again and again.
+    The cache is safe to share between threads; SQLite's WAL mode lets several
+    processes use the same file.
+    """
+    def __init__(self, path: Optional[str] = None, field_ttls: Optional[Dict[str, float]] = None,
+                 failure_ttls: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            path (Optional[str]): Path to the SQLite file. Defaults to EPER_CACHE_PATH
+                                  from the environment or DEFAULT_CACHE_PATH.
+            field_ttls (Optional[Dict[str, float]]): Overrides for DEFAULT_FIELD_TTLS (seconds).
+            failure_ttls (Optional[Dict[str, float]]): Overrides for DEFAULT_FAILURE_TTLS (seconds).
+        """
+        self.path = path or os.getenv('EPER_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.field_ttls = dict(DEFAULT_FIELD_TTLS)
+        if field_ttls:
+            self.field_ttls.update(field_ttls)
+        self.failure_ttls = dict(DEFAULT_FAILURE_TTLS)
+        if failure_ttls:
+            self.failure_ttls.update(failure_ttls)
+        self._lock = threading.Lock()
+        self._graph = None
+        self._page_store = None
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS part_fields ("
+                " scope TEXT NOT NULL,"
+                " part_number TEXT NOT NULL,"
+                " field TEXT NOT NULL,"
+                " value TEXT,"
+                " fetched_at REAL NOT NULL,"
+                " PRIMARY KEY (scope, part_number, field))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS failed_lookups ("
+                " part_number TEXT PRIMARY KEY,"
+                " reason TEXT NOT NULL,"
+                " failed_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def ttl_for(self, field: str) -> float:
+        return self.field_ttls.get(field, DEFAULT_TTL)
+
+    @property
+    def graph(self) -> SupersessionGraph:
+        """The supersession graph stored in the same SQLite file, created on first use."""
+        with self._lock:
+            if self._graph is None:
+                self._graph = SupersessionGraph(self.path, edge_ttl=self.ttl_for('replacement_numbers'))
+            return self._graph
+
+    @property
+    def page_store(self) -> PageStore:
+        """The raw page store kept in the same SQLite file, created on first use."""
+        with self._lock:
+            if self._page_store is None:
+                self._page_store = PageStore(self.path)
+            return self._page_store
+
+    def get(self, scope: str, part_number: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        """
+        Returns the cached fields for a part number, or None on a miss.
+
+        Args:
+            scope (str): PART_SCOPE or PAGE_SCOPE.
+            part_number (str): The part number to look up.
+            fields (Optional[Iterable[str]]): Fields that must be present and fresh.
+                                              Defaults to all fields of the scope.
+        """
+        required = tuple(fields) if fields is not None else SCOPE_FIELDS[scope]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT field, value, fetched_at FROM part_fields WHERE scope = ? AND part_number = ?",
+                (scope, part_number)
+            ).fetchall()
+        if not rows:
+            return None
+
+        now = time.time()
+        stored = {field: (value, fetched_at) for field, value, fetched_at in rows}
+        result = {}
+        for field in required:
+            if field not in stored:
+                return None
+            value, fetched_at = stored[field]
+            if now - fetched_at > self.ttl_for(field):
+                logging.debug(f"Cached ePER field '{field}' for {part_number} is stale.")
+                return None
+            result[field] = json.loads(value)
+        return result
+
+    def set(self, scope: str, part_number: str, data: Dict, fetched_at: Optional[float] = None):
+        """Stores all fields of 'data' for a part number, stamped with 'fetched_at' (default: now)."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [(scope, part_number, field, json.dumps(value), fetched_at) for field, value in data.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO part_fields (scope, part_number, field, value, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            if scope == PAGE_SCOPE: # A page arrived, so an earlier failure is outdated
+                self._conn.execute("DELETE FROM failed_lookups WHERE part_number = ?", (part_number,))
+            self._conn.commit()
+
+    def get_part(self, part_number: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        return self.get(PART_SCOPE, part_number, fields)
+
+    def set_part(self, part_number: str, data: Dict, fetched_at: Optional[float] = None):
+        self.set(PART_SCOPE, part_number, data, fetched_at)
+
+    def get_page(self, part_number: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        return self.get(PAGE_SCOPE, part_number, fields)
+
+    def set_page(self, part_number: str, data: Dict, fetched_at: Optional[float] = None):
+        self.set(PAGE_SCOPE, part_number, data, fetched_at)
+
+    def get_failure(self, part_number: str) -> Optional[str]:
+        """Returns the reason (TRANSIENT_FAILURE or NOT_FOUND) of a recent failed lookup, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reason, failed_at FROM failed_lookups WHERE part_number = ?", (part_number,)
+            ).fetchone()
+        if row is None:
+            return None
+        reason, failed_at = row
+        if time.time() - failed_at > self.failure_ttls.get(reason, DEFAULT_FAILURE_TTLS[TRANSIENT_FAILURE]):
+            return None
+        return reason
+
+    def set_failure(self, part_number: str, reason: str, failed_at: Optional[float] = None):
+        """Remembers a failed lookup; reason is TRANSIENT_FAILURE or NOT_FOUND."""
+        failed_at = time.time() if failed_at is None else failed_at
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO failed_lookups (part_number, reason, failed_at) VALUES (?, ?, ?)",
+                (part_number, reason, failed_at)
+            )
+            self._conn.commit()
+
+    def clear_failures(self, part_number: Optional[str] = None) -> int:
+        """Forgets the failed lookup of one part number, or all of them. Returns the number removed."""
+        where, params = ("WHERE part_number = ?", (part_number,)) if part_number is not None else ("", ())
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM failed_lookups {where}", params)
+            self._conn.commit()
+        return cursor.rowcount
+
+    def invalidate(self, part_number: Optional[str] = None, scope: Optional[str] = None,
+                   fields: Optional[Iterable[str]] = None) -> int:
+        """
+        Removes cached entries. Without arguments the whole cache is cleared.
+
+        Args:
+            part_number (Optional[str]): Only remove entries for this part number.
+            scope (Optional[str]): Only remove entries of this scope.
+            fields (Optional[Iterable[str]]): Only remove these fields (e.g. ['eper_price_str']).
+
+        Returns:
+            int: The number of removed field entries.
+        """
+        clauses, params = [], []
+        if part_number is not None:
+            clauses.append("part_number = ?")
+            params.append(part_number)
+        if scope is not None:
+            clauses.append("scope = ?")
+            params.append(scope)
+        if fields is not None:
+            fields = list(fields)
+            clauses.append(f"field IN ({', '.join('?' for _ in fields)})")
+            params.extend(fields)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM part_fields{where}", params)
+            self._conn.commit()
+        logging.info(f"Invalidated {cursor.rowcount} cached ePER field(s).")
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            if self._graph is not None:
+                self._graph.close()
+            if self._page_store is not None:
+                self._page_store.close()
+            self._conn.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[EPERCache]:
+    """
+    Returns the process-wide cache shared by all EPERHandler instances.
+    If the cache file cannot be opened, caching is disabled and None is returned.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = EPERCache()
+            except (sqlite3.Error, OSError) as e:
+                logging.warning(f"ePER cache unavailable, continuing without cache: {e}")
+                return None
+        return _default_cache
+
+
+_replay_cache = None
+
+
+def get_replay_cache() -> EPERCache:
+    """
+    Returns the process-wide in-memory cache used instead of the default cache while an
+    HTTPArchive replays. Pages, part details and failures of the replay are shared
+    between the handlers of the run but are gone when the process ends.
+    """
+    global _replay_cache
+    with _default_cache_lock:
+        if _replay_cache is None:
+            _replay_cache = EPERCache(REPLAY_CACHE_PATH)
+        return _replay_cache
@@ -0,0 +1,107 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+# ePER spellings that are mapped to the model names used in CAR_BRANDS_DATA
+SPECIAL_CAR_NAMES = {'N.DELTA': 'DELTA', "DUCATO'94": 'DUCATO', "PUNTO BZ": "PUNTO", "PUNTO TB.DS": "PUNTO"}
+
+
+class FitmentMatcher:
+    """
+    Precompiled index that maps ePER drawing texts (e.g. "FIAT PUNTO (188)") to
+    "BRAND MODEL" strings.
+
+    All regular expressions are built once per brand table instead of once per model
+    and row. Matching follows the same rules as before:
+
+    * The first brand (in table order) that occurs in the text and has a model that
+      occurs in the text wins, with the first such model in table order.
+    * If no brand matched, every brand contributes its first model that appears as a
+      whole word in the text.
+    """
+    def __init__(self, car_brands: Dict[str, List[str]], special_names: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            car_brands (Dict[str, List[str]]): Brand -> models, e.g. CAR_BRANDS_DATA.
+            special_names (Optional[Dict[str, str]]): Spellings replaced before matching.
+                                                      Defaults to SPECIAL_CAR_NAMES.
+        """
+        self.car_brands = {brand: list(models) for brand, models in car_brands.items()}
+        self.special_names = dict(SPECIAL_CAR_NAMES if special_names is None else special_names)
+        self._special_pattern = self._compile_alternation(self.special_names)
+
+        self._brand_order = list(self.car_brands)
+        self._brand_scanner = self._compile_scanner(self._brand_order)
+        self._model_scanners = {}
+        self._model_prefixes = {}
+        self._model_rank = {}
+        self._word_index = {} # Single-word model -> [(brand, rank), ...] for the fallback
+        for brand, models in self.car_brands.items():
+            rank = {}
+            for index, model in enumerate(models):
+                rank.setdefault(model, index)
+            self._model_rank[brand] = rank
+            self._model_scanners[brand] = self._compile_scanner(rank)
+            # A scanner reports the longest model starting at each position; the shorter
+            # models starting there are its prefixes.
+            self._model_prefixes[brand] = {
+                model: [other for other in rank if model.startswith(other)] for model in rank
+            }
+            for model, index in rank.items():
+                if model and len(model.split()) == 1 and model == model.strip():
+                    self._word_index.setdefault(model, []).append((brand, index))
+
+    @staticmethod
+    def _compile_alternation(terms: Iterable[str]):
+        terms = sorted((term for term in terms if term), key=len, reverse=True)
+        return re.compile('|'.join(re.escape(term) for term in terms)) if terms else None
+
+    @classmethod
+    def _compile_scanner(cls, terms: Iterable[str]):
+        """Lookahead alternation that reports the longest term at every position, including overlaps."""
+        alternation = cls._compile_alternation(terms)
+        return re.compile(f"(?=({alternation.pattern}))") if alternation else None
+
+    def normalize(self, name) -> str:
+        """Upper-cases a drawing text and replaces the special spellings."""
+        if not isinstance(name, str): return ""
+        name = name.upper()
+        if self._special_pattern:
+            name = self._special_pattern.sub(lambda match: self.special_names[match.group(0)], name)
+        return name
+
+    def _models_in(self, brand: str, text: str) -> set:
+        scanner = self._model_scanners[brand]
+        if not scanner:
+            return set()
+        prefixes = self._model_prefixes[brand]
+        present = set()
+        for match in scanner.finditer(text):
+            present.update(prefixes[match.group(1)])
+        return present
+
+    def match_text(self, text: str) -> List[str]:
+        """Returns the "BRAND MODEL" entries for a single drawing text."""
+        normalized_text = self.normalize(text)
+        if self._brand_scanner:
+            brands_in_text = {match.group(1) for match in self._brand_scanner.finditer(normalized_text)}
+            for brand in self._brand_order:
+                if brand in brands_in_text:
+                    models_in_text = self._models_in(brand, normalized_text)
+                    if models_in_text:
+                        rank = self._model_rank[brand]
+                        return [f"{brand} {min(models_in_text, key=rank.__getitem__)}"]
+
+        # Fallback: models that appear as a whole word, first model per brand
+        best_rank = {}
+        for word in normalized_text.split():
+            for brand, index in self._word_index.get(word, ()):
+                if index < best_rank.get(brand, len(self.car_brands[brand])):
+                    best_rank[brand] = index
+        return [f"{brand} {self.car_brands[brand][best_rank[brand]]}" for brand in self._brand_order if brand in best_rank]
+
+    def match(self, texts: Iterable[str]) -> List[str]:
+        """Returns the de-duplicated "BRAND MODEL" entries for several drawing texts, in order."""
+        fitting_cars = []
+        for text in texts:
+            fitting_cars.extend(self.match_text(text))
+        return list(dict.fromkeys(fitting_cars))
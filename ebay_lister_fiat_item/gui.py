@@ -65,6 +65,7 @@ class EbayListingApp(ctk.CTk):
 
     def create_widgets(self):
         self.action_var = ctk.StringVar(value="new")
+        self.prefetched_eper_handlers: Dict[str, EPERHandler] = {}
         self.create_header()
         self.create_action_frame()
         self.create_input_fields() # Basic item details
@@ -108,6 +109,19 @@ class EbayListingApp(ctk.CTk):
             entry = ctk.CTkEntry(input_frame, placeholder_text=placeholder)
             entry.grid(row=i, column=1, padx=10, pady=5, sticky="ew")
             setattr(self, f"{attr}_entry", entry)
+        # Start the ePER lookup as soon as the part number is entered
+        self.part_number_entry.bind("<FocusOut>", self.prefetch_part_details)
+
+    def prefetch_part_details(self, event=None):
+        """Starts a background ePER lookup for the entered part number while the user fills in the rest."""
+        part_number = self.part_number_entry.get().strip()
+        if not part_number or self.action_var.get() != "new" or part_number in self.prefetched_eper_handlers:
+            return
+        try:
+            self.prefetched_eper_handlers[part_number] = EPERHandler(part_number, lazy=True)
+            logging.info(f"Started background ePER lookup for part number: {part_number}")
+        except Exception as e:
+            logging.warning(f"Could not start background ePER lookup for {part_number}: {e}")
 
     def create_ebay_details_frame(self):
         self.ebay_details_frame = ctk.CTkFrame(self)
@@ -401,6 +415,11 @@ class EbayListingApp(ctk.CTk):
         #     # shipping_profile_id_val = data['shipping_profile_id'] (already set)
 
 
+        prefetch_kwargs = {}
+        prefetched_handler = self.prefetched_eper_handlers.pop(part_number_str, None)
+        if prefetched_handler is not None:
+            prefetch_kwargs['eper_handler'] = prefetched_handler
+
         logging.info("Preparing item payload...")
         payload = self.ebay_handler.draft_item_payload(
             part_number_str=part_number_str,
@@ -417,7 +436,8 @@ class EbayListingApp(ctk.CTk):
             vat_percent=vat_percent,
             # picture_urls will use default from ebay_item.py if None
             title_override=title_override,
-            description_override=description_override
+            description_override=description_override,
+            **prefetch_kwargs
         )
 
         logging.info("Creating item on eBay...")
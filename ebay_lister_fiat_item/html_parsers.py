@@ -0,0 +1,279 @@
+import os
+import threading
+from typing import Dict, List
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxHTMLParser
+except ImportError: # Optional dependency: pip install ebay_lister_pkg[fast]
+    SelectolaxHTMLParser = None
+
+HTML_PARSER = 'html.parser'
+LXML = 'lxml'
+SELECTOLAX = 'selectolax'
+
+# Fastest first; the default backend is the first one whose library is installed
+PARSER_PREFERENCE = (SELECTOLAX, LXML, HTML_PARSER)
+
+# Tab panes of an ePER part page that the extractors read
+EPER_PANE_IDS = ('prices-tab-pane', 'drawings-tab-pane', 'previous-tab-pane', 'replacements-tab-pane')
+
+
+def eper_block_selector(pane_ids=EPER_PANE_IDS) -> str:
+    """CSS selector for the table-sm block and the given tab panes."""
+    return ', '.join(['table.table-sm'] + [f'div#{pane_id}' for pane_id in pane_ids])
+
+
+EPER_BLOCK_SELECTOR = eper_block_selector()
+
+
+def _is_eper_block_tag(name, attrs, pane_ids=EPER_PANE_IDS):
+    if name == 'div':
+        return attrs.get('id') in pane_ids
+    if name == 'table':
+        classes = attrs.get('class') or ''
+        if isinstance(classes, str):
+            classes = classes.split()
+        return 'table-sm' in classes
+    return False
+
+
+def _is_eper_block(tag):
+    return _is_eper_block_tag(tag.name, tag.attrs)
+
+
+class EPERPageStrainer(SoupStrainer):
+    """
+    Parse-only filter for ePER part pages: only the table-sm block and the tab panes in
+    pane_ids (default: EPER_PANE_IDS) are turned into a tree, everything else is skipped while parsing.
+    """
+    def __init__(self, pane_ids=EPER_PANE_IDS):
+        super().__init__()
+        self.pane_ids = tuple(pane_ids)
+
+    def search_tag(self, markup_name=None, markup_attrs={}): # Beautiful Soup < 4.13
+        return _is_eper_block_tag(markup_name, markup_attrs or {}, self.pane_ids)
+
+    def allow_tag_creation(self, nsprefix, name, attrs): # Beautiful Soup >= 4.13
+        return _is_eper_block_tag(name, attrs or {}, self.pane_ids)
+
+    def allow_string_creation(self, string):
+        return False
+
+    @property
+    def includes_everything(self):
+        return False
+
+
+class SoupParser:
+    """Beautiful Soup backend; 'features' names the tree builder ('html.parser' or 'lxml')."""
+    def __init__(self, features: str):
+        self.name = features
+        self.features = features
+        BeautifulSoup('', features) # Raises FeatureNotFound if the builder is not installed
+
+    def parse(self, html: str, pane_ids=EPER_PANE_IDS):
+        return BeautifulSoup(html, self.features, parse_only=EPERPageStrainer(pane_ids))
+
+
+class SelectorNode:
+    """
+    Read-only view of a selectolax node with the part of the Beautiful Soup Tag API the
+    ePER extractors use (find, find_all, find_next_sibling, get, text, get_text), so the
+    same extractors run on both kinds of tree.
+    """
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    def __bool__(self):
+        return True
+
+    def __eq__(self, other):
+        return isinstance(other, SelectorNode) and self._node.mem_id == other._node.mem_id
+
+    def __hash__(self):
+        return self._node.mem_id
+
+    @property
+    def name(self):
+        return self._node.tag
+
+    @property
+    def attrs(self):
+        return {key: value if value is not None else '' for key, value in self._node.attributes.items()}
+
+    def get(self, key, default=None):
+        attributes = self._node.attributes
+        if key not in attributes:
+            return default
+        return attributes[key] if attributes[key] is not None else ''
+
+    @property
+    def text(self):
+        return self._node.text(deep=True)
+
+    def get_text(self, separator='', strip=False):
+        return self._node.text(deep=True, separator=separator, strip=strip)
+
+    @property
+    def string(self):
+        """Like Tag.string: the text of a tag whose only descendant chain ends in one string."""
+        node = self._node
+        while True:
+            children = list(node.iter(include_text=True))
+            if len(children) != 1:
+                return None
+            node = children[0]
+            if node.tag == '-text':
+                return node.text_content
+
+    def _matches(self, name, attrs):
+        if callable(name):
+            return name(self)
+        if name is not None and self.name != name:
+            return False
+        for key, expected in attrs.items():
+            if key == 'string':
+                if self.string != expected:
+                    return False
+            elif key == 'class_':
+                if expected not in (self.get('class') or '').split():
+                    return False
+            elif self.get(key, None) != expected:
+                return False
+        return True
+
+    def _descendants(self):
+        own_id = self._node.mem_id
+        for node in self._node.traverse(include_text=False):
+            if node.mem_id != own_id:
+                yield SelectorNode(node)
+
+    def find_all(self, name=None, **attrs) -> List['SelectorNode']:
+        return [node for node in self._descendants() if node._matches(name, attrs)]
+
+    def find(self, name=None, **attrs):
+        for node in self._descendants():
+            if node._matches(name, attrs):
+                return node
+        return None
+
+    def find_next_sibling(self, name=None, **attrs):
+        node = self._node.next
+        while node is not None:
+            if node.tag != '-text':
+                sibling = SelectorNode(node)
+                if sibling._matches(name, attrs):
+                    return sibling
+            node = node.next
+        return None
+
+
+class SelectorPage(SelectorNode):
+    """
+    Root of a selectolax-parsed ePER page. Like EPERPageStrainer, it exposes only the
+    blocks matched by the block selector (found by the C selector engine), so searches
+    never walk the rest of the document.
+    """
+    __slots__ = ('_tree', '_blocks')
+
+    def __init__(self, tree, selector=EPER_BLOCK_SELECTOR):
+        super().__init__(tree.root)
+        self._tree = tree # Keeps the parsed document alive as long as its nodes are used
+        matches = tree.css(selector) if tree.root is not None else []
+        match_ids = {node.mem_id for node in matches}
+        self._blocks = [node for node in matches if not self._inside_other_block(node, match_ids)]
+
+    @staticmethod
+    def _inside_other_block(node, match_ids):
+        parent = node.parent
+        while parent is not None:
+            if parent.mem_id in match_ids:
+                return True
+            parent = parent.parent
+        return False
+
+    @property
+    def name(self):
+        return '[document]'
+
+    @property
+    def text(self):
+        return ''.join(SelectorNode(block).text for block in self._blocks)
+
+    def _descendants(self):
+        for block in self._blocks:
+            yield SelectorNode(block)
+            yield from SelectorNode(block)._descendants()
+
+
+class SelectorParser:
+    """selectolax backend: a C HTML5 parser plus CSS selection of the ePER blocks."""
+    name = SELECTOLAX
+
+    def __init__(self):
+        if SelectolaxHTMLParser is None:
+            raise ImportError("The selectolax parser backend requires selectolax (pip install selectolax).")
+
+    def parse(self, html: str, pane_ids=EPER_PANE_IDS) -> SelectorPage:
+        selector = EPER_BLOCK_SELECTOR if pane_ids == EPER_PANE_IDS else eper_block_selector(pane_ids)
+        return SelectorPage(SelectolaxHTMLParser(html), selector)
+
+
+def create_parser(name: str):
+    """Creates the parser backend 'html.parser', 'lxml' or 'selectolax'."""
+    if name == SELECTOLAX:
+        return SelectorParser()
+    if name in (HTML_PARSER, LXML):
+        try:
+            return SoupParser(name)
+        except FeatureNotFound:
+            raise ImportError(f"The {name} parser backend requires the {name} package (pip install {name}).")
+    raise ValueError(f"Unknown ePER parser backend '{name}', expected one of {', '.join(PARSER_PREFERENCE)}.")
+
+
+def available_parsers() -> List[str]:
+    """Names of the parser backends whose libraries are installed, fastest first."""
+    names = []
+    for name in PARSER_PREFERENCE:
+        try:
+            create_parser(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+_parsers: Dict[str, object] = {}
+_default_parser = None
+_parsers_lock = threading.Lock()
+
+
+def get_parser(name: str):
+    """Returns the shared backend instance for 'name' (backends keep no per-page state)."""
+    with _parsers_lock:
+        if name not in _parsers:
+            _parsers[name] = create_parser(name)
+        return _parsers[name]
+
+
+def get_default_parser():
+    """
+    Returns the parser backend used by all EPERHandler instances in this process:
+    EPER_HTML_PARSER if set, otherwise the fastest installed backend.
+    """
+    global _default_parser
+    if _default_parser is None:
+        name = os.getenv('EPER_HTML_PARSER') or available_parsers()[0]
+        _default_parser = get_parser(name)
+    return _default_parser
+
+
+def configure_default_parser(name: str):
+    """Replaces the process-wide parser backend."""
+    global _default_parser
+    _default_parser = get_parser(name)
+    return _default_parser
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_ARCHIVE_PATH = 'eper_archive.sqlite3'
+
+RECORD = 'record'
+REPLAY = 'replay'
+ARCHIVE_MODES = (RECORD, REPLAY)
+
+
+class ArchivedResponse:
+    """Minimal stand-in for requests.Response, rebuilt from an archive entry."""
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes, encoding: str = 'utf-8'):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error (archived) for url: {self.url}", response=self)
+
+
+class HTTPArchive:
+    """
+    Record/replay archive of ePER HTTP responses.
+
+    In RECORD mode every response fetched by EPERHandler is stored with its URL, status,
+    headers and zlib-compressed body (the latest response per URL wins). In REPLAY mode
+    EPERHandler serves its pages from the archive only: no request is sent, no scraper
+    session is created and the rate limiter is skipped, so a recorded batch can be re-run
+    offline at full speed. URLs missing from the archive behave like failed requests.
+    """
+    def __init__(self, path: str = DEFAULT_ARCHIVE_PATH, mode: str = RECORD):
+        """
+        Args:
+            path (str): Path to the SQLite archive file.
+            mode (str): RECORD or REPLAY.
+        """
+        if mode not in ARCHIVE_MODES:
+            raise ValueError(f"Unknown archive mode '{mode}', expected one of {ARCHIVE_MODES}.")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY,"
+                " status INTEGER NOT NULL,"
+                " headers TEXT NOT NULL,"
+                " encoding TEXT,"
+                " body BLOB NOT NULL,"
+                " recorded_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def record(self, url: str, response):
+        """Stores the response (requests.Response or compatible) received for the requested URL."""
+        row = (
+            url, response.status_code, json.dumps(dict(response.headers)),
+            response.encoding, zlib.compress(response.content), time.time()
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, status, headers, encoding, body, recorded_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)", row
+            )
+            self._conn.commit()
+
+    def replay(self, url: str) -> Optional[ArchivedResponse]:
+        """Returns the archived response for a URL, or None if it was never recorded."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, encoding, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            logging.warning(f"No archived ePER response for {url}.")
+            return None
+        status, headers, encoding, body = row
+        return ArchivedResponse(url, status, json.loads(headers), zlib.decompress(body), encoding)
+
+    def count(self) -> int:
+        """Number of archived responses."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_archive = None
+_default_archive_configured = False
+_default_archive_lock = threading.Lock()
+
+
+def get_default_archive() -> Optional[HTTPArchive]:
+    """
+    Returns the process-wide archive used by all EPERHandler instances. Unless configured
+    at runtime it is set up from EPER_ARCHIVE_MODE ('record' or 'replay') and
+    EPER_ARCHIVE_PATH; None (no archive) if EPER_ARCHIVE_MODE is not set.
+    """
+    global _default_archive, _default_archive_configured
+    with _default_archive_lock:
+        if not _default_archive_configured:
+            mode = os.getenv('EPER_ARCHIVE_MODE')
+            if mode:
+                _default_archive = HTTPArchive(os.getenv('EPER_ARCHIVE_PATH', DEFAULT_ARCHIVE_PATH), mode=mode.lower())
+            _default_archive_configured = True
+        return _default_archive
+
+
+def configure_default_archive(path: str = DEFAULT_ARCHIVE_PATH, mode: Optional[str] = RECORD) -> Optional[HTTPArchive]:
+    """Replaces the process-wide archive; mode=None switches recording/replaying off."""
+    global _default_archive, _default_archive_configured
+    with _default_archive_lock:
+        if _default_archive is not None:
+            _default_archive.close()
+        _default_archive = HTTPArchive(path, mode=mode) if mode else None
+        _default_archive_configured = True
+        return _default_archive
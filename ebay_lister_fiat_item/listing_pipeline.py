@@ -0,0 +1,444 @@
+"""
+Staged pipeline that lists many parts with overlapping network stages.
+
+A listing needs an ePER lookup, a category lookup plus the drafted payload, and an
+AddItems call. Run one after the other, each stage idles while another waits on the
+network. StagedPipeline runs every stage in its own worker threads, connected by
+bounded queues, so a batch takes about as long as its slowest stage:
+
+    python -m ebay_lister_fiat_item.listing_pipeline parts.csv --output results.csv
+    python -m ebay_lister_fiat_item.listing_pipeline parts.csv --dry-run   # Draft only
+
+The CSV columns are the fields of the GUI form (see CSV_COLUMNS); columns missing from
+the file can be given for all rows with --set, e.g. --set shipping_profile_id=123.
+"""
+import argparse
+import csv
+import logging
+import queue
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .ebay_item import ADD_ITEMS_BATCH_SIZE, EBAYHandler
+from .scrape_open_eper import EPERHandler
+
+# Poll interval of blocked queue operations, so workers notice a stopped pipeline
+POLL_INTERVAL = 0.1
+
+_DONE = object() # End of the stream, one per worker of the receiving stage
+
+
+class PipelineStage:
+    """
+    One stage of a StagedPipeline.
+
+    func receives an item's current value and returns its next value. With batch_size > 1
+    it receives a list of up to batch_size values and returns a list of results in the same
+    order; an Exception in that list fails only its own item.
+    """
+    def __init__(self, name: str, func: Callable, workers: int = 1, batch_size: int = 1,
+                 queue_size: Optional[int] = None, linger: float = 0.0):
+        """
+        Args:
+            name (str): Name used in results and logs.
+            func (Callable): The work of the stage.
+            workers (int): Number of threads running func.
+            batch_size (int): Values per call of func.
+            queue_size (Optional[int]): Capacity of the queue in front of the stage;
+                                        defaults to twice the values its workers take at once.
+            linger (float): Seconds a worker waits to fill a batch before calling func with fewer values.
+        """
+        if workers < 1 or batch_size < 1:
+            raise ValueError("A pipeline stage needs at least one worker and a batch size of at least 1.")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size if queue_size is not None else 2 * workers * batch_size
+        self.linger = linger
+
+
+class PipelineResult:
+    """
+    An item on its way through a StagedPipeline. 'value' is the output of the last stage
+    that ran; if a stage failed, 'error' holds its exception, 'stage' its name, and the
+    later stages skip the item.
+    """
+    __slots__ = ('index', 'item', 'value', 'error', 'stage')
+
+    def __init__(self, index: int, item):
+        self.index = index
+        self.item = item
+        self.value = item
+        self.error = None
+        self.stage = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        status = f"failed in {self.stage}: {self.error!r}" if self.error else "ok"
+        return f"PipelineResult(index={self.index}, item={self.item!r}, {status})"
+
+
+def _put(target: queue.Queue, obj, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            target.put(obj, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(source: queue.Queue, stop: threading.Event, timeout: Optional[float] = None):
+    """Next object of the queue; None if the pipeline stopped or the timeout passed."""
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    while not stop.is_set():
+        wait = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, deadline - time.monotonic())
+        if wait <= 0:
+            return None
+        try:
+            return source.get(timeout=wait)
+        except queue.Empty:
+            continue
+    return None
+
+
+class StagedPipeline:
+    """
+    Runs items through a sequence of PipelineStages with their own worker threads.
+
+    * Backpressure: the queues between the stages are bounded, and at most max_in_flight
+      items are between reading the input and being yielded, so a slow stage or a slow
+      consumer also slows down reading the input instead of filling memory.
+    * Error isolation: an exception fails only the item (or, for a batch stage that raises
+      as a whole, the items of that call); all other items go on.
+    * Ordered output: run() yields one PipelineResult per input item in input order.
+    """
+    def __init__(self, stages: List[PipelineStage], max_in_flight: Optional[int] = None):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage.")
+        self.stages = list(stages)
+        self.max_in_flight = max_in_flight or sum(
+            stage.queue_size + stage.workers * stage.batch_size for stage in self.stages
+        )
+        self.stats = {}
+
+    def run(self, items: Iterable) -> Iterator[PipelineResult]:
+        """Yields the result of every item in input order. Leaving the loop early stops all workers."""
+        stop = threading.Event()
+        slots = threading.BoundedSemaphore(self.max_in_flight)
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages] + [queue.Queue()]
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        input_errors = []
+        self.stats = {stage.name: {'items': 0, 'calls': 0, 'busy_seconds': 0.0} for stage in self.stages}
+        stats_lock = threading.Lock()
+
+        def feed():
+            try:
+                for index, item in enumerate(items):
+                    while not slots.acquire(timeout=POLL_INTERVAL):
+                        if stop.is_set():
+                            return
+                    if not _put(queues[0], PipelineResult(index, item), stop):
+                        return
+            except Exception as e: # Reading the input failed; the items read so far still finish
+                input_errors.append(e)
+            finally:
+                for _ in range(self.stages[0].workers):
+                    if not _put(queues[0], _DONE, stop):
+                        break
+
+        def work(position):
+            stage = self.stages[position]
+            inbox, outbox = queues[position], queues[position + 1]
+            finished = False
+            while not finished:
+                first = _get(inbox, stop)
+                if first is None:
+                    return # Stopped
+                if first is _DONE:
+                    break
+                batch = [first]
+                deadline = time.monotonic() + stage.linger
+                while len(batch) < stage.batch_size:
+                    left = deadline - time.monotonic()
+                    following = _get(inbox, stop, timeout=left) if left > 0 else self._get_nowait(inbox)
+                    if following is None:
+                        break
+                    if following is _DONE:
+                        finished = True
+                        break
+                    batch.append(following)
+                self._process(stage, batch, stats_lock)
+                for result in batch:
+                    if not _put(outbox, result, stop):
+                        return
+            with remaining_lock:
+                remaining[position] -= 1
+                last = remaining[position] == 0
+            if last: # Pass the end of the stream on to every worker of the next stage
+                next_workers = self.stages[position + 1].workers if position + 1 < len(self.stages) else 1
+                for _ in range(next_workers):
+                    if not _put(outbox, _DONE, stop):
+                        return
+
+        threads = [threading.Thread(target=feed, name='pipeline-input', daemon=True)]
+        for position, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=work, args=(position,), name=f"pipeline-{stage.name}-{n}", daemon=True)
+                for n in range(stage.workers)
+            )
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        pending = {}
+        next_index = 0
+        try:
+            while True:
+                result = _get(queues[-1], stop)
+                if result is None or result is _DONE:
+                    break
+                pending[result.index] = result
+                while next_index in pending:
+                    slots.release()
+                    yield pending.pop(next_index)
+                    next_index += 1
+            if input_errors:
+                raise input_errors[0]
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self._log_stats(next_index, time.perf_counter() - started)
+
+    @staticmethod
+    def _get_nowait(inbox: queue.Queue):
+        try:
+            return inbox.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _process(self, stage: PipelineStage, batch: List[PipelineResult], stats_lock: threading.Lock):
+        live = [result for result in batch if result.error is None]
+        if not live:
+            return
+        started = time.perf_counter()
+        if stage.batch_size == 1:
+            result = live[0]
+            try:
+                result.value = stage.func(result.value)
+            except Exception as e:
+                self._fail(result, stage, e)
+        else:
+            try:
+                outputs = list(stage.func([result.value for result in live]))
+                if len(outputs) != len(live):
+                    raise ValueError(f"Stage {stage.name} returned {len(outputs)} results for {len(live)} items.")
+            except Exception as e:
+                outputs = [e] * len(live)
+            for result, output in zip(live, outputs):
+                if isinstance(output, Exception):
+                    self._fail(result, stage, output)
+                else:
+                    result.value = output
+        with stats_lock:
+            stats = self.stats[stage.name]
+            stats['items'] += len(live)
+            stats['calls'] += 1
+            stats['busy_seconds'] += time.perf_counter() - started
+
+    @staticmethod
+    def _fail(result: PipelineResult, stage: PipelineStage, error: Exception):
+        result.error = error
+        result.stage = stage.name
+        logging.error(f"Pipeline item {result.index} ({result.item!r}) failed in stage {stage.name}: {error}")
+
+    def _log_stats(self, finished: int, elapsed: float):
+        parts = []
+        for stage in self.stages:
+            stats = self.stats[stage.name]
+            # Busy time per worker: the stage with the highest value limits the throughput
+            parts.append(f"{stage.name}: {stats['items']} item(s) in {stats['calls']} call(s), "
+                         f"{stats['busy_seconds'] / stage.workers:.1f}s busy per worker")
+        logging.info(f"Pipeline finished {finished} item(s) in {elapsed:.1f}s ({'; '.join(parts)}).")
+
+
+# CSV column (the field names of the GUI form) -> draft_item_payload keyword
+CSV_COLUMNS = {
+    'part_number': 'part_number_str',
+    'quantity': 'quantity',
+    'condition_id': 'condition_id',
+    'sku': 'sku',
+    'shipping_profile_id': 'shipping_profile_id_val',
+    'payment_profile_id': 'payment_profile_id_val',
+    'return_profile_id': 'return_profile_id_val',
+    'item_location': 'item_location',
+    'country_code': 'country_code',
+    'currency_code': 'currency_code',
+    'dispatch_time_max': 'dispatch_time_max',
+    'vat_percent': 'vat_percent',
+    'picture_urls': 'picture_urls',
+    'manufacturer_override': 'manufacturer_override',
+    'title_override': 'title_override',
+    'description_override': 'description_override',
+}
+OPTIONAL_COLUMNS = ('picture_urls', 'manufacturer_override', 'title_override', 'description_override', 'vat_percent')
+
+
+def draft_arguments(row: Dict) -> Dict:
+    """Converts a CSV row (see CSV_COLUMNS) into keyword arguments for draft_item_payload."""
+    missing = [column for column in CSV_COLUMNS if column not in OPTIONAL_COLUMNS and not row.get(column)]
+    if missing:
+        raise ValueError(f"Listing row is missing {', '.join(missing)}.")
+    arguments = {keyword: row.get(column) or None for column, keyword in CSV_COLUMNS.items()}
+    arguments['quantity'] = int(row['quantity'])
+    arguments['vat_percent'] = float(row['vat_percent']) if row.get('vat_percent') else 0.0
+    pictures = row.get('picture_urls')
+    if isinstance(pictures, str): # Several URLs are separated by '|'
+        pictures = [url.strip() for url in pictures.split('|') if url.strip()]
+    arguments['picture_urls'] = pictures or None
+    return arguments
+
+
+def read_listing_csv(path: str, defaults: Optional[Dict] = None) -> Iterator[Dict]:
+    """Yields the rows of a listing CSV, completed with 'defaults' where a column is empty or missing."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            merged = dict(defaults or {})
+            merged.update({key.strip(): value.strip() for key, value in row.items()
+                           if key and isinstance(value, str) and value.strip()})
+            yield merged
+
+
+# Worker threads per stage: ePER fetches wait on the rate limiter and the network, category
+# searches on the Finding API, and each submit worker sends one AddItems call at a time.
+DEFAULT_EPER_WORKERS = 8
+DEFAULT_CATEGORY_WORKERS = 4
+DEFAULT_SUBMIT_WORKERS = 2
+
+
+class ListingPipeline:
+    """
+    Lists parts from rows like those of a listing CSV in three overlapping stages:
+
+    * 'eper': EPERHandler lookup of the part number,
+    * 'category': category (offline match, cache or search) and draft_item_payload,
+    * 'submit': EBAYHandler.create_items with up to 5 items per AddItems call.
+
+    With submit=False the pipeline stops after drafting and yields the payloads.
+    """
+    def __init__(self, ebay_handler, eper_workers: int = DEFAULT_EPER_WORKERS,
+                 category_workers: int = DEFAULT_CATEGORY_WORKERS, submit_workers: int = DEFAULT_SUBMIT_WORKERS,
+                 submit: bool = True, eper_options: Optional[Dict] = None, max_in_flight: Optional[int] = None):
+        """
+        Args:
+            ebay_handler (EBAYHandler): Handler used for categories, drafts and listing.
+            eper_workers (int): Parallel ePER lookups.
+            category_workers (int): Parallel category lookups and drafts.
+            submit_workers (int): Parallel AddItems calls.
+            submit (bool): False drafts the payloads without listing them.
+            eper_options (Optional[Dict]): Keyword arguments for every EPERHandler (e.g. cache).
+            max_in_flight (Optional[int]): Upper bound of rows read but not yet yielded.
+        """
+        self.ebay_handler = ebay_handler
+        self.eper_options = dict(eper_options or {})
+        stages = [
+            PipelineStage('eper', self._fetch, workers=eper_workers),
+            PipelineStage('category', self._draft, workers=category_workers),
+        ]
+        if submit:
+            stages.append(PipelineStage('submit', self._submit, workers=submit_workers,
+                                        batch_size=ADD_ITEMS_BATCH_SIZE, linger=1.0))
+        self.pipeline = StagedPipeline(stages, max_in_flight=max_in_flight)
+
+    def _fetch(self, row: Dict):
+        arguments = draft_arguments(row) # Reject incomplete rows before any request
+        handler = EPERHandler(arguments['part_number_str'], **self.eper_options)
+        handler.data # Lookup errors fail the row here
+        return arguments, handler
+
+    def _draft(self, job) -> dict:
+        arguments, handler = job
+        return self.ebay_handler.draft_item_payload(eper_handler=handler, **arguments)
+
+    def _submit(self, payloads: List[dict]) -> List[Dict]:
+        skus = [payload['Item']['SKU'] for payload in payloads]
+        duplicates = {sku for sku in skus if skus.count(sku) > 1}
+        unique = [payload for payload, sku in zip(payloads, skus) if sku not in duplicates]
+        results = self.ebay_handler.create_items(unique) if unique else {}
+        return [ValueError(f"SKU {sku} occurs more than once in the batch.") if sku in duplicates else results[sku]
+                for sku in skus]
+
+    def run(self, rows: Iterable[Dict]) -> Iterator[PipelineResult]:
+        """
+        Yields a PipelineResult per row in input order. Its value is the create_items
+        result ({'sku', 'item_id', 'ack', 'errors'}), or the payload with submit=False.
+        """
+        return self.pipeline.run(rows)
+
+
+RESULT_COLUMNS = ('part_number', 'sku', 'status', 'item_id', 'error')
+
+
+def _result_row(result: PipelineResult) -> Dict:
+    row = result.item
+    if not result.ok:
+        return {'part_number': row.get('part_number'), 'sku': row.get('sku'), 'status': f"failed:{result.stage}",
+                'item_id': '', 'error': str(result.error)}
+    value = result.value
+    if 'ack' not in value: # Dry run: a drafted payload
+        return {'part_number': row.get('part_number'), 'sku': row.get('sku'), 'status': 'drafted',
+                'item_id': '', 'error': ''}
+    errors = '; '.join(str(error.get('LongMessage') or error.get('ShortMessage')) for error in value['errors'])
+    return {'part_number': row.get('part_number'), 'sku': row.get('sku'), 'status': value['ack'],
+            'item_id': value['item_id'] or '', 'error': errors}
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="List the parts of a CSV file on eBay.")
+    arg_parser.add_argument('csv', help="Listing CSV with the columns of the GUI form (part_number, sku, ...).")
+    arg_parser.add_argument('--output', help="Write one result row per part to this CSV file.")
+    arg_parser.add_argument('--set', action='append', default=[], metavar='COLUMN=VALUE',
+                            help="Value for a column missing or empty in the CSV (repeatable).")
+    arg_parser.add_argument('--dry-run', action='store_true', help="Draft the payloads without listing them.")
+    arg_parser.add_argument('--eper-workers', type=int, default=DEFAULT_EPER_WORKERS)
+    arg_parser.add_argument('--category-workers', type=int, default=DEFAULT_CATEGORY_WORKERS)
+    arg_parser.add_argument('--submit-workers', type=int, default=DEFAULT_SUBMIT_WORKERS)
+    arg_parser.add_argument('--dotenv', help="Path to the .env file with the eBay API credentials.")
+    args = arg_parser.parse_args(argv)
+
+    defaults = {}
+    for assignment in args.set:
+        column, _, value = assignment.partition('=')
+        defaults[column.strip()] = value.strip()
+
+    pipeline = ListingPipeline(EBAYHandler(dotenv_path=args.dotenv), eper_workers=args.eper_workers,
+                               category_workers=args.category_workers, submit_workers=args.submit_workers,
+                               submit=not args.dry_run)
+    failed = 0
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else None
+    try:
+        writer = csv.DictWriter(output, fieldnames=RESULT_COLUMNS) if output else None
+        if writer:
+            writer.writeheader()
+        for result in pipeline.run(read_listing_csv(args.csv, defaults)):
+            row = _result_row(result)
+            failed += row['status'].startswith('failed') or row['status'] == 'Failure'
+            if writer:
+                writer.writerow(row)
+            print(f"{row['sku']}: {row['status']} {row['item_id']} {row['error']}".rstrip())
+    finally:
+        if output:
+            output.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
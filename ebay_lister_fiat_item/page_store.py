@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import List, Optional
+
+try:
+    import zstandard
+except ImportError: # Optional dependency, zlib is used instead
+    zstandard = None
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024 # Budget for the compressed pages
+ZSTD = 'zstd'
+ZLIB = 'zlib'
+
+
+def _compress(data: bytes):
+    if zstandard is not None:
+        return ZSTD, zstandard.ZstdCompressor(level=10).compress(data)
+    return ZLIB, zlib.compress(data, 9)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Page was stored with zstd, but the zstandard package is not installed.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class PageStore:
+    """
+    Compressed, content-addressed store of raw ePER page HTML.
+
+    Pages are keyed by the SHA-256 of their HTML, so identical pages (e.g. the same
+    "not found" page for many part numbers, or a part fetched again without changes)
+    are stored once. Bodies are compressed with zstd if the zstandard package is
+    installed, otherwise with zlib. When the compressed bodies exceed 'max_bytes', the
+    least recently used ones are evicted together with the part numbers pointing to them.
+
+    Keeping the raw pages lets EPERHandler.reextract_from_store rebuild all records
+    after a change to the extractors without scraping ePER again.
+    """
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        """
+        Args:
+            path (str): Path to the SQLite file.
+            max_bytes (Optional[int]): Byte budget for compressed pages. Defaults to
+                                       EPER_PAGE_STORE_BYTES or DEFAULT_MAX_BYTES.
+        """
+        self.path = path
+        self.max_bytes = int(max_bytes if max_bytes is not None else os.getenv('EPER_PAGE_STORE_BYTES', DEFAULT_MAX_BYTES))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS page_blobs ("
+                " hash TEXT PRIMARY KEY,"
+                " codec TEXT NOT NULL,"
+                " body BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS page_refs ("
+                " part_number TEXT PRIMARY KEY,"
+                " hash TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS page_refs_hash ON page_refs (hash)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS page_blobs_last_used ON page_blobs (last_used)")
+            self._conn.commit()
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_blobs").fetchone()[0]
+
+    def put(self, part_number: str, html: str, fetched_at: Optional[float] = None) -> str:
+        """Stores the page of a part number and returns its content hash."""
+        raw = html.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        now = time.time()
+        fetched_at = now if fetched_at is None else fetched_at
+        with self._lock:
+            with self._conn:
+                updated = self._conn.execute(
+                    "UPDATE page_blobs SET last_used = ? WHERE hash = ?", (now, digest)
+                ).rowcount
+                if not updated:
+                    codec, body = _compress(raw)
+                    self._conn.execute(
+                        "INSERT INTO page_blobs (hash, codec, body, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                        (digest, codec, body, len(body), now)
+                    )
+                    self._total_bytes += len(body)
+                old_hash = self._conn.execute(
+                    "SELECT hash FROM page_refs WHERE part_number = ?", (part_number,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO page_refs (part_number, hash, fetched_at) VALUES (?, ?, ?)",
+                    (part_number, digest, fetched_at)
+                )
+                if old_hash and old_hash[0] != digest:
+                    self._drop_unreferenced_blob(old_hash[0])
+                self._evict()
+        return digest
+
+    def _drop_unreferenced_blob(self, digest: str):
+        still_used = self._conn.execute("SELECT 1 FROM page_refs WHERE hash = ? LIMIT 1", (digest,)).fetchone()
+        if not still_used:
+            size = self._conn.execute("SELECT size FROM page_blobs WHERE hash = ?", (digest,)).fetchone()
+            if size:
+                self._conn.execute("DELETE FROM page_blobs WHERE hash = ?", (digest,))
+                self._total_bytes -= size[0]
+
+    def _evict(self):
+        """Removes least recently used pages until the budget is met. Caller holds the lock."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Other processes may share the file, so recount before evicting
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_blobs").fetchone()[0]
+        evicted = 0
+        for digest, size in self._conn.execute("SELECT hash, size FROM page_blobs ORDER BY last_used").fetchall():
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM page_refs WHERE hash = ?", (digest,))
+            self._conn.execute("DELETE FROM page_blobs WHERE hash = ?", (digest,))
+            self._total_bytes -= size
+            evicted += 1
+        logging.info(f"Page store over budget: evicted {evicted} page(s), {self._total_bytes} bytes left.")
+
+    def get(self, part_number: str, touch: bool = True) -> Optional[str]:
+        """Returns the stored HTML of a part number, or None. 'touch' marks the page as recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.hash, b.codec, b.body FROM page_refs r JOIN page_blobs b ON b.hash = r.hash"
+                " WHERE r.part_number = ?", (part_number,)
+            ).fetchone()
+            if row is None:
+                return None
+            digest, codec, body = row
+            if touch:
+                self._conn.execute("UPDATE page_blobs SET last_used = ? WHERE hash = ?", (time.time(), digest))
+                self._conn.commit()
+        return _decompress(codec, body).decode('utf-8')
+
+    def fetched_at(self, part_number: str) -> Optional[float]:
+        """When the stored page of a part number was fetched from ePER, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at FROM page_refs WHERE part_number = ?", (part_number,)).fetchone()
+        return row[0] if row else None
+
+    def part_numbers(self) -> List[str]:
+        """All part numbers with a stored page."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT part_number FROM page_refs ORDER BY part_number")]
+
+    @property
+    def total_bytes(self) -> int:
+        """Size of all compressed pages in bytes."""
+        with self._lock:
+            return self._total_bytes
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,149 @@
+"""
+Benchmark of the ePER parser backends (see html_parsers.py).
+
+Every installed backend parses the same corpus of saved ePER pages and runs the
+extractors on it. The script checks that all backends extract identical fields and
+reports parse+extract time and peak memory per backend:
+
+    python -m ebay_lister_fiat_item.parser_benchmark                  # Pages in eper_cache.sqlite3
+    python -m ebay_lister_fiat_item.parser_benchmark --pages ./html   # A directory of *.html files
+
+Each backend runs in its own process, so the peak RSS of one does not hide the next.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError: # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+from .eper_cache import DEFAULT_CACHE_PATH
+from .html_parsers import available_parsers, get_parser
+from .page_store import PageStore
+from .scrape_open_eper import EPERHandler, CAR_BRANDS_DATA, FITMENT_MATCHER
+
+
+def load_corpus(pages: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+    """
+    Returns (name, html) pairs from a directory of *.html files or, by default, from the
+    PageStore in the cache file.
+    """
+    if pages and os.path.isdir(pages):
+        paths = sorted(glob.glob(os.path.join(pages, '*.html')))[:limit]
+        corpus = []
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                corpus.append((os.path.basename(path), f.read()))
+        return corpus
+    store = PageStore(pages or os.getenv('EPER_CACHE_PATH', DEFAULT_CACHE_PATH))
+    try:
+        part_numbers = store.part_numbers()[:limit]
+        return [(num, html) for num, html in ((num, store.get(num, touch=False)) for num in part_numbers) if html]
+    finally:
+        store.close()
+
+
+def _extract_all(parser, corpus):
+    extractor = EPERHandler.__new__(EPERHandler)
+    extractor.car_brands = CAR_BRANDS_DATA
+    extractor.fitment_matcher = FITMENT_MATCHER
+    results = []
+    for _, html in corpus:
+        soup = parser.parse(html)
+        results.append(extractor._extract_page_fields(soup) if EPERHandler._is_part_page(soup) else None)
+    return results
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024 # Bytes on macOS, KiB elsewhere
+
+
+def run_backend(name: str, corpus: List[Tuple[str, str]], repeat: int = 3) -> Dict:
+    """Parses and extracts the corpus 'repeat' times with one backend; returns timings, memory and fields."""
+    parser = get_parser(name)
+    rss_before = _peak_rss_bytes()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = _extract_all(parser, corpus)
+        timings.append(time.perf_counter() - started)
+    rss_after = _peak_rss_bytes()
+
+    # Separate pass: tracing Python allocations slows parsing down too much for the timings
+    tracemalloc.start()
+    _extract_all(parser, corpus)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'backend': name,
+        'best_seconds': min(timings),
+        'ms_per_page': 1000 * min(timings) / max(1, len(corpus)),
+        'traced_peak_bytes': traced_peak,
+        'rss_growth_bytes': rss_after - rss_before if rss_before is not None else None,
+        'results': results,
+    }
+
+
+def compare_results(reports: List[Dict], corpus: List[Tuple[str, str]]) -> List[str]:
+    """Returns one message per page on which a backend extracts other fields than the first backend."""
+    mismatches = []
+    reference = reports[0]
+    for report in reports[1:]:
+        for (page_name, _), expected, actual in zip(corpus, reference['results'], report['results']):
+            if expected != actual:
+                mismatches.append(f"{page_name}: {report['backend']} differs from {reference['backend']}: "
+                                  f"{actual!r} != {expected!r}")
+    return mismatches
+
+
+def _format_bytes(value: Optional[int]) -> str:
+    return f"{value / (1024 * 1024):.1f} MiB" if value is not None else "n/a"
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmark the ePER HTML parser backends.")
+    arg_parser.add_argument('--pages', help="Directory of *.html files or cache file with a page store.")
+    arg_parser.add_argument('--limit', type=int, help="Use at most this many pages.")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Timed runs per backend (best is reported).")
+    arg_parser.add_argument('--backends', nargs='+', default=None, help="Backends to compare (default: all installed).")
+    args = arg_parser.parse_args(argv)
+
+    corpus = load_corpus(args.pages, args.limit)
+    if not corpus:
+        print("No ePER pages found; fetch some parts first or pass --pages.")
+        return 1
+    backends = args.backends or list(reversed(available_parsers())) # Reference first: html.parser
+    print(f"{len(corpus)} page(s), {sum(len(html) for _, html in corpus) / 1024:.0f} KiB of HTML, "
+          f"backends: {', '.join(backends)}")
+
+    reports = []
+    for name in backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            reports.append(executor.submit(run_backend, name, corpus, args.repeat).result())
+
+    print(f"{'backend':<12} {'total':>10} {'per page':>10} {'py peak':>12} {'rss growth':>12}")
+    for report in reports:
+        print(f"{report['backend']:<12} {report['best_seconds']:>9.3f}s {report['ms_per_page']:>8.2f}ms "
+              f"{_format_bytes(report['traced_peak_bytes']):>12} {_format_bytes(report['rss_growth_bytes']):>12}")
+
+    mismatches = compare_results(reports, corpus)
+    for message in mismatches:
+        print(f"MISMATCH {message}")
+    if not mismatches:
+        print("All backends extracted identical fields.")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
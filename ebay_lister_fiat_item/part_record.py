@@ -0,0 +1,175 @@
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, Optional
+
+# Keys of the dict that get_part_details used to return; PartRecord still answers to them
+LEGACY_KEYS = ('part_number', 'eper_price_str', 'weight_kg', 'fitting_cars', 'comparison_numbers',
+               'title', 'title_base_description')
+
+
+def _parse_price(price_str) -> Optional[float]:
+    return float(price_str) if price_str else None
+
+
+def _parse_weight(weight_str) -> Optional[float]:
+    # '0' was the placeholder for an unknown weight
+    return float(weight_str) if weight_str and weight_str != '0' else None
+
+
+class PartRecord(Mapping):
+    """
+    Compact, immutable result of EPERHandler.get_part_details.
+
+    Price and weight are floats (None if ePER has none), the fitting cars and comparison
+    numbers are tuples and the fitting car names are interned, since the same few hundred
+    "BRAND MODEL" strings occur in most parts. The German summary ('title_base_description')
+    is not stored but rendered from the fields when it is read.
+
+    For compatibility the record is also a read-only mapping with the keys of the old
+    dict (LEGACY_KEYS), which return the old representations: record['eper_price_str']
+    is the price string as extracted ('12.5' stays '12.5'), record['weight_kg'] is '0.5'
+    or '0', the lists are lists again.
+    """
+    __slots__ = ('part_number', 'price', 'weight_kg', 'fitting_cars', 'comparison_numbers', 'title', 'description',
+                 '_price_str')
+
+    def __init__(self, part_number: str, price: Optional[float] = None, weight_kg: Optional[float] = None,
+                 fitting_cars: Iterable[str] = (), comparison_numbers: Iterable[str] = (), title: str = "",
+                 description: Optional[str] = None, price_str: Optional[str] = None):
+        """
+        Args:
+            part_number (str): The requested part number.
+            price (Optional[float]): Price in EUR, None if unknown.
+            weight_kg (Optional[float]): Weight in kilograms, None if unknown.
+            fitting_cars (Iterable[str]): "BRAND MODEL" entries.
+            comparison_numbers (Iterable[str]): The part number, its previous and replacement numbers.
+            title (str): Short title, e.g. for eBay (max. 80 characters).
+            description (Optional[str]): The ePER description; "" if ePER has none,
+                None if the part's ePER page could not be fetched at all.
+            price_str (Optional[str]): The price string as extracted; defaults to 'price'
+                with two decimals.
+        """
+        self.part_number = part_number
+        self.price = price
+        self.weight_kg = weight_kg
+        self.fitting_cars = tuple(sys.intern(car) for car in fitting_cars)
+        self.comparison_numbers = tuple(comparison_numbers)
+        self.title = title
+        self.description = description
+        self._price_str = price_str if price is not None else None
+
+    @property
+    def price_str(self) -> Optional[str]:
+        """The price in the old string form, as extracted from ePER ('12.34'), or None."""
+        if self._price_str is not None:
+            return self._price_str
+        return f"{self.price:.2f}" if self.price is not None else None
+
+    @property
+    def weight_str(self) -> str:
+        """The weight in the old string form ('0.5'), '0' if unknown."""
+        return str(self.weight_kg) if self.weight_kg is not None else '0'
+
+    @property
+    def title_base_description(self) -> str:
+        """Multi-line German summary of all data found for the part."""
+        if self.description is None:
+            return "\n".join([
+                f"Bezeichnung: {self.title}",
+                f"Teilenummer: {self.part_number}",
+                "Preis (EUR): Nicht verfügbar",
+                "Gewicht: Nicht verfügbar",
+                "Passende Fahrzeuge: Keine Daten",
+                f"Vergleichsnummern: {len(self.comparison_numbers)} (nur angefragte Nummer)",
+            ])
+
+        summary_lines = [
+            f"Bezeichnung (ePER): {self.description or 'Nicht spezifiziert'}",
+            f"Teilenummer (Anfrage): {self.part_number}",
+            f"Preis (EUR): {self.price_str or 'Nicht verfügbar'}",
+            f"Gewicht: {self.weight_str + ' kg' if self.weight_kg is not None else 'Nicht verfügbar'}",
+        ]
+
+        fitting_cars = self.fitting_cars
+        if fitting_cars:
+            car_examples = ", ".join(fitting_cars[:3]) # Show up to 3 examples
+            summary_lines.append(f"Passende Fahrzeuge: {len(fitting_cars)} Modell(e) "
+                                 f"(z.B. {car_examples}{'...' if len(fitting_cars) > 3 else ''})")
+        else:
+            summary_lines.append("Passende Fahrzeuge: Keine Daten")
+
+        comparison_numbers = self.comparison_numbers
+        if comparison_numbers:
+            # The requested part number itself is left out of the examples
+            examples = [num for num in comparison_numbers if num != self.part_number][:3]
+            comp_display_text = f"{len(comparison_numbers)} Nummer(n) gefunden"
+            if examples:
+                more = '...' if len(comparison_numbers) > 3 and len(examples) == 3 else ''
+                comp_display_text += f" (inkl. {', '.join(examples)}{more})"
+            elif len(comparison_numbers) == 1 and comparison_numbers[0] == self.part_number:
+                comp_display_text = "1 (nur angefragte Nummer)"
+            summary_lines.append(f"Vergleichs-/Ersatznummern: {comp_display_text}")
+        else:
+            summary_lines.append("Vergleichs-/Ersatznummern: Keine Daten")
+        return "\n".join(summary_lines)
+
+    def __getitem__(self, key):
+        if key == 'eper_price_str':
+            return self.price_str
+        if key == 'weight_kg':
+            return self.weight_str
+        if key in ('fitting_cars', 'comparison_numbers'):
+            return list(getattr(self, key))
+        if key in ('part_number', 'title', 'title_base_description'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(LEGACY_KEYS)
+
+    def __len__(self):
+        return len(LEGACY_KEYS)
+
+    def __eq__(self, other):
+        if isinstance(other, PartRecord):
+            return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"PartRecord(part_number={self.part_number!r}, price={self.price!r}, weight_kg={self.weight_kg!r}, "
+                f"title={self.title!r}, {len(self.fitting_cars)} fitting car(s), "
+                f"{len(self.comparison_numbers)} comparison number(s))")
+
+    def to_dict(self) -> Dict:
+        """The old dict form, including the rendered summary."""
+        return {key: self[key] for key in LEGACY_KEYS}
+
+    def to_cache_fields(self) -> Dict:
+        """The fields stored in EPERCache (part scope); the summary is not stored but rendered again."""
+        return {
+            'part_number': self.part_number, 'eper_price_str': self.price_str, 'weight_kg': self.weight_str,
+            'fitting_cars': list(self.fitting_cars), 'comparison_numbers': list(self.comparison_numbers),
+            'title': self.title, 'description': self.description,
+        }
+
+    @classmethod
+    def from_cache_fields(cls, fields: Dict) -> 'PartRecord':
+        """Inverse of to_cache_fields. Missing fields (field-selective lookups) stay empty."""
+        return cls(
+            fields['part_number'], price=_parse_price(fields.get('eper_price_str')),
+            price_str=fields.get('eper_price_str'),
+            weight_kg=_parse_weight(fields.get('weight_kg')), fitting_cars=fields.get('fitting_cars', ()),
+            comparison_numbers=fields.get('comparison_numbers', ()), title=fields.get('title', ""),
+            description=fields.get('description'),
+        )
+
+    @classmethod
+    def from_strings(cls, part_number: str, price_str: Optional[str], weight_str: Optional[str],
+                     fitting_cars: Iterable[str], comparison_numbers: Iterable[str], title: str,
+                     description: Optional[str]) -> 'PartRecord':
+        """Builds a record from the string values extracted from ePER pages."""
+        return cls(part_number, price=_parse_price(price_str), price_str=price_str, weight_kg=_parse_weight(weight_str),
+                   fitting_cars=fitting_cars, comparison_numbers=comparison_numbers, title=title,
+                   description=description)
@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+# Defaults match the old average of one request every two seconds, but allow
+# short bursts instead of sleeping before every single request.
+DEFAULT_REQUESTS_PER_SECOND = 0.5
+DEFAULT_BURST = 2
+DEFAULT_JITTER = 0.5  # Max. extra random delay in seconds
+
+
+class TokenBucketLimiter:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    The bucket holds up to 'burst' tokens and refills at 'rate' tokens per second.
+    Every request takes one token; if none is left, acquire() sleeps exactly until
+    the caller's token has been refilled. Callers are served in arrival order
+    because waiting requests reserve their token in advance.
+    """
+    def __init__(self, rate: float = DEFAULT_REQUESTS_PER_SECOND, burst: int = DEFAULT_BURST,
+                 jitter: float = 0.0):
+        """
+        Args:
+            rate (float): Requests per second.
+            burst (int): Number of requests that may be sent back-to-back after an idle period.
+            jitter (float): Max. random extra delay in seconds added to every request.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate limiter needs rate > 0 and burst >= 1.")
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    def _reserve(self, now: float, tokens: float, updated_at: float):
+        """Takes one token and returns (wait_seconds, tokens_left, updated_at)."""
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate) - 1
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return wait, tokens, now
+
+    def reserve(self) -> float:
+        """Takes one token and returns the number of seconds the caller has to wait for it."""
+        with self._lock:
+            wait, self._tokens, self._updated_at = self._reserve(time.monotonic(), self._tokens, self._updated_at)
+        return wait
+
+    def next_delay(self) -> float:
+        """Takes one token and returns the delay (including jitter) before the request may be sent."""
+        wait = self.reserve()
+        if self.jitter:
+            wait += random.uniform(0, self.jitter)
+        return wait
+
+    def acquire(self):
+        """Blocks until the next request may be sent."""
+        wait = self.next_delay()
+        if wait > 0:
+            logging.debug(f"Rate limiter: waiting {wait:.2f}s before next ePER request.")
+            time.sleep(wait)
+
+
+class FileTokenBucketLimiter(TokenBucketLimiter):
+    """
+    Token-bucket limiter whose state lives in a small file guarded by an OS file lock.
+
+    All processes on the machine that use the same 'path' share one combined budget.
+    Wall-clock time is used so the timestamps are comparable between processes.
+    """
+    def __init__(self, path: str, rate: float = DEFAULT_REQUESTS_PER_SECOND, burst: int = DEFAULT_BURST,
+                 jitter: float = 0.0):
+        super().__init__(rate=rate, burst=burst, jitter=jitter)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _lock_file(handle):
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+
+    @staticmethod
+    def _unlock_file(handle):
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def reserve(self) -> float:
+        with self._lock, open(self.path, 'a+') as handle:
+            self._lock_file(handle)
+            try:
+                handle.seek(0)
+                try:
+                    state = json.loads(handle.read() or '{}')
+                except ValueError:
+                    state = {}
+                now = time.time()
+                wait, tokens, updated_at = self._reserve(
+                    now, state.get('tokens', float(self.burst)), state.get('updated_at', now)
+                )
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps({'tokens': tokens, 'updated_at': updated_at}))
+                handle.flush()
+            finally:
+                self._unlock_file(handle)
+        return wait
+
+
+def create_limiter(rate: float = DEFAULT_REQUESTS_PER_SECOND, burst: int = DEFAULT_BURST,
+                   jitter: float = DEFAULT_JITTER, lock_path: Optional[str] = None) -> TokenBucketLimiter:
+    """Creates an in-process limiter, or a cross-process one if 'lock_path' is given."""
+    if lock_path:
+        return FileTokenBucketLimiter(lock_path, rate=rate, burst=burst, jitter=jitter)
+    return TokenBucketLimiter(rate=rate, burst=burst, jitter=jitter)
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_default_limiter() -> TokenBucketLimiter:
+    """
+    Returns the limiter shared by all EPERHandler instances in this process.
+    It is configured from EPER_REQUESTS_PER_SECOND, EPER_BURST, EPER_JITTER and,
+    for a budget shared between processes, EPER_RATE_LIMIT_FILE.
+    """
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = create_limiter(
+                rate=float(os.getenv('EPER_REQUESTS_PER_SECOND', DEFAULT_REQUESTS_PER_SECOND)),
+                burst=int(os.getenv('EPER_BURST', DEFAULT_BURST)),
+                jitter=float(os.getenv('EPER_JITTER', DEFAULT_JITTER)),
+                lock_path=os.getenv('EPER_RATE_LIMIT_FILE')
+            )
+        return _default_limiter
+
+
+def configure_default_limiter(rate: float = DEFAULT_REQUESTS_PER_SECOND, burst: int = DEFAULT_BURST,
+                              jitter: float = DEFAULT_JITTER, lock_path: Optional[str] = None) -> TokenBucketLimiter:
+    """Replaces the process-wide limiter, e.g. to raise the rate for a batch run."""
+    global _default_limiter
+    with _default_limiter_lock:
+        _default_limiter = create_limiter(rate=rate, burst=burst, jitter=jitter, lock_path=lock_path)
+        return _default_limiter
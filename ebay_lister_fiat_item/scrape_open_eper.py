@@ -1,10 +1,20 @@
 import requests
-from bs4 import BeautifulSoup
 import logging
 import re
+import threading
 import time
-import cloudscraper
-import random
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from .eper_cache import get_default_cache, get_replay_cache, NOT_FOUND, TRANSIENT_FAILURE
+from .scraper_pool import get_default_pool
+from .rate_limit import get_default_limiter
+from .http_archive import get_default_archive
+from .page_store import PageStore
+from .fitment import FitmentMatcher
+from .single_flight import SingleFlight
+from .part_record import PartRecord
+from .throttle import THROTTLE_STATUS_CODES, get_default_throttle, retry_after_seconds
+from .html_parsers import EPER_PANE_IDS, _is_eper_block, get_default_parser, get_parser
 
 # --- (CAR_BRANDS_DATA should be defined globally here) ---
 CAR_BRANDS_DATA = {
@@ -17,13 +27,113 @@ CAR_BRANDS_DATA = {
     'IVECO': ['DAILY', 'EUROCARGO', 'STRALIS', 'TRAKKER', 'S-WAY', 'MASSIF']
 }
 
+# Compiled once; shared by all handlers and usable on its own for fitment lookups
+FITMENT_MATCHER = FitmentMatcher(CAR_BRANDS_DATA)
+
+DEFAULT_MAX_WORKERS = 4 # Parallel ePER fetches per replacement-chain level
+
+EPER_PART_URL = "https://eper.fiatforum.com/Part/SearchPartByPartNumber?language=en&PartNumber={part_number}"
+
+def normalize_part_number(part_number):
+    """Canonical form of a part number for de-duplication (' 46 5 1234 ' -> '4651234')."""
+    return "".join(str(part_number).split()).upper()
+
+
+# Part fields a field-selective lookup (fields=...) can be limited to, with the page field
+# each one is read from. Lookups for these fields alone stop walking the replacement chain
+# as soon as they are filled; any other field needs the whole chain and the full lookup.
+SELECTIVE_FIELDS = {'price': 'eper_price_str', 'weight_kg': 'weight_kg', 'description': 'title'}
+LOOKUP_FIELDS = tuple(SELECTIVE_FIELDS) + ('fitting_cars', 'comparison_numbers', 'title')
+# Cached part fields (see PartRecord.to_cache_fields) of the selective fields
+SELECTIVE_CACHE_FIELDS = {'price': 'eper_price_str', 'weight_kg': 'weight_kg', 'description': 'description'}
+# Tab pane that holds each page field; title and weight come from the table-sm block
+PAGE_FIELD_PANES = {
+    'eper_price_str': 'prices-tab-pane', 'fitting_cars': 'drawings-tab-pane',
+    'previous_numbers': 'previous-tab-pane', 'replacement_numbers': 'replacements-tab-pane',
+}
+
+
+# Page loads in flight in this process, keyed by normalized part number (and the handler
+# settings a load depends on, see _load_page_fields_once). Handlers that need
+# the same page at the same time (GUI prefetch, batches, overlapping replacement chains)
+# wait for one request instead of each sending their own.
+PAGE_LOADS = SingleFlight()
+
+
+def resolve_parser(parser=None):
+    """Returns a parser backend for a backend name, a backend instance or None (the default backend)."""
+    if parser is None:
+        return get_default_parser()
+    return get_parser(parser) if isinstance(parser, str) else parser
+
+
+def parse_eper_html(html, parser=None):
+    """Parses an ePER part page, keeping only the blocks the extractors read (see html_parsers.py)."""
+    return resolve_parser(parser).parse(html)
+
+DEFAULT_PREFETCH_WORKERS = 8 # Background threads for lazy EPERHandler instances
+
+_prefetch_executor = None
+_prefetch_executor_lock = threading.Lock()
+
+
+def get_prefetch_executor():
+    """Returns the shared thread pool that runs the fetches of lazy EPERHandler instances."""
+    global _prefetch_executor
+    with _prefetch_executor_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(max_workers=DEFAULT_PREFETCH_WORKERS,
+                                                    thread_name_prefix='eper-prefetch')
+        return _prefetch_executor
+
+
+_reextract_worker_store = None
+_reextract_worker_parser = None
+
+
+def _reextract_pages(page_store, part_numbers, parser=None):
+    """Yields (part_number, page_fields or None) for raw pages read from a PageStore."""
+    extractor = EPERHandler.__new__(EPERHandler)
+    extractor.car_brands = CAR_BRANDS_DATA
+    extractor.fitment_matcher = FITMENT_MATCHER
+    parser = resolve_parser(parser)
+    for part_number in part_numbers:
+        html = page_store.get(part_number, touch=False)
+        yield part_number, _extract_html(extractor, parser, html)
+
+
+def _extract_html(extractor, parser, html, pane_ids=EPER_PANE_IDS, page_fields=None):
+    """Parses a raw ePER page and extracts its fields; None for an empty page or an unknown part."""
+    soup = parser.parse(html, pane_ids) if html and html.strip() else None
+    return extractor._extract_page_fields(soup, page_fields) if soup and EPERHandler._is_part_page(soup) else None
+
+
+def _extract_page_in_worker(html, parser_name, pane_ids=EPER_PANE_IDS, page_fields=None):
+    """Parse stage of fetch_many(parse_processes=...): runs in a worker process, returns only the fields."""
+    extractor = EPERHandler.__new__(EPERHandler)
+    extractor.car_brands = CAR_BRANDS_DATA
+    extractor.fitment_matcher = FITMENT_MATCHER
+    return _extract_html(extractor, get_parser(parser_name), html, pane_ids, page_fields)
+
+
+def _init_reextract_worker(page_store_path, parser_name):
+    global _reextract_worker_store, _reextract_worker_parser
+    _reextract_worker_store = PageStore(page_store_path)
+    _reextract_worker_parser = parser_name
+
+
+def _reextract_page(part_number):
+    return next(_reextract_pages(_reextract_worker_store, [part_number], _reextract_worker_parser))
+
 
 class EPERHandler:
     """
     Ruft Teiledetails von der ePER-Website (eper.fiatforum.com) für eine gegebene Teilenummer ab.
-    Die gesammelten Daten werden im Attribut 'self.data' als Dictionary gespeichert.
+    Die gesammelten Daten werden im Attribut 'self.data' als PartRecord (part_record.py) gespeichert:
+    kompakt, mit price/weight_kg als float (oder None) und Tupeln für fitting_cars/comparison_numbers.
 
-    Die Struktur von 'self.data' ist wie folgt:
+    Für die Kompatibilität liest sich 'self.data' (und der Handler per __getitem__) weiterhin wie das
+    frühere Dictionary mit diesen Schlüsseln:
     {
         'part_number': str,             # Die ursprünglich angefragte Teilenummer
         'eper_price_str': str | None,   # Der Preis aus ePER als String (z.B. "123.45") oder None
@@ -31,12 +141,233 @@ class EPERHandler:
         'fitting_cars': list[str],      # Eine Liste von passenden Fahrzeugmodellen (z.B. ["FIAT 500", "LANCIA YPSILON"])
         'comparison_numbers': list[str],# Eine Liste von Vergleichsnummern (ursprüngliche, vorherige und Ersatzteile)
         'title': str,                   # Der generierte Produkttitel (max. 80 Zeichen)
-        'title_base_description': str   # Eine mehrzeilige, formatierte Zusammenfassung aller wichtigen gefundenen Daten.
+        'title_base_description': str   # Mehrzeilige Zusammenfassung, wird erst beim Zugriff erzeugt.
     }
+
+    Ergebnisse werden in einem lokalen EPERCache abgelegt (pro Feld mit eigener TTL).
+    Mit use_cache=False wird der Cache beim Lesen umgangen und mit frischen Daten überschrieben,
+    mit cache=False wird gar kein Cache verwendet.
+    Die HTTP-Sessions werden aus einem prozessweiten ScraperPool geliehen und wiederverwendet.
+    Die Ersatzteilkette wird ebenenweise mit bis zu max_workers parallelen Abrufen durchlaufen.
+    Die dabei gefundenen Ersetzungen werden in einem SupersessionGraph (gleiche SQLite-Datei wie
+    der Cache) gespeichert; bekannte Ketten werden lokal aufgelöst und in einem Durchgang geladen,
+    nur fehlende oder veraltete Kanten erfordern weitere Abrufe. graph=False schaltet das ab.
+    Mit einem HTTPArchive (archive=..., oder EPER_ARCHIVE_MODE) werden alle Antworten aufgezeichnet
+    bzw. offline ohne Netzwerk und ohne Wartezeit wieder abgespielt.
+    Fehlgeschlagene Abrufe landen in einem Negativ-Cache (kurze TTL bei Netzwerk-/HTTP-Fehlern,
+    lange TTL für unbekannte Teilenummern ohne table-sm) und werden vor jedem Abruf geprüft.
+    Die Roh-HTML-Seiten werden komprimiert in einem PageStore abgelegt (page_store=False schaltet das ab),
+    damit reextract_from_store nach Änderungen an den Extraktoren alles ohne neues Scraping neu aufbauen kann.
+    Alle Abrufe teilen sich das Budget des prozessweiten Rate-Limiters (siehe rate_limit.py).
+    Der HTML-Parser ist austauschbar (parser='html.parser', 'lxml' oder 'selectolax', siehe html_parsers.py);
+    ohne Angabe wird der schnellste installierte verwendet, alle liefern dieselben Felder.
+    fetch_many(..., parse_processes=N) parst die Seiten großer Batches in N Prozessen; zurück kommen nur die Felder.
+    Bei 403/429/503 senkt ein AdaptiveThrottle (throttle.py) die Zahl paralleler Abrufe, öffnet nach
+    wiederholten Ablehnungen den Circuit Breaker und wiederholt den Abruf nach der Pause.
+
+    Mit fields={'price'} (oder 'weight_kg', 'description') werden nur diese Felder gesucht: es werden nur die
+    nötigen Bereiche der Seiten geparst und die Ersatzteilkette nur so weit durchlaufen, bis sie gefüllt sind
+    (für Preisläufe meist ein Abruf pro Teil). Die übrigen Felder des PartRecord bleiben dann leer.
+
+    Mit lazy=True kehrt der Konstruktor sofort zurück und der Abruf läuft im Hintergrund;
+    der erste Zugriff auf 'data' (oder per __getitem__) wartet nur, falls er noch nicht fertig ist.
     """
-    def __init__(self, part_number):
+    def __init__(self, part_number, use_cache=True, cache=None, scraper_pool=None, max_workers=DEFAULT_MAX_WORKERS,
+                 rate_limiter=None, lazy=False, executor=None, graph=None, archive=None, page_store=None,
+                 throttle=None, parser=None, fields=None):
+        self._configure(use_cache=use_cache, cache=cache, scraper_pool=scraper_pool, max_workers=max_workers,
+                        rate_limiter=rate_limiter, graph=graph, archive=archive, page_store=page_store,
+                        throttle=throttle, parser=parser, fields=fields)
+        self.part_number = part_number
+        if lazy:
+            executor = executor if executor is not None else get_prefetch_executor()
+            self._data_future = executor.submit(self.get_part_details, part_number)
+        else:
+            self.data = self.get_part_details(part_number)
+
+    @property
+    def data(self):
+        """The part details; blocks until a lazy fetch has finished."""
+        data_future = self._data_future
+        if data_future is not None:
+            self._data = data_future.result()
+            self._data_future = None
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._data_future = None
+
+    @property
+    def future(self):
+        """The Future of a pending lazy fetch, or None if the data is already available."""
+        return self._data_future
+
+    def done(self):
+        """True if the data can be read without blocking."""
+        data_future = self._data_future
+        return data_future is None or data_future.done()
+
+    def _configure(self, use_cache=True, cache=None, scraper_pool=None, max_workers=DEFAULT_MAX_WORKERS,
+                   rate_limiter=None, graph=None, archive=None, page_store=None, throttle=None, parser=None,
+                   fields=None):
         self.car_brands = CAR_BRANDS_DATA
-        self.data = self.get_part_details(part_number)
+        self.fitment_matcher = FITMENT_MATCHER
+        self.parser = resolve_parser(parser)
+        self._configure_fields(fields)
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_default_limiter()
+        self.throttle = throttle if throttle is not None else get_default_throttle()
+        self.use_cache = use_cache
+        self.archive = (archive if archive is not None else get_default_archive()) or None
+        if cache is None:
+            # A replay must not leave its pages and misses in the cache of real lookups
+            cache = get_replay_cache() if self.archive and self.archive.replaying else get_default_cache()
+        self.cache = cache
+        if graph is None:
+            graph = self.cache.graph if self.cache else None
+        self.graph = graph or None # graph=False disables the supersession graph
+        if page_store is None:
+            page_store = self.cache.page_store if self.cache else None
+        self.page_store = page_store or None # page_store=False keeps no raw pages
+        self.scraper_pool = scraper_pool if scraper_pool is not None else get_default_pool()
+        self._page_memo = None # Set by fetch_many to share pages between the parts of a batch
+        self._parse_pool = None # Set by fetch_many(parse_processes=...) to parse pages in worker processes
+        self._pages_fetched_at = None # Set by reextract_from_store: fetch time of the oldest page of a part
+        self._page_memo_lock = threading.Lock()
+        self._data = None
+        self._data_future = None
+
+    def _configure_fields(self, fields):
+        """Sets up a field-selective lookup; fields that need the whole chain fall back to the full lookup."""
+        unknown_fields = set(fields or ()) - set(LOOKUP_FIELDS)
+        if unknown_fields:
+            raise ValueError(f"Unknown ePER lookup field(s) {', '.join(sorted(unknown_fields))}; "
+                             f"expected some of {', '.join(LOOKUP_FIELDS)}.")
+        if fields and set(fields) <= set(SELECTIVE_FIELDS):
+            self.fields = tuple(field for field in SELECTIVE_FIELDS if field in fields)
+            # The previous and replacement numbers are always read to walk the chain
+            self._page_fields = tuple(SELECTIVE_FIELDS[field] for field in self.fields) + \
+                ('previous_numbers', 'replacement_numbers')
+            self._pane_ids = tuple(PAGE_FIELD_PANES[field] for field in self._page_fields if field in PAGE_FIELD_PANES)
+        else:
+            self.fields = None
+            self._page_fields = None # All page fields
+            self._pane_ids = EPER_PANE_IDS
+
+    @classmethod
+    def fetch_many(cls, part_numbers, max_parallel_parts=DEFAULT_MAX_WORKERS, parse_processes=None,
+                   **handler_options):
+        """
+        Fetches many part numbers as one batch and yields an EPERHandler per distinct part number
+        as soon as it is finished (completion order, not input order).
+
+        Every ePER page is loaded at most once per batch, even if several parts share the same
+        replacement chain. handler_options are passed on like the keyword arguments of __init__.
+
+        With parse_processes=N the raw pages are parsed and extracted in N worker processes
+        and only the extracted fields come back, so parsing is not serialised by the GIL
+        (worthwhile for large batches, above all when replaying from an HTTPArchive).
+        The batch then runs at least two part threads per worker process to keep them busy.
+        """
+        batch_worker = cls.__new__(cls)
+        batch_worker._configure(**handler_options)
+        batch_worker._page_memo = {}
+        if parse_processes and parse_processes > 1:
+            batch_worker._parse_pool = ProcessPoolExecutor(max_workers=parse_processes)
+            max_parallel_parts = max(max_parallel_parts, 2 * parse_processes)
+
+        try:
+            yield from batch_worker._run_batch(part_numbers, max_parallel_parts, **handler_options)
+        finally:
+            if batch_worker._parse_pool is not None:
+                batch_worker._parse_pool.shutdown()
+        logging.info(f"ePER batch finished, throttle state: {batch_worker.throttle.stats()}")
+
+    def _run_batch(self, part_numbers, max_parallel_parts, **handler_options):
+        with ThreadPoolExecutor(max_workers=max_parallel_parts) as executor:
+            futures = {
+                executor.submit(self.get_part_details, part_number): part_number
+                for part_number in dict.fromkeys(part_numbers)
+            }
+            for future in as_completed(futures):
+                part_number = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logging.error(f"Error fetching ePER data for {part_number} in batch: {e}")
+                    continue
+                yield self._from_data(part_number, data, **handler_options)
+
+    @classmethod
+    def _from_data(cls, part_number, data, **handler_options):
+        """Creates a handler for already fetched part details without any network access."""
+        handler = cls.__new__(cls)
+        handler._configure(**handler_options)
+        handler.part_number = part_number
+        handler.data = data
+        return handler
+
+    @classmethod
+    def reextract_from_store(cls, page_store=None, part_numbers=None, max_processes=None, **handler_options):
+        """
+        Rebuilds the cached page fields and part details from the raw pages in a PageStore,
+        e.g. after a change to the extractors, without any request to ePER.
+
+        Pages are parsed in max_processes worker processes (default: one per CPU); every
+        part is then aggregated from the re-extracted pages and written to the cache. The cached
+        fields are stamped with the fetch time of their pages (for a part: the oldest page it
+        used), so re-extracting does not make old prices look fresh.
+
+        Args:
+            page_store (Optional[PageStore]): Defaults to the page store of the handler's cache.
+            part_numbers (Optional[Iterable[str]]): Parts to rebuild. Defaults to all stored pages.
+            max_processes (Optional[int]): Worker processes; 1 parses in this process.
+            **handler_options: Passed on like the keyword arguments of __init__ (cache, graph, ...).
+
+        Returns:
+            Dict[str, PartRecord]: The rebuilt part details per part number.
+        """
+        rebuilder = cls.__new__(cls)
+        rebuilder._configure(**handler_options)
+        page_store = page_store or rebuilder.page_store
+        if page_store is None:
+            raise ValueError("reextract_from_store needs a page store (pass page_store= or use a cache).")
+        part_numbers = list(dict.fromkeys(part_numbers)) if part_numbers is not None else page_store.part_numbers()
+        max_processes = max_processes or os.cpu_count() or 1
+        logging.info(f"Re-extracting {len(part_numbers)} stored ePER page(s) with {max_processes} process(es)...")
+
+        if max_processes <= 1 or len(part_numbers) < 2:
+            pages = dict(_reextract_pages(page_store, part_numbers, rebuilder.parser))
+        else:
+            chunksize = max(1, min(256, len(part_numbers) // (max_processes * 8)))
+            with ProcessPoolExecutor(max_workers=max_processes, initializer=_init_reextract_worker,
+                                     initargs=(page_store.path, rebuilder.parser.name)) as executor:
+                pages = dict(executor.map(_reextract_page, part_numbers, chunksize=chunksize))
+        # The rebuilt fields keep the age of their pages, so a stale price stays a cache miss
+        fetched_at = {part_number: page_store.fetched_at(part_number) for part_number in pages}
+        for part_number, page_fields in pages.items():
+            if page_fields is not None:
+                rebuilder._record_page_fields(part_number, page_fields, fetched_at[part_number])
+
+        def get_stored_pages(requested_parts):
+            # Pages of replacements outside part_numbers are read from the store on demand
+            missing_parts = [num for num in requested_parts if num not in pages]
+            pages.update(_reextract_pages(page_store, missing_parts, rebuilder.parser))
+            fetched_at.update((num, page_store.fetched_at(num)) for num in missing_parts)
+            used_times = [fetched_at[num] for num in requested_parts
+                          if pages[num] is not None and fetched_at[num] is not None]
+            if rebuilder._pages_fetched_at is not None:
+                used_times.append(rebuilder._pages_fetched_at)
+            rebuilder._pages_fetched_at = min(used_times, default=None)
+            return [pages[num] for num in requested_parts]
+
+        rebuilt = {}
+        for part_number in part_numbers:
+            rebuilder._pages_fetched_at = None
+            rebuilt[part_number] = rebuilder._run_aggregation(part_number, get_stored_pages)
+        return rebuilt
 
     def __getitem__(self, key):
         """Ermöglicht den Zugriff auf Datenfelder wie bei einem Dictionary."""
@@ -46,193 +377,440 @@ class EPERHandler:
 
     def _fetch_soup(self, part_number):
         """Fetches and parses HTML content from ePER for a given part number."""
-        url = f"https://eper.fiatforum.com/Part/SearchPartByPartNumber?language=en&PartNumber={part_number}"
-        scraper = cloudscraper.create_scraper(browser={'browser': 'chrome', 'platform': 'windows', 'desktop': True})
-        time.sleep(random.uniform(1, 3)) # Keep reasonable delay
+        html = self._fetch_html(part_number)
+        return self._parse_page(html) if html else None
+
+    def _parse_page(self, html):
+        """Parses a raw page, keeping only the blocks this lookup's fields are read from."""
+        return self.parser.parse(html, self._pane_ids)
+
+    def _fetch_html(self, part_number):
+        """Fetches the raw HTML of the ePER page for a given part number, or None on failure."""
+        url = EPER_PART_URL.format(part_number=part_number)
+        archive = self.archive
 
         try:
-            response = scraper.get(url)
-            response.raise_for_status()
+            if archive and archive.replaying:
+                response = archive.replay(url) # Offline: no request, no rate limiting
+                if response is None: # Not recorded; says nothing about ePER, so no negative entry
+                    logging.warning(f"No recorded ePER response for {part_number} in the archive.")
+                    return None
+                response.raise_for_status()
+            else:
+                response = self._request_page(url, part_number)
             if not response.text.strip():
                 logging.warning(f"Received empty response from ePER for part number: {part_number}")
+                self._record_failure(part_number, TRANSIENT_FAILURE)
                 return None
-            return BeautifulSoup(response.text, 'html.parser')
+            if self.page_store:
+                self.page_store.put(part_number, response.text)
+            return response.text
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching ePER data for {part_number}: {e}")
+            self._record_failure(part_number, self._failure_reason(getattr(e.response, 'status_code', None)))
             return None
         except ValueError as e: # Handles potential JSON decoding errors if response is not HTML
             logging.error(f"Error decoding ePER response (possibly empty or not HTML) for {part_number}: {e}")
+            self._record_failure(part_number, TRANSIENT_FAILURE)
             return None
 
-    def _extract_title_from_soup(self, soup):
-        if not soup: return ""
-        table = soup.find('table', class_='table-sm')
-        if table and len(table.find_all('tr')) >= 2:
-            rows = table.find_all('tr')
-            value_1 = rows[0].find_all('td')[1].text.strip() if len(rows[0].find_all('td')) > 1 else ""
-            value_2 = rows[1].find_all('td')[1].text.strip()[6:] if len(rows[1].find_all('td')) > 1 else "" # Remove "Code: "
+    def _request_page(self, url, part_number):
+        """Sends the request through the throttle; throttled requests are retried after AdaptiveThrottle.retry_delay."""
+        for attempt in range(self.throttle.max_retries + 1):
+            try:
+                return self._send_request(url)
+            except requests.exceptions.HTTPError as e:
+                status_code = getattr(e.response, 'status_code', None)
+                if status_code not in THROTTLE_STATUS_CODES or attempt == self.throttle.max_retries:
+                    raise
+                delay = self.throttle.retry_delay(attempt, retry_after_seconds(e.response))
+                logging.warning(f"ePER throttled the request for {part_number} (HTTP {status_code}), "
+                                f"retrying in {delay:.1f}s ({attempt + 1}/{self.throttle.max_retries})...")
+                time.sleep(delay)
+
+    def _send_request(self, url):
+        with self.throttle.slot():
+            self.rate_limiter.acquire() # Shared request budget for all handlers
+            try:
+                with self.scraper_pool.session() as scraper:
+                    response = scraper.get(url)
+                    if self.archive:
+                        self.archive.record(url, response)
+                    response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                status_code = getattr(e.response, 'status_code', None)
+                if status_code in THROTTLE_STATUS_CODES:
+                    self.throttle.record_throttle(retry_after_seconds(e.response))
+                else:
+                    self.throttle.record_success() # ePER answered normally, it is not throttling
+                raise
+            self.throttle.record_success()
+            return response
+
+    @staticmethod
+    def _failure_reason(status_code):
+        """404/410 mean ePER does not know the part; everything else may work on a later try."""
+        return NOT_FOUND if status_code in (404, 410) else TRANSIENT_FAILURE
+
+    def _record_failure(self, part_number, reason):
+        if self.cache:
+            self.cache.set_failure(part_number, reason)
+
+    def _get_known_failure(self, part_number):
+        """Returns the reason of a recent failed lookup from the negative cache, or None."""
+        if self.cache and self.use_cache:
+            reason = self.cache.get_failure(part_number)
+            if reason:
+                logging.info(f"Skipping ePER request for {part_number}: recent failed lookup ({reason}).")
+                return reason
+        return None
+
+    @classmethod
+    def _is_part_page(cls, soup):
+        """A page without the table-sm block is ePER's answer for an unknown part number."""
+        return cls._find_table_sm(soup) is not None
+
+    @staticmethod
+    def _find_table_sm(soup):
+        return soup.find('table', class_='table-sm')
+
+    @staticmethod
+    def _title_from_table(table):
+        rows = table.find_all('tr')
+        if len(rows) >= 2:
+            cells_0 = rows[0].find_all('td')
+            cells_1 = rows[1].find_all('td')
+            value_1 = cells_0[1].text.strip() if len(cells_0) > 1 else ""
+            value_2 = cells_1[1].text.strip()[6:] if len(cells_1) > 1 else "" # Remove "Code: "
             return f"{value_1}, {value_2}".strip(", ")
         return ""
 
+    @staticmethod
+    def _weight_from_table(table):
+        all_rows = table.find_all('tr')
+        if len(all_rows) > 2:
+            cells_in_third_row = all_rows[2].find_all('td')
+            if len(cells_in_third_row) > 1:
+                weight_text = cells_in_third_row[1].text.strip()
+                try:
+                    weight_grams = float(weight_text)
+                    return str(weight_grams / 1000)  # Convert to kg
+                except ValueError:
+                    logging.warning(f"Could not parse weight from ePER: '{weight_text}'")
+        return '0'
+
+    @staticmethod
+    def _price_from_pane(div_prices_tab_pane):
+        germany_tr = div_prices_tab_pane.find('td', string='Germany')
+        price_td = germany_tr.find_next_sibling('td') if germany_tr else None
+        if price_td:
+            price_text = price_td.text.strip()
+            price_cleaned = re.sub(r'[EUR\s]', '', price_text).replace(',', '.') # Normalize price string
+            try:
+                float(price_cleaned) # Validate if it's a number
+                return price_cleaned
+            except ValueError:
+                logging.warning(f"Could not parse ePER price: {price_text} (cleaned: {price_cleaned})")
+        return None
+
+    @staticmethod
+    def _comparison_numbers_from_pane(div_element):
+        numbers = []
+        for tr in div_element.find_all('tr'):
+            cells = tr.find_all('td')
+            if len(cells) >= 3:
+                number = cells[2].text.strip()
+                if number:
+                    numbers.append(number)
+        return numbers
+
+    def _fitting_cars_from_pane(self, div_drawings_tab_pane):
+        extracted_texts = []
+        for tr in div_drawings_tab_pane.find_all('tr'):
+            first_cell = tr.find('td')
+            if first_cell:
+                extracted_texts.append(first_cell.get_text(strip=True))
+        return self._match_fitting_cars(extracted_texts)
+
+    def _extract_title_from_soup(self, soup):
+        if not soup: return ""
+        table = self._find_table_sm(soup)
+        return self._title_from_table(table) if table else ""
+
     def _extract_weight_from_soup(self, soup):
         if not soup: return '0'
-        table_sm = soup.find('table', class_='table-sm')
-        if table_sm:
-            all_rows = table_sm.find_all('tr')
-            if len(all_rows) > 2:
-                cells_in_third_row = all_rows[2].find_all('td')
-                if len(cells_in_third_row) > 1:
-                    try:
-                        weight_grams = float(cells_in_third_row[1].text.strip())
-                        return str(weight_grams / 1000)  # Convert to kg
-                    except ValueError:
-                        logging.warning(f"Could not parse weight from ePER: '{cells_in_third_row[1].text.strip()}'")
-        return '0'
+        table_sm = self._find_table_sm(soup)
+        return self._weight_from_table(table_sm) if table_sm else '0'
 
     def _extract_eper_price_str_from_soup(self, soup):
         if not soup: return None
         div_prices_tab_pane = soup.find('div', id='prices-tab-pane')
-        if div_prices_tab_pane:
-            germany_tr = div_prices_tab_pane.find('td', string='Germany')
-            if germany_tr and germany_tr.find_next_sibling('td'):
-                price_text = germany_tr.find_next_sibling('td').text.strip()
-                price_cleaned = re.sub(r'[EUR\s]', '', price_text).replace(',', '.') # Normalize price string
-                try:
-                    float(price_cleaned) # Validate if it's a number
-                    return price_cleaned
-                except ValueError:
-                    logging.warning(f"Could not parse ePER price: {price_text} (cleaned: {price_cleaned})")
-        return None
+        return self._price_from_pane(div_prices_tab_pane) if div_prices_tab_pane else None
 
     @staticmethod
     def _normalize_car_name(name):
-        if not isinstance(name, str): return ""
-        name = name.upper()
-        special_names = {'N.DELTA': 'DELTA', "DUCATO'94": 'DUCATO', "PUNTO BZ": "PUNTO", "PUNTO TB.DS": "PUNTO"}
-        for special, normal in special_names.items():
-            name = name.replace(special, normal)
-        return name
+        return FITMENT_MATCHER.normalize(name)
+
+    def _match_fitting_cars(self, extracted_texts):
+        return self.fitment_matcher.match(extracted_texts)
 
     def _extract_fitting_cars_from_soup(self, soup):
         if not soup: return []
         div_drawings_tab_pane = soup.find('div', id='drawings-tab-pane')
-        fitting_cars = []
-        if div_drawings_tab_pane:
-            tr_elements = div_drawings_tab_pane.find_all('tr')
-            extracted_texts = [tr.find('td').get_text(strip=True) for tr in tr_elements if tr.find('td')]
-            for text in extracted_texts:
-                normalized_text = self._normalize_car_name(text)
-                found_brand_model = False
-                for brand, models in self.car_brands.items():
-                    if brand in normalized_text: # Check if brand is in the text first
-                        for model in models:
-                            # Ensure model is a whole word or significant part
-                            if re.search(r'\b' + re.escape(model) + r'\b', normalized_text) or model in normalized_text:
-                                fitting_cars.append(f"{brand} {model}")
-                                found_brand_model = True
-                                break
-                        if found_brand_model: break
-                if not found_brand_model: # Fallback: check if model name is present as a word
-                    for brand, models in self.car_brands.items():
-                        for model in models:
-                            if model in normalized_text.split(): # Simpler check if model name is one of the words
-                                 fitting_cars.append(f"{brand} {model}")
-                                 break
-        return list(dict.fromkeys(fitting_cars)) # Remove duplicates
+        return self._fitting_cars_from_pane(div_drawings_tab_pane) if div_drawings_tab_pane else []
 
     def _extract_comparison_numbers_from_soup(self, soup, tab_id):
         if not soup: return []
         div_element = soup.find('div', id=tab_id)
         if not div_element: return []
-        tr_elements = div_element.find_all('tr')
-        return [
-            tr.find_all('td')[2].text.strip()
-            for tr in tr_elements
-            if len(tr.find_all('td')) >= 3 and tr.find_all('td')[2] and tr.find_all('td')[2].text.strip()
-        ]
+        return self._comparison_numbers_from_pane(div_element)
+
+    def _extract_page_fields(self, soup, fields=None):
+        """
+        Extracts all fields used by get_part_details from a single ePER page in one pass.
+
+        The table-sm block and the four tab panes are located in a single walk over the
+        document, and every table row is read only once. The result equals calling the
+        individual _extract_*_from_soup helpers. 'fields' limits the result to these page fields.
+        """
+        page_fields = {
+            'title': "", 'eper_price_str': None, 'weight_kg': '0', 'fitting_cars': [],
+            'previous_numbers': [], 'replacement_numbers': [],
+        }
+        if not soup:
+            return page_fields
+
+        blocks = {}
+        for element in soup.find_all(_is_eper_block):
+            key = 'table-sm' if element.name == 'table' else element.get('id')
+            blocks.setdefault(key, element)
+
+        table_sm = blocks.get('table-sm')
+        if table_sm:
+            page_fields['title'] = self._title_from_table(table_sm)
+            page_fields['weight_kg'] = self._weight_from_table(table_sm)
+        if 'prices-tab-pane' in blocks:
+            page_fields['eper_price_str'] = self._price_from_pane(blocks['prices-tab-pane'])
+        if 'drawings-tab-pane' in blocks:
+            page_fields['fitting_cars'] = self._fitting_cars_from_pane(blocks['drawings-tab-pane'])
+        if 'previous-tab-pane' in blocks:
+            page_fields['previous_numbers'] = self._comparison_numbers_from_pane(blocks['previous-tab-pane'])
+        if 'replacements-tab-pane' in blocks:
+            page_fields['replacement_numbers'] = self._comparison_numbers_from_pane(blocks['replacements-tab-pane'])
+        if fields is not None:
+            return {field: page_fields[field] for field in fields}
+        return page_fields
+
+    def _get_page_fields(self, part_number):
+        """
+        Returns the extracted fields of the ePER page for part_number, or None if the page
+        could not be fetched. Inside fetch_many every page is loaded only once per batch.
+        """
+        if self._page_memo is None:
+            return self._load_page_fields_once(part_number)
+
+        with self._page_memo_lock:
+            page_future = self._page_memo.get(part_number)
+            is_owner = page_future is None
+            if is_owner:
+                page_future = self._page_memo[part_number] = Future()
+        if is_owner:
+            try:
+                page_future.set_result(self._load_page_fields_once(part_number))
+            except Exception as e:
+                page_future.set_exception(e)
+        return page_future.result()
+
+    def _load_page_fields_once(self, part_number):
+        """_load_page_fields, shared with concurrent loads of the same part number in other threads."""
+        # Lookups for other fields extract other parts of the page, and handlers with another
+        # cache, cache bypass or archive would get a result read or recorded under other
+        # settings, so they do not share a load either
+        key = (normalize_part_number(part_number), self._page_fields, self.use_cache, self.cache, self.archive)
+        return PAGE_LOADS.do(key, self._load_page_fields, part_number)
+
+    def _load_page_fields(self, part_number):
+        """Loads the page fields from the cache or, on a miss, from ePER."""
+        cached_fields = self._get_cached_page_fields(part_number)
+        if cached_fields is not None:
+            return cached_fields
+        if self._get_known_failure(part_number):
+            return None
+        if self._parse_pool is not None:
+            return self._parse_in_pool(part_number, self._fetch_html(part_number))
+        return self._store_page_fields(part_number, self._fetch_soup(part_number))
+
+    def _parse_in_pool(self, part_number, html):
+        """Parses a fetched page in the batch's worker processes and caches the returned fields."""
+        if not html:
+            return None
+        page_fields = self._parse_pool.submit(_extract_page_in_worker, html, self.parser.name,
+                                              self._pane_ids, self._page_fields).result()
+        if page_fields is None:
+            self._record_unknown_part(part_number)
+            return None
+        self._record_page_fields(part_number, page_fields)
+        return page_fields
+
+    def _get_cached_page_fields(self, part_number):
+        if self.cache and self.use_cache:
+            cached_fields = self.cache.get_page(part_number, fields=self._page_fields)
+            if cached_fields is not None:
+                logging.info(f"Using cached ePER page data for {part_number}.")
+                return cached_fields
+        return None
+
+    def _store_page_fields(self, part_number, soup):
+        """Extracts the fields of a fetched page and caches them. Returns None if there is no page."""
+        if not soup:
+            return None
+        if not self._is_part_page(soup):
+            self._record_unknown_part(part_number)
+            return None
+        page_fields = self._extract_page_fields(soup, self._page_fields)
+        self._record_page_fields(part_number, page_fields)
+        return page_fields
+
+    def _record_unknown_part(self, part_number):
+        logging.warning(f"ePER does not know part number {part_number} (no part table on the page).")
+        self._record_failure(part_number, NOT_FOUND)
+
+    def _record_page_fields(self, part_number, page_fields, fetched_at=None):
+        if self.cache:
+            self.cache.set_page(part_number, page_fields, fetched_at)
+        if self.graph:
+            self.graph.record(part_number, page_fields['replacement_numbers'], page_fields['previous_numbers'])
+
+    def _get_pages(self, part_numbers):
+        """Returns the page fields for several part numbers, fetched in parallel, in input order."""
+        if len(part_numbers) <= 1 or self.max_workers <= 1:
+            return [self._get_page_fields(num) for num in part_numbers]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(part_numbers))) as executor:
+            return list(executor.map(self._get_page_fields, part_numbers))
+
+    def _get_cached_part_details(self, part_number):
+        if self.cache and self.use_cache:
+            fields = None
+            if self.fields:
+                fields = ['part_number'] + [SELECTIVE_CACHE_FIELDS[field] for field in self.fields]
+            cached_details = self.cache.get_part(part_number, fields=fields)
+            if cached_details is not None:
+                logging.info(f"Using cached ePER data for part number: {part_number}")
+                return PartRecord.from_cache_fields(cached_details)
+        return None
 
     def get_part_details(self, part_number):
+        cached_details = self._get_cached_part_details(part_number)
+        if cached_details is not None:
+            return cached_details
+
+        return self._run_aggregation(part_number, self._get_pages)
+
+    def _run_aggregation(self, part_number, get_pages):
+        """Drives _aggregate_part_details, loading the requested pages with get_pages(part_numbers)."""
+        aggregation = self._aggregate_part_details(part_number)
+        try:
+            requested_parts = next(aggregation)
+            while True:
+                requested_parts = aggregation.send(get_pages(requested_parts))
+        except StopIteration as finished:
+            return finished.value
+
+    def _aggregate_part_details(self, part_number):
+        """
+        Merges the pages of a part, its replacement chain and its previous parts into the part details.
+
+        This generator does no I/O itself: it yields lists of part numbers whose page fields it
+        needs and expects the fields (or None) back in the same order. get_part_details drives it
+        with threads, the asyncio client in async_eper.py drives the same rules with coroutines.
+        """
+        if self.fields:
+            return (yield from self._aggregate_selected_fields(part_number))
         logging.info(f"Fetching ePER data for primary part number: {part_number}...")
-        primary_soup = self._fetch_soup(part_number)
+        (primary_page,) = yield [part_number]
 
-        # Initial values if primary soup fails
+        # Initial values if primary page fails
         initial_title_base = f"OEM {part_number}"
         initial_eper_price_str = None
         initial_weight_kg = '0'
         initial_fitting_cars = []
         initial_comparison_numbers = [part_number]
 
-        if not primary_soup:
+        if not primary_page:
             logging.warning(f"Could not fetch initial ePER data for {part_number}. Proceeding with limited info.")
-            # Construct the comprehensive summary even with limited data
-            summary_lines_fallback = [
-                f"Bezeichnung: {initial_title_base}",
-                f"Teilenummer: {part_number}",
-                f"Preis (EUR): Nicht verfügbar",
-                f"Gewicht: Nicht verfügbar",
-                f"Passende Fahrzeuge: Keine Daten",
-                f"Vergleichsnummern: {len(initial_comparison_numbers)} (nur angefragte Nummer)"
-            ]
-            comprehensive_summary_fallback = "\n".join(summary_lines_fallback)
-            return {
-                'part_number': part_number, 'eper_price_str': initial_eper_price_str, 'weight_kg': initial_weight_kg,
-                'fitting_cars': initial_fitting_cars, 'comparison_numbers': initial_comparison_numbers,
-                'title_base_description': comprehensive_summary_fallback,
-                'title': initial_title_base # Fallback title
-            }
+            return PartRecord.from_strings(
+                part_number, initial_eper_price_str, initial_weight_kg, initial_fitting_cars,
+                initial_comparison_numbers, initial_title_base, # Fallback title
+                description=None # The summary says that no ePER data was found
+            )
 
         # final_title_base will store the actual part description from ePER
-        final_title_base = self._extract_title_from_soup(primary_soup)
-        final_eper_price_str = self._extract_eper_price_str_from_soup(primary_soup)
-        final_weight_kg = self._extract_weight_from_soup(primary_soup)
+        final_title_base = primary_page['title']
+        final_eper_price_str = primary_page['eper_price_str']
+        final_weight_kg = primary_page['weight_kg']
         
-        fitting_cars_from_primary = self._extract_fitting_cars_from_soup(primary_soup)
-        all_fitting_cars = set(fitting_cars_from_primary)
-
-        pre_comp_nums_of_primary = self._extract_comparison_numbers_from_soup(primary_soup, 'previous-tab-pane')
-        initial_post_comp_nums_of_primary = self._extract_comparison_numbers_from_soup(primary_soup, 'replacements-tab-pane')
-
-        parts_to_process_queue = list(dict.fromkeys(initial_post_comp_nums_of_primary))
+        # dicts keep insertion order, so the merged lists are deterministic
+        all_fitting_cars = dict.fromkeys(primary_page['fitting_cars'])
+
+        pre_comp_nums_of_primary = primary_page['previous_numbers']
+        initial_post_comp_nums_of_primary = primary_page['replacement_numbers']
+
+        # Breadth-first walk over the replacement chain: every level is fetched in parallel
+        # and then merged in queue order, so the result matches a one-by-one walk.
+        current_level = [num for num in dict.fromkeys(initial_post_comp_nums_of_primary) if num != part_number]
+        queued_parts = set(current_level)
+
+        # Parts of the chain already known from the supersession graph are loaded in one batch
+        # up front instead of one level per round trip; the walk below then only fetches parts
+        # reached through missing or stale edges.
+        known_pages = {}
+        if self.graph and self.use_cache and current_level:
+            known_chain, unresolved_parts = self.graph.expand(part_number)
+            if known_chain:
+                if unresolved_parts:
+                    logging.info(f"Supersession graph for {part_number} is incomplete at: {', '.join(unresolved_parts)}")
+                known_pages = dict(zip(known_chain, (yield known_chain)))
         processed_parts_for_data_aggregation = {part_number}
-        all_eventual_replacement_part_numbers = set(initial_post_comp_nums_of_primary)
-
-        current_queue_index = 0
-        while current_queue_index < len(parts_to_process_queue):
-            comp_num_to_investigate = parts_to_process_queue[current_queue_index]
-            current_queue_index += 1
-
-            if comp_num_to_investigate in processed_parts_for_data_aggregation:
-                continue
-
-            logging.info(f"Processing replacement part: {comp_num_to_investigate} for data & its own replacements...")
-            comp_soup = self._fetch_soup(comp_num_to_investigate)
-            processed_parts_for_data_aggregation.add(comp_num_to_investigate)
-            all_eventual_replacement_part_numbers.add(comp_num_to_investigate)
+        all_eventual_replacement_part_numbers = dict.fromkeys(initial_post_comp_nums_of_primary)
+
+        while current_level:
+            logging.info(f"Processing replacement parts: {', '.join(current_level)} for data & their own replacements...")
+            next_level = []
+            missing_parts = [num for num in current_level if num not in known_pages]
+            if missing_parts:
+                known_pages.update(zip(missing_parts, (yield missing_parts)))
+            level_pages = [known_pages[num] for num in current_level]
+            for comp_num_to_investigate, comp_page in zip(current_level, level_pages):
+                processed_parts_for_data_aggregation.add(comp_num_to_investigate)
+                all_eventual_replacement_part_numbers[comp_num_to_investigate] = None
+                if not comp_page:
+                    continue
 
-            if comp_soup:
-                all_fitting_cars.update(self._extract_fitting_cars_from_soup(comp_soup))
+                all_fitting_cars.update(dict.fromkeys(comp_page['fitting_cars']))
                 if not final_eper_price_str:
-                    price_from_comp = self._extract_eper_price_str_from_soup(comp_soup)
+                    price_from_comp = comp_page['eper_price_str']
                     if price_from_comp:
                         final_eper_price_str = price_from_comp
                         logging.info(f"Using price from replacement {comp_num_to_investigate}: {final_eper_price_str}")
                 if final_weight_kg == '0' or not final_weight_kg:
-                    weight_from_comp = self._extract_weight_from_soup(comp_soup)
+                    weight_from_comp = comp_page['weight_kg']
                     if weight_from_comp and weight_from_comp != '0':
                         final_weight_kg = weight_from_comp
                         logging.info(f"Using weight from replacement {comp_num_to_investigate}: {final_weight_kg}")
                 if not final_title_base: # If primary title was empty, try to get from replacement
-                    title_from_comp = self._extract_title_from_soup(comp_soup)
+                    title_from_comp = comp_page['title']
                     if title_from_comp:
                         final_title_base = title_from_comp
                         logging.info(f"Using title base from replacement {comp_num_to_investigate}: '{title_from_comp}'")
-                
-                further_replacements = self._extract_comparison_numbers_from_soup(comp_soup, 'replacements-tab-pane')
+
+                further_replacements = comp_page['replacement_numbers']
                 for further_rep_num in further_replacements:
-                    all_eventual_replacement_part_numbers.add(further_rep_num)
+                    all_eventual_replacement_part_numbers[further_rep_num] = None
                     if further_rep_num not in processed_parts_for_data_aggregation and \
-                       further_rep_num not in parts_to_process_queue:
-                        parts_to_process_queue.append(further_rep_num)
+                       further_rep_num not in queued_parts:
+                        queued_parts.add(further_rep_num)
+                        next_level.append(further_rep_num)
+            current_level = next_level
         
         final_output_comparison_numbers = list(dict.fromkeys(
             [part_number] + pre_comp_nums_of_primary + list(all_eventual_replacement_part_numbers)
@@ -242,30 +820,36 @@ class EPERHandler:
         needs_weight_check = (final_weight_kg == '0' or not final_weight_kg)
         needs_title_check = not final_title_base # Check if ePER description is still missing
 
-        if needs_price_check or needs_weight_check or needs_title_check:
-            for comp_num in pre_comp_nums_of_primary:
-                if comp_num == part_number or comp_num in processed_parts_for_data_aggregation:
-                    continue
+        # Previous parts are only read for still missing data. They are fetched in batches of
+        # max_workers and merged in order; the scan stops after the batch that fills the gaps.
+        previous_candidates = [
+            comp_num for comp_num in dict.fromkeys(pre_comp_nums_of_primary)
+            if comp_num != part_number and comp_num not in processed_parts_for_data_aggregation
+        ]
+        batch_start = 0
+        while (needs_price_check or needs_weight_check or needs_title_check) and batch_start < len(previous_candidates):
+            batch = previous_candidates[batch_start:batch_start + self.max_workers]
+            batch_start += len(batch)
+            logging.info(f"Processing previous parts {', '.join(batch)} for still missing data...")
+            batch_pages = yield batch
+            for comp_num, comp_page in zip(batch, batch_pages):
                 if not (needs_price_check or needs_weight_check or needs_title_check): # Re-check if all filled
                     break
-                
-                logging.info(f"Processing previous part {comp_num} for still missing data...")
-                comp_soup = self._fetch_soup(comp_num)
-                if comp_soup:
+                if comp_page:
                     if needs_price_check and not final_eper_price_str:
-                        price_from_comp = self._extract_eper_price_str_from_soup(comp_soup)
+                        price_from_comp = comp_page['eper_price_str']
                         if price_from_comp:
                             final_eper_price_str = price_from_comp
                             logging.info(f"Using price from previous part {comp_num}: {final_eper_price_str}")
                             needs_price_check = False
                     if needs_weight_check and (final_weight_kg == '0' or not final_weight_kg):
-                        weight_from_comp = self._extract_weight_from_soup(comp_soup)
+                        weight_from_comp = comp_page['weight_kg']
                         if weight_from_comp and weight_from_comp != '0':
                             final_weight_kg = weight_from_comp
                             logging.info(f"Using weight from previous part {comp_num}: {final_weight_kg}")
                             needs_weight_check = False
                     if needs_title_check and not final_title_base:
-                        title_from_comp = self._extract_title_from_soup(comp_soup)
+                        title_from_comp = comp_page['title']
                         if title_from_comp:
                             final_title_base = title_from_comp
                             logging.info(f"Using title base from previous part {comp_num}: '{title_from_comp}'")
@@ -296,54 +880,88 @@ class EPERHandler:
         if len(final_title_str) > 80:
             final_title_str = final_title_str[:77].strip() + "..."
 
-        # --- Construct the comprehensive summary for 'title_base_description' ---
-        summary_lines = []
-        
-        # Use the collected ePER description or a default if it's still empty
-        eper_desc_for_summary = final_title_base if final_title_base else "Nicht spezifiziert"
-        summary_lines.append(f"Bezeichnung (ePER): {eper_desc_for_summary}")
-        summary_lines.append(f"Teilenummer (Anfrage): {part_number}")
-        summary_lines.append(f"Preis (EUR): {final_eper_price_str if final_eper_price_str else 'Nicht verfügbar'}")
-        
-        weight_display = 'Nicht verfügbar'
-        if final_weight_kg and final_weight_kg != '0': # Ensure weight is valid and not '0'
-            weight_display = f"{final_weight_kg} kg"
-        summary_lines.append(f"Gewicht: {weight_display}")
-
-        if final_fitting_cars_list:
-            car_summary = f"{len(final_fitting_cars_list)} Modell(e)"
-            if len(final_fitting_cars_list) > 0:
-                car_examples = ", ".join(final_fitting_cars_list[:3]) # Show up to 3 examples
-                car_summary += f" (z.B. {car_examples}{'...' if len(final_fitting_cars_list) > 3 else ''})"
-            summary_lines.append(f"Passende Fahrzeuge: {car_summary}")
-        else:
-            summary_lines.append("Passende Fahrzeuge: Keine Daten")
-
-        if final_output_comparison_numbers:
-            comp_summary_count = len(final_output_comparison_numbers)
-            # Filter out the original part_number for display of examples, if it's in the list
-            actual_comps_examples = [cn for cn in final_output_comparison_numbers if cn != part_number][:3]
-            
-            comp_display_text = f"{comp_summary_count} Nummer(n) gefunden"
-            if actual_comps_examples:
-                comp_display_text += f" (inkl. {', '.join(actual_comps_examples)}{'...' if len(final_output_comparison_numbers) > 3 and len(actual_comps_examples) == 3 else ''})"
-            elif comp_summary_count == 1 and final_output_comparison_numbers[0] == part_number:
-                comp_display_text = f"1 (nur angefragte Nummer)"
-            summary_lines.append(f"Vergleichs-/Ersatznummern: {comp_display_text}")
-        else:
-            summary_lines.append("Vergleichs-/Ersatznummern: Keine Daten")
-
-        comprehensive_summary_str = "\n".join(summary_lines)
-
-        return {
-            'part_number': part_number,
-            'eper_price_str': final_eper_price_str,
-            'weight_kg': final_weight_kg,
-            'fitting_cars': final_fitting_cars_list,
-            'comparison_numbers': final_output_comparison_numbers,
-            'title': final_title_str, # Der kurze Titel (z.B. für eBay)
-            'title_base_description': comprehensive_summary_str # Die ausführliche Zusammenfassung
-        }
+        # The comprehensive summary ('title_base_description') is rendered by PartRecord on access
+        part_details = PartRecord.from_strings(
+            part_number, final_eper_price_str, final_weight_kg, final_fitting_cars_list,
+            final_output_comparison_numbers, final_title_str, # Der kurze Titel (z.B. für eBay)
+            description=final_title_base or "" # Die ePER-Bezeichnung für die ausführliche Zusammenfassung
+        )
+        if self.cache:
+            self.cache.set_part(part_number, part_details.to_cache_fields(), self._pages_fetched_at)
+        return part_details
+
+    def _aggregate_selected_fields(self, part_number):
+        """
+        Field-selective variant of _aggregate_part_details for the SELECTIVE_FIELDS in self.fields.
+
+        Missing values are filled by the same rules and in the same order (replacement chain
+        level by level, then previous parts), but the walk stops as soon as every requested
+        field has a value, and the supersession graph is not expanded up front. A part whose
+        own page has all requested values therefore costs a single page load.
+        """
+        logging.info(f"Fetching ePER {', '.join(self.fields)} for part number: {part_number}...")
+        (primary_page,) = yield [part_number]
+        if not primary_page:
+            logging.warning(f"Could not fetch initial ePER data for {part_number}. Proceeding with limited info.")
+            return PartRecord.from_strings(part_number, None, '0', [], [part_number], f"OEM {part_number}",
+                                           description=None)
+
+        page_fields = [SELECTIVE_FIELDS[field] for field in self.fields]
+        values = {field: primary_page[field] for field in page_fields}
+
+        def missing_fields():
+            # Same gaps as in the full lookup: no value, or the weight placeholder '0'
+            return [field for field in page_fields
+                    if not values[field] or (field == 'weight_kg' and values[field] == '0')]
+
+        def fill_from(comp_num, comp_page, source):
+            for field in missing_fields():
+                value = comp_page[field]
+                if value and not (field == 'weight_kg' and value == '0'):
+                    values[field] = value
+                    logging.info(f"Using {field} from {source} {comp_num}: {value}")
+
+        current_level = [num for num in dict.fromkeys(primary_page['replacement_numbers']) if num != part_number]
+        processed_parts = {part_number}
+        queued_parts = set(current_level)
+        while current_level and missing_fields():
+            level_pages = yield current_level
+            next_level = []
+            for comp_num, comp_page in zip(current_level, level_pages):
+                processed_parts.add(comp_num)
+                if not comp_page:
+                    continue
+                fill_from(comp_num, comp_page, 'replacement')
+                for further_rep_num in comp_page['replacement_numbers']:
+                    if further_rep_num not in processed_parts and further_rep_num not in queued_parts:
+                        queued_parts.add(further_rep_num)
+                        next_level.append(further_rep_num)
+            current_level = next_level
+
+        previous_candidates = [
+            num for num in dict.fromkeys(primary_page['previous_numbers'])
+            if num != part_number and num not in processed_parts
+        ]
+        batch_start = 0
+        while missing_fields() and batch_start < len(previous_candidates):
+            batch = previous_candidates[batch_start:batch_start + self.max_workers]
+            batch_start += len(batch)
+            batch_pages = yield batch
+            for comp_num, comp_page in zip(batch, batch_pages):
+                if comp_page:
+                    fill_from(comp_num, comp_page, 'previous part')
+
+        part_details = PartRecord.from_strings(
+            part_number, values.get('eper_price_str'), values.get('weight_kg'), (), (), "",
+            description=values['title'] if 'title' in values else None
+        )
+        if self.cache:
+            cache_fields = part_details.to_cache_fields()
+            self.cache.set_part(part_number, {
+                field: cache_fields[field]
+                for field in ['part_number'] + [SELECTIVE_CACHE_FIELDS[name] for name in self.fields]
+            }, self._pages_fetched_at)
+        return part_details
 
 # Example usage:
 # Configure logging if you want to see the info messages
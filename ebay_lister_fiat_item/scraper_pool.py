@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+import cloudscraper
+import cloudscraper.exceptions
+import requests
+from .clearance import ClearanceJar, get_default_clearance_jar
+from .throttle import THROTTLE_STATUS_CODES
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 300  # Seconds an unused session is kept alive
+SCRAPER_BROWSER = {'browser': 'chrome', 'platform': 'windows', 'desktop': True}
+
+
+def create_eper_scraper():
+    """Creates a new cloudscraper session with the browser profile used for ePER."""
+    return cloudscraper.create_scraper(browser=SCRAPER_BROWSER)
+
+
+class ScraperPool:
+    """
+    Thread-safe pool of reusable cloudscraper sessions.
+
+    A session keeps its TCP/TLS connections alive and remembers the Cloudflare
+    cookies it earned, so borrowing one is much cheaper than creating a new
+    scraper for every request. At most 'max_size' sessions exist at a time;
+    sessions that stay unused for longer than 'idle_timeout' seconds are closed.
+
+    With a ClearanceJar, new sessions start with the stored Cloudflare clearance and
+    returned sessions store a newly earned one, so it survives process restarts.
+    """
+    def __init__(self, max_size: int = DEFAULT_POOL_SIZE, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 factory: Optional[Callable] = None, clearance_jar: Optional[ClearanceJar] = None):
+        """
+        Args:
+            max_size (int): Maximum number of sessions that exist at the same time.
+            idle_timeout (float): Seconds after which an unused session is closed.
+            factory (Optional[Callable]): Creates a new session. Defaults to create_eper_scraper.
+            clearance_jar (Optional[ClearanceJar]): Persists Cloudflare clearance between processes.
+                Defaults to the process-wide jar for the default factory and to none for a custom
+                factory; False disables it.
+        """
+        if max_size < 1:
+            raise ValueError("ScraperPool max_size must be at least 1.")
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.factory = factory or create_eper_scraper
+        if clearance_jar is None and factory is None:
+            clearance_jar = get_default_clearance_jar()
+        self.clearance_jar = clearance_jar or None
+        self._idle = []  # (session, last_used) pairs, most recently used last
+        self._created = 0
+        self._condition = threading.Condition()
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        fresh = []
+        for session, last_used in self._idle:
+            if now - last_used > self.idle_timeout:
+                self._close_session(session)
+                self._created -= 1
+            else:
+                fresh.append((session, last_used))
+        self._idle = fresh
+
+    @staticmethod
+    def _close_session(session):
+        try:
+            session.close()
+        except Exception as e:
+            logging.debug(f"Error closing scraper session: {e}")
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Borrows a session from the pool, creating one if the pool is not full yet.
+        Blocks until a session is returned if all 'max_size' sessions are in use.
+
+        Raises:
+            TimeoutError: If no session became available within 'timeout' seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                self._evict_idle()
+                if self._idle:
+                    session, _ = self._idle.pop()
+                    return session
+                if self._created < self.max_size:
+                    self._created += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No scraper session available in the pool.")
+                self._condition.wait(remaining)
+
+        try:
+            logging.debug("Creating new cloudscraper session for the pool.")
+            session = self.factory()
+            if self.clearance_jar:
+                self.clearance_jar.apply(session)
+            return session
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, session, discard: bool = False):
+        """Returns a session to the pool. Broken sessions should be released with discard=True."""
+        if self.clearance_jar and not discard:
+            self.clearance_jar.save(session)
+        with self._condition:
+            if discard:
+                self._close_session(session)
+                self._created -= 1
+            else:
+                self._idle.append((session, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """
+        Context manager that borrows a session and returns it afterwards. The session is
+        discarded on Cloudflare, connection and throttling errors, but kept on ordinary HTTP
+        errors such as 404 for an unknown part number, so it keeps its Cloudflare clearance.
+        """
+        session = self.acquire(timeout)
+        try:
+            yield session
+        except Exception as e:
+            if self.clearance_jar and self._is_challenge(e):
+                self.clearance_jar.invalidate()
+            self.release(session, discard=self._is_broken(e))
+            raise
+        else:
+            self.release(session)
+
+    @staticmethod
+    def _is_broken(error: Exception) -> bool:
+        """False for an HTTP error response that says nothing about the session (e.g. 404), True otherwise."""
+        if not isinstance(error, requests.exceptions.HTTPError):
+            return True # Cloudflare challenge, connection error or an unexpected failure
+        response = getattr(error, 'response', None)
+        return response is None or response.status_code in THROTTLE_STATUS_CODES
+
+    @staticmethod
+    def _is_challenge(error: Exception) -> bool:
+        """True if ePER answered with a Cloudflare challenge/denial instead of the page."""
+        if isinstance(error, cloudscraper.exceptions.CloudflareException):
+            return True
+        response = getattr(error, 'response', None)
+        return isinstance(error, requests.exceptions.HTTPError) and response is not None \
+            and response.status_code == 403
+
+    def close(self):
+        """Closes all idle sessions. Sessions currently borrowed are closed when released with discard=True."""
+        with self._condition:
+            for session, _ in self._idle:
+                self._close_session(session)
+                self._created -= 1
+            self._idle = []
+
+    @property
+    def size(self) -> int:
+        """Number of sessions currently owned by the pool (idle and borrowed)."""
+        with self._condition:
+            return self._created
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> ScraperPool:
+    """Returns the process-wide pool shared by all EPERHandler instances."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ScraperPool()
+        return _default_pool
+
+
+def configure_default_pool(max_size: int = DEFAULT_POOL_SIZE,
+                           idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> ScraperPool:
+    """Replaces the process-wide pool with one of the given size and idle timeout."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is not None:
+            _default_pool.close()
+        _default_pool = ScraperPool(max_size=max_size, idle_timeout=idle_timeout)
+        return _default_pool
@@ -0,0 +1,39 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into a single execution.
+
+    The first caller for a key runs the function; callers that arrive while it is still
+    running wait for it and receive the same result (or exception). Once the call has
+    finished the key is released, so later calls run again. Results are not kept -
+    that is the job of the caches.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, function: Callable, *args, **kwargs):
+        """Runs function(*args, **kwargs) unless a call with the same key is in flight, then waits for that one."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_owner = call is None
+            if is_owner:
+                call = self._calls[key] = Future()
+        if is_owner:
+            try:
+                call.set_result(function(*args, **kwargs))
+            except BaseException as e:
+                call.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return call.result()
+
+    def in_flight(self) -> int:
+        """Number of keys currently being executed."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,149 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Edges are read from the 'replacements' and 'previous' tab panes of a part's ePER page,
+# so they expire together with the cached replacement/previous numbers.
+DEFAULT_EDGE_TTL = 30 * 24 * 60 * 60
+
+REPLACEMENT = 'replacement'
+PREVIOUS = 'previous'
+RELATIONS = (REPLACEMENT, PREVIOUS)
+
+
+class SupersessionGraph:
+    """
+    Persistent directed graph of ePER part supersessions.
+
+    For every part whose page has been fetched, the graph stores its replacement and
+    previous part numbers (in page order) together with the fetch time. A replacement
+    chain can then be expanded with a local query instead of one HTTP round trip per
+    level; only parts whose edges are missing or older than 'edge_ttl' are reported as
+    needing a fetch. The graph lives in its own tables and can share the SQLite file
+    of an EPERCache (see EPERCache.graph).
+    """
+    def __init__(self, path: str, edge_ttl: float = DEFAULT_EDGE_TTL):
+        """
+        Args:
+            path (str): Path to the SQLite file.
+            edge_ttl (float): Seconds after which the edges of a part count as stale.
+        """
+        self.path = path
+        self.edge_ttl = edge_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # A node row marks that the edges of a part are known, even if it has none.
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS supersession_nodes ("
+                " part_number TEXT PRIMARY KEY,"
+                " fetched_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS supersession_edges ("
+                " part_number TEXT NOT NULL,"
+                " relation TEXT NOT NULL,"
+                " position INTEGER NOT NULL,"
+                " target TEXT NOT NULL,"
+                " PRIMARY KEY (part_number, relation, position))"
+            )
+            self._conn.commit()
+
+    def record(self, part_number: str, replacements: Iterable[str] = (), previous: Iterable[str] = (),
+               fetched_at: Optional[float] = None):
+        """Replaces the stored edges of a part with the numbers read from its ePER page."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [
+            (part_number, relation, position, target)
+            for relation, targets in ((REPLACEMENT, replacements), (PREVIOUS, previous))
+            for position, target in enumerate(targets)
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM supersession_edges WHERE part_number = ?", (part_number,))
+                self._conn.executemany(
+                    "INSERT INTO supersession_edges (part_number, relation, position, target) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO supersession_nodes (part_number, fetched_at) VALUES (?, ?)",
+                    (part_number, fetched_at)
+                )
+
+    def _fresh_edges(self, part_numbers: List[str], relation: str) -> Dict[str, List[str]]:
+        """Returns {part_number: targets} for the given parts whose edges are known and fresh."""
+        if not part_numbers:
+            return {}
+        placeholders = ', '.join('?' for _ in part_numbers)
+        min_fetched_at = time.time() - self.edge_ttl
+        with self._lock:
+            nodes = self._conn.execute(
+                f"SELECT part_number FROM supersession_nodes WHERE part_number IN ({placeholders}) AND fetched_at >= ?",
+                (*part_numbers, min_fetched_at)
+            ).fetchall()
+            edges = self._conn.execute(
+                f"SELECT part_number, target FROM supersession_edges"
+                f" WHERE part_number IN ({placeholders}) AND relation = ? ORDER BY part_number, position",
+                (*part_numbers, relation)
+            ).fetchall()
+        fresh = {node: [] for (node,) in nodes}
+        for node, target in edges:
+            if node in fresh:
+                fresh[node].append(target)
+        return fresh
+
+    def edges(self, part_number: str, relation: str = REPLACEMENT) -> Optional[List[str]]:
+        """Returns the stored targets of a part in page order, or None if they are unknown or stale."""
+        return self._fresh_edges([part_number], relation).get(part_number)
+
+    def replacements(self, part_number: str) -> Optional[List[str]]:
+        return self.edges(part_number, REPLACEMENT)
+
+    def previous(self, part_number: str) -> Optional[List[str]]:
+        return self.edges(part_number, PREVIOUS)
+
+    def expand(self, part_number: str, relation: str = REPLACEMENT) -> Tuple[List[str], List[str]]:
+        """
+        Walks the chain of a part breadth-first through the stored graph, one query per level.
+
+        Returns:
+            Tuple[List[str], List[str]]: All parts reached from part_number (without it, in
+            breadth-first order) and the subset whose own edges are missing or stale and
+            therefore still have to be fetched to complete the chain.
+        """
+        reached = {}
+        unresolved = []
+        visited = {part_number}
+        current_level = [part_number]
+        while current_level:
+            fresh = self._fresh_edges(current_level, relation)
+            next_level = []
+            for node in current_level:
+                if node not in fresh:
+                    if node != part_number:
+                        unresolved.append(node)
+                    continue
+                for target in fresh[node]:
+                    if target not in visited:
+                        visited.add(target)
+                        reached[target] = None
+                        next_level.append(target)
+            current_level = next_level
+        return list(reached), unresolved
+
+    def invalidate(self, part_number: Optional[str] = None) -> int:
+        """Forgets the edges of one part, or of all parts. Returns the number of removed parts."""
+        where, params = ("WHERE part_number = ?", (part_number,)) if part_number is not None else ("", ())
+        with self._lock:
+            with self._conn:
+                self._conn.execute(f"DELETE FROM supersession_edges {where}", params)
+                cursor = self._conn.execute(f"DELETE FROM supersession_nodes {where}", params)
+        logging.info(f"Invalidated supersession edges of {cursor.rowcount} part(s).")
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# Responses with which ePER/Cloudflare tell us to slow down
+THROTTLE_STATUS_CODES = (403, 429, 503)
+
+DEFAULT_INITIAL_LIMIT = 4
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 16
+DEFAULT_DECREASE_FACTOR = 0.5
+DEFAULT_FAILURE_THRESHOLD = 3 # Throttled responses in a row that open the circuit
+DEFAULT_RESET_TIMEOUT = 30.0 # Seconds the circuit stays open before a trial request
+DEFAULT_MAX_RESET_TIMEOUT = 600.0
+DEFAULT_MAX_RETRIES = 3 # Retries of a throttled request
+DEFAULT_RETRY_BACKOFF = 1.0 # Seconds before the first retry of a throttled request, doubled per retry
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Reads the Retry-After header of a response (seconds or HTTP date), or None."""
+    value = (getattr(response, 'headers', None) or {}).get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveThrottle:
+    """
+    AIMD concurrency limit plus circuit breaker for ePER requests.
+
+    Every request holds a slot; at most 'limit' slots are in use. Each successful response
+    raises the limit additively (about +1 per 'limit' successes), each throttling response
+    (403/429/503) cuts it multiplicatively, at most once per second so one burst of
+    rejections counts once. After 'failure_threshold' throttled responses in a row, or
+    when the server sends Retry-After, the circuit opens: no request is sent until the
+    reset timeout has passed. Then a single trial request is let through (half-open);
+    if it succeeds the circuit closes, otherwise it opens again with twice the timeout.
+    Callers wait retry_delay() seconds before they retry a throttled request.
+    """
+    def __init__(self, initial_limit: int = DEFAULT_INITIAL_LIMIT, min_limit: int = DEFAULT_MIN_LIMIT,
+                 max_limit: int = DEFAULT_MAX_LIMIT, decrease_factor: float = DEFAULT_DECREASE_FACTOR,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 max_reset_timeout: float = DEFAULT_MAX_RESET_TIMEOUT, max_retries: int = DEFAULT_MAX_RETRIES,
+                 retry_backoff: float = DEFAULT_RETRY_BACKOFF):
+        """
+        Args:
+            initial_limit (int): Concurrent requests at the start.
+            min_limit (int): The limit never drops below this.
+            max_limit (int): The limit never grows above this.
+            decrease_factor (float): Factor applied to the limit on a throttling response.
+            failure_threshold (int): Throttled responses in a row that open the circuit.
+            reset_timeout (float): Seconds the circuit stays open the first time.
+            max_reset_timeout (float): Upper bound for the doubled reset timeout.
+            max_retries (int): How often callers retry a throttled request.
+            retry_backoff (float): Seconds before the first retry; doubled for every further retry.
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("AdaptiveThrottle needs 1 <= min_limit <= initial_limit <= max_limit.")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._condition = threading.Condition()
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._state = CLOSED
+        self._open_until = 0.0
+        self._current_reset_timeout = reset_timeout
+        self._consecutive_throttles = 0
+        self._last_decrease = float('-inf')
+        self._successes = 0
+        self._throttles = 0
+        self._trips = 0
+
+    def retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retrying after the throttled attempt 'attempt' (0-based): the
+        server's Retry-After or the exponential backoff, whichever is longer."""
+        return max(retry_after or 0.0, self.retry_backoff * 2 ** attempt)
+
+    def _refresh_state(self, now: float):
+        if self._state == OPEN and now >= self._open_until:
+            self._state = HALF_OPEN
+            logging.info("ePER circuit breaker half-open: sending a trial request.")
+
+    def _slots(self) -> int:
+        return 1 if self._state == HALF_OPEN else int(self._limit)
+
+    def breaker_delay(self) -> float:
+        """Seconds until the open circuit lets a trial request through (0 if it is not open)."""
+        with self._condition:
+            now = time.monotonic()
+            self._refresh_state(now)
+            return max(0.0, self._open_until - now) if self._state == OPEN else 0.0
+
+    def try_acquire(self) -> bool:
+        """Takes a slot without blocking. Returns False if the circuit is open or all slots are in use."""
+        with self._condition:
+            self._refresh_state(time.monotonic())
+            if self._state != OPEN and self._in_flight < self._slots():
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        """Blocks until the circuit allows a request and a slot is free, then takes the slot."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refresh_state(now)
+                if self._state == OPEN:
+                    self._condition.wait(self._open_until - now)
+                elif self._in_flight < self._slots():
+                    self._in_flight += 1
+                    return
+                else:
+                    self._condition.wait(1.0)
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Context manager around acquire() and release()."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_success(self):
+        """A response that was not throttled: grows the limit and closes a half-open circuit."""
+        with self._condition:
+            self._successes += 1
+            self._consecutive_throttles = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._current_reset_timeout = self.reset_timeout
+                logging.info("ePER circuit breaker closed again.")
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def record_throttle(self, retry_after: Optional[float] = None):
+        """A throttling response: shrinks the limit and opens the circuit if needed."""
+        with self._condition:
+            now = time.monotonic()
+            self._throttles += 1
+            self._consecutive_throttles += 1
+            if now - self._last_decrease >= 1.0:
+                self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                self._last_decrease = now
+                logging.warning(f"ePER is throttling: concurrency limit lowered to {int(self._limit)}.")
+            if self._state == HALF_OPEN:
+                self._current_reset_timeout = min(self.max_reset_timeout, self._current_reset_timeout * 2)
+                self._open(now, retry_after)
+            elif self._state == CLOSED and (retry_after or self._consecutive_throttles >= self.failure_threshold):
+                self._open(now, retry_after)
+
+    def _open(self, now: float, retry_after: Optional[float]):
+        timeout = max(self._current_reset_timeout, retry_after or 0.0)
+        self._state = OPEN
+        self._open_until = now + timeout
+        self._trips += 1
+        logging.warning(f"ePER circuit breaker open: pausing requests for {timeout:.0f}s.")
+
+    @property
+    def state(self) -> str:
+        """CLOSED, OPEN or HALF_OPEN."""
+        with self._condition:
+            self._refresh_state(time.monotonic())
+            return self._state
+
+    @property
+    def limit(self) -> int:
+        """The current concurrency limit."""
+        with self._condition:
+            return int(self._limit)
+
+    def stats(self) -> Dict:
+        """Snapshot of breaker state, limit and counters, e.g. for logging a batch's progress."""
+        with self._condition:
+            now = time.monotonic()
+            self._refresh_state(now)
+            return {
+                'state': self._state,
+                'limit': int(self._limit),
+                'in_flight': self._in_flight,
+                'open_for': max(0.0, self._open_until - now) if self._state == OPEN else 0.0,
+                'successes': self._successes,
+                'throttles': self._throttles,
+                'trips': self._trips,
+            }
+
+
+_default_throttle = None
+_default_throttle_lock = threading.Lock()
+
+
+def get_default_throttle() -> AdaptiveThrottle:
+    """Returns the throttle shared by all EPERHandler instances in this process."""
+    global _default_throttle
+    with _default_throttle_lock:
+        if _default_throttle is None:
+            _default_throttle = AdaptiveThrottle()
+        return _default_throttle
+
+
+def configure_default_throttle(**options) -> AdaptiveThrottle:
+    """Replaces the process-wide throttle; options as for AdaptiveThrottle."""
+    global _default_throttle
+    with _default_throttle_lock:
+        _default_throttle = AdaptiveThrottle(**options)
+        return _default_throttle
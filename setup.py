@@ -54,6 +54,16 @@ setup(
             "twine>=3.0.0",     # For uploading to PyPI
             "wheel",            # For building wheel distributions
         ],
+        "async": [
+            "aiohttp>=3.8",     # For async_eper.AsyncEPERClient
+        ],
+        "zstd": [
+            "zstandard>=0.15",  # Smaller pages in page_store.PageStore (zlib otherwise)
+        ],
+        "fast": [
+            "lxml>=4.6",        # html_parsers 'lxml' backend
+            "selectolax>=0.3.12", # html_parsers 'selectolax' backend (fastest)
+        ],
         "test": [
             "pytest>=6.0",
             # "pytest-cov", # For coverage
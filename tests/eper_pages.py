@@ -0,0 +1,36 @@
+# ebay_lister_fiat_item_project/tests/eper_pages.py
+
+"""Builds minimal ePER part pages for offline tests."""
+
+
+def build_eper_page(description="BREMSSCHEIBE", code="1234", weight_g="500",
+                    price="12,34 EUR", drawings=(), previous=(), replacements=()):
+    """
+    Returns an HTML page with the same structure as eper.fiatforum.com part pages.
+
+    drawings is a list of model strings (first cell of the drawings pane),
+    previous and replacements are lists of part numbers.
+    """
+    def number_rows(numbers):
+        return "".join(f"<tr><td>x</td><td>y</td><td>{number}</td></tr>" for number in numbers)
+
+    drawing_rows = "".join(f"<tr><td>{model}</td><td>detail</td></tr>" for model in drawings)
+    price_row = f"<tr><td>Germany</td><td>{price}</td></tr>" if price is not None else ""
+    table_sm = ""
+    if description is not None:
+        table_sm = (
+            '<table class="table table-sm">'
+            f"<tr><td>Description</td><td>{description}</td></tr>"
+            f"<tr><td>Code</td><td>Code: {code}</td></tr>"
+            f"<tr><td>Weight</td><td>{weight_g}</td></tr>"
+            "</table>"
+        )
+    return (
+        "<html><body>"
+        f"{table_sm}"
+        f'<div id="prices-tab-pane"><table><tr><td>Italy</td><td>10,00 EUR</td></tr>{price_row}</table></div>'
+        f'<div id="drawings-tab-pane"><table>{drawing_rows}</table></div>'
+        f'<div id="previous-tab-pane"><table>{number_rows(previous)}</table></div>'
+        f'<div id="replacements-tab-pane"><table>{number_rows(replacements)}</table></div>'
+        "</body></html>"
+    )
@@ -0,0 +1,219 @@
+# ebay_lister_fiat_item_project/tests/test_async_eper.py
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+from bs4 import BeautifulSoup
+from ebay_lister_fiat_item.eper_cache import EPERCache
+from ebay_lister_fiat_item.rate_limit import TokenBucketLimiter
+from ebay_lister_fiat_item.scrape_open_eper import EPERHandler
+from ebay_lister_fiat_item.throttle import AdaptiveThrottle
+from .eper_pages import build_eper_page
+
+try:
+    from ebay_lister_fiat_item.async_eper import AsyncEPERClient, aiohttp
+except ImportError:
+    aiohttp = None
+
+PAGES = {
+    '111': build_eper_page(description='BREMSSCHEIBE', price=None, drawings=['FIAT PUNTO (188)'],
+                           previous=['100'], replacements=['222', '333']),
+    '222': build_eper_page(description='BREMSSCHEIBE NEU', price='45,60 EUR', drawings=['LANCIA Y (840)'],
+                           replacements=['444']),
+    '333': build_eper_page(drawings=['ALFA ROMEO 147 (937)']),
+    '444': build_eper_page(weight_g='900'),
+    '100': build_eper_page(drawings=['FIAT PANDA (169)']),
+    '555': build_eper_page(description='LAGER', replacements=['444']),
+}
+
+
+class FakeEPERServer:
+    """Serves the pages above on localhost, like eper.fiatforum.com serves part pages."""
+
+    def __init__(self, delay=0.0):
+        self.requests = []
+        self.open_requests = 0
+        self.max_open_requests = 0
+        self.delay = delay
+        self.throttled = set() # Part numbers answered once with 429 and Retry-After: 2
+        lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                part_number = parse_qs(urlparse(self.path).query).get('PartNumber', [''])[0]
+                with lock:
+                    server.requests.append(part_number)
+                    server.open_requests += 1
+                    server.max_open_requests = max(server.max_open_requests, server.open_requests)
+                try:
+                    time.sleep(server.delay)
+                    with lock:
+                        throttled = part_number in server.throttled
+                        server.throttled.discard(part_number)
+                    if throttled:
+                        self.send_response(429)
+                        self.send_header('Retry-After', '2')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    html = PAGES.get(part_number)
+                    body = (html or "not found").encode('utf-8')
+                    self.send_response(200 if html else 404)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with lock:
+                        server.open_requests -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url_template = (f"http://127.0.0.1:{self.httpd.server_address[1]}"
+                             "/Part/SearchPartByPartNumber?PartNumber={part_number}")
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def sync_details(part_number):
+    def fake_fetch(num):
+        html = PAGES.get(num)
+        return BeautifulSoup(html, 'html.parser') if html else None
+    with patch.object(EPERHandler, '_fetch_soup', side_effect=fake_fetch):
+        return EPERHandler(part_number, cache=False).data
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class TestAsyncEPERClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeEPERServer()
+
+    def tearDown(self):
+        self.server.close()
+
+    def client(self, **options):
+        options.setdefault('rate_limiter', TokenBucketLimiter(rate=1000, burst=1000))
+        options.setdefault('cache', False)
+        return AsyncEPERClient(url_template=self.server.url_template, **options)
+
+    def test_get_part_details_matches_sync_handler(self):
+        async def run():
+            async with self.client() as client:
+                return await client.get_part_details('111')
+        self.assertEqual(asyncio.run(run()), sync_details('111'))
+
+    def test_missing_part_falls_back(self):
+        async def run():
+            async with self.client() as client:
+                return await client.get_part_details('404')
+        self.assertEqual(asyncio.run(run()), sync_details('404'))
+
+    def test_fetch_many_shares_pages_and_skips_duplicates(self):
+        async def run():
+            async with self.client() as client:
+                return {handler.part_number: handler async for handler in client.fetch_many(['111', '555', '111'])}
+        handlers = asyncio.run(run())
+        self.assertEqual(set(handlers), {'111', '555'})
+        self.assertEqual(handlers['111'].data, sync_details('111'))
+        self.assertEqual(handlers['555'].data, sync_details('555'))
+        self.assertEqual(handlers['555']['weight_kg'], '0.5')
+        self.assertEqual(self.server.requests.count('444'), 1)
+
+    def test_concurrent_lookups_share_in_flight_pages(self):
+        self.server.delay = 0.1
+        async def run():
+            async with self.client() as client:
+                return await asyncio.gather(client.get_part_details('111'), client.get_part_details('555'),
+                                            client.get_part_details(' 111'))
+        first, second, third = asyncio.run(run())
+        self.assertEqual(first, sync_details('111'))
+        self.assertEqual(second, sync_details('555'))
+        self.assertEqual(third['comparison_numbers'][1:], first['comparison_numbers'][1:])
+        for part_number in ('111', '222', '333'): # Shared by the two lookups of 111
+            self.assertEqual(self.server.requests.count(part_number), 1)
+
+    def test_concurrency_is_bounded(self):
+        self.server.delay = 0.05
+        async def run():
+            async with self.client(max_concurrency=2) as client:
+                return [handler async for handler in client.fetch_many(['222', '333', '444', '100'])]
+        self.assertEqual(len(asyncio.run(run())), 4)
+        self.assertLessEqual(self.server.max_open_requests, 2)
+
+    def test_throttled_request_waits_before_retry(self):
+        self.server.throttled.add('444')
+        throttle = AdaptiveThrottle(reset_timeout=0, retry_backoff=0.5)
+        throttle.record_throttle = lambda retry_after=None: None # Keep the breaker out of this test
+        delays = []
+        real_sleep = asyncio.sleep
+
+        async def sleep(delay, *args, **kwargs):
+            delays.append(delay)
+            await real_sleep(0)
+
+        async def run():
+            async with self.client(throttle=throttle) as client:
+                return await client.get_part_details('444')
+        with patch('ebay_lister_fiat_item.async_eper.asyncio.sleep', side_effect=sleep):
+            details = asyncio.run(run())
+        self.assertEqual(details, sync_details('444'))
+        self.assertEqual(self.server.requests.count('444'), 2)
+        self.assertIn(2.0, delays) # Retry-After wins over the 0.5s backoff
+
+    def test_slow_cache_does_not_block_the_event_loop(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache = EPERCache(os.path.join(tmp_dir, 'cache.sqlite3'))
+        self.addCleanup(cache.close)
+        get_page = cache.get_page
+
+        def slow_get_page(*args, **kwargs):
+            time.sleep(0.3) # E.g. another process holds the SQLite lock
+            return get_page(*args, **kwargs)
+        cache.get_page = slow_get_page
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+            ticking = asyncio.ensure_future(ticker())
+            async with self.client(cache=cache) as client:
+                details = await client.get_part_details('444')
+            ticking.cancel()
+            return details, ticks
+        details, ticks = asyncio.run(run())
+        self.assertEqual(details['weight_kg'], '0.9')
+        self.assertGreater(ticks, 10)
+
+    def test_leaving_fetch_many_cancels_pending_lookups(self):
+        self.server.delay = 0.1
+        async def run():
+            async with self.client(max_concurrency=1) as client:
+                async for handler in client.fetch_many(['333', '444', '100']):
+                    break
+                await asyncio.sleep(0.3)
+        asyncio.run(run())
+        self.assertLess(len(self.server.requests), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# ebay_lister_fiat_item_project/tests/test_category_cache.py
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from ebay_lister_fiat_item.category_cache import CategoryCache, DEFAULT_FALLBACK_TTL
+from ebay_lister_fiat_item.ebay_item import EBAYHandler
+from .test_ebay_item import MockEbaySDKResponse
+
+
+def _search_response(category_id=None):
+    if category_id is None:
+        return MockEbaySDKResponse(reply_dict={'searchResult': {'_count': '0', 'item': []}})
+    return MockEbaySDKResponse(reply_dict={
+        'searchResult': {'_count': '1', 'item': [{'primaryCategory': {'categoryId': category_id}}]}
+    })
+
+
+class TestCategoryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = CategoryCache(os.path.join(self.tmp_dir, 'categories.sqlite3'))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip(self):
+        self.cache.set('111', '33567')
+        self.assertEqual(self.cache.get('111'), '33567')
+        self.assertIsNone(self.cache.get('222'))
+
+    def test_class_members_share_category(self):
+        self.cache.link(['111', '222'])
+        self.cache.link(['222', '333'])
+        self.assertEqual(self.cache.class_members('333'), ['111', '222', '333'])
+        self.cache.set('111', '33567')
+        self.assertEqual(self.cache.get('333'), '33567')
+
+    def test_fallback_is_not_shared_and_expires_early(self):
+        self.cache.link(['111', '222'])
+        self.cache.set('111', '185012', is_fallback=True)
+        self.assertEqual(self.cache.get('111'), '185012')
+        self.assertIsNone(self.cache.get('222'))
+        self.cache.set('111', '185012', is_fallback=True, fetched_at=time.time() - DEFAULT_FALLBACK_TTL - 1)
+        self.assertIsNone(self.cache.get('111'))
+
+    def test_class_result_replaces_own_fallback(self):
+        self.cache.link(['111', '222'])
+        self.cache.set('111', '185012', is_fallback=True)
+        self.cache.set('222', '33567')
+        self.assertEqual(self.cache.get('111'), '33567')
+
+    def test_invalidate_fallbacks(self):
+        self.cache.set('111', '185012', is_fallback=True)
+        self.cache.set('222', '33567')
+        self.assertEqual(self.cache.invalidate(fallbacks_only=True), 1)
+        self.assertEqual(self.cache.get_many(['111', '222']), {'222': '33567'})
+
+
+class TestEBAYHandlerCategoryCache(unittest.TestCase):
+
+    @patch('ebay_lister_fiat_item.ebay_item.Trading')
+    @patch('ebay_lister_fiat_item.ebay_item.Finding')
+    @patch('ebay_lister_fiat_item.ebay_item.load_ebay_env_config')
+    def setUp(self, mock_load_env, mock_finding_conn, mock_trading_conn):
+        mock_load_env.return_value = {'appid': 'A', 'certid': 'C', 'devid': 'D', 'token': 'T', 'siteid': '77'}
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = CategoryCache(os.path.join(self.tmp_dir, 'categories.sqlite3'))
+        self.handler = EBAYHandler(category_cache=self.cache)
+        self.categories = {}
+        self.searched = []
+
+        def execute(verb, data):
+            self.searched.append(data['keywords'])
+            return _search_response(self.categories.get(data['keywords']))
+        self.finding_api = MagicMock()
+        self.finding_api.execute.side_effect = execute
+        self.handler.api_finding = self.finding_api
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_second_lookup_is_cached(self):
+        self.categories['111'] = '33567'
+        self.assertEqual(self.handler.get_category_id('111'), '33567')
+        self.assertEqual(self.handler.get_category_id('111'), '33567')
+        self.assertEqual(self.searched, ['111'])
+
+    def test_failed_search_is_not_cached(self):
+        self.finding_api.execute.side_effect = RuntimeError("timeout")
+        self.assertEqual(self.handler.get_category_id('111'), '185012')
+        self.assertIsNone(self.cache.get('111'))
+
+    def test_batch_searches_once_per_class(self):
+        self.categories.update({'222': '33567', '444': '33654'})
+        with patch('ebay_lister_fiat_item.ebay_item.Finding', return_value=self.finding_api):
+            result = self.handler.get_category_ids(['444', '222', '111', '444', '555'],
+                                                   comparison_numbers={'222': ['111']}, max_workers=3)
+        self.assertEqual(list(result), ['444', '222', '111', '555'])
+        self.assertEqual(result, {'444': '33654', '222': '33567', '111': '33567', '555': '185012'})
+        self.assertEqual(sorted(self.searched), ['222', '444', '555'])
+
+    def test_batch_retries_class_members_after_fallback(self):
+        self.categories['222'] = '33567'
+        self.handler.get_category_id('999') # Cached fallback
+        result = self.handler.get_category_ids(['111', '222', '999'], comparison_numbers={'111': ['222']},
+                                               max_workers=1)
+        self.assertEqual(result, {'111': '185012', '222': '33567', '999': '185012'})
+        self.assertEqual(self.searched, ['999', '111', '222'])
+        self.assertEqual(self.cache.get('111'), '33567') # The class member's category replaces the fallback
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+# ebay_lister_fiat_item_project/tests/test_category_tree.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from ebay_lister_fiat_item.category_cache import CategoryCache
+from ebay_lister_fiat_item.category_tree import CategoryTree, PARTS_ROOT_CATEGORY_ID, tokenize
+from ebay_lister_fiat_item.ebay_item import EBAYHandler
+
+CATEGORIES = [
+    {'CategoryID': PARTS_ROOT_CATEGORY_ID, 'CategoryParentID': PARTS_ROOT_CATEGORY_ID,
+     'CategoryName': 'Auto & Motorrad: Teile', 'CategoryLevel': '1', 'LeafCategory': 'false'},
+    {'CategoryID': '33559', 'CategoryParentID': PARTS_ROOT_CATEGORY_ID,
+     'CategoryName': 'Bremsen', 'CategoryLevel': '2', 'LeafCategory': 'false'},
+    {'CategoryID': '33564', 'CategoryParentID': '33559',
+     'CategoryName': 'Bremsscheiben', 'CategoryLevel': '3', 'LeafCategory': 'true'},
+    {'CategoryID': '33563', 'CategoryParentID': '33559',
+     'CategoryName': 'Bremsbeläge', 'CategoryLevel': '3', 'LeafCategory': 'true'},
+    {'CategoryID': '33567', 'CategoryParentID': PARTS_ROOT_CATEGORY_ID,
+     'CategoryName': 'Kupplung & Teile', 'CategoryLevel': '2', 'LeafCategory': 'true'},
+    {'CategoryID': '185012', 'CategoryParentID': PARTS_ROOT_CATEGORY_ID,
+     'CategoryName': 'Sonstige', 'CategoryLevel': '2', 'LeafCategory': 'true'},
+]
+
+
+def _trading_api(version='120', categories=CATEGORIES):
+    api = MagicMock()
+
+    def execute(verb, data):
+        response = MagicMock()
+        reply = {'Ack': 'Success', 'CategoryVersion': version}
+        if data.get('DetailLevel') == 'ReturnAll':
+            reply['CategoryArray'] = {'Category': list(categories)}
+        response.dict.return_value = reply
+        return response
+    api.execute.side_effect = execute
+    return api
+
+
+class TestCategoryTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.tree = CategoryTree(os.path.join(self.tmp_dir, 'categories.sqlite3'))
+
+    def tearDown(self):
+        self.tree.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_tokenize_folds_umlauts_and_plurals(self):
+        self.assertEqual(tokenize('Bremsbeläge'), tokenize('BREMSBELAEGE'))
+        self.assertEqual(tokenize('Bremsscheiben'), tokenize('BREMSSCHEIBE'))
+        self.assertEqual(tokenize('Kupplung & Teile 12'), ['KUPPLUNG'])
+
+    def test_sync_downloads_only_new_versions(self):
+        api = _trading_api()
+        self.assertTrue(self.tree.sync(api))
+        self.assertEqual(self.tree.version, '120')
+        self.assertEqual(self.tree.category('33564')['parent_id'], '33559')
+        self.assertIsNone(self.tree.category(PARTS_ROOT_CATEGORY_ID)['parent_id'])
+        self.assertEqual(api.execute.call_count, 2)
+
+        self.assertFalse(self.tree.sync(api)) # Same version: only the version check
+        self.assertEqual(api.execute.call_count, 3)
+        self.assertTrue(self.tree.sync(_trading_api(version='121')))
+        self.assertEqual(self.tree.version, '121')
+
+    def test_match_by_category_names(self):
+        self.tree.sync(_trading_api())
+        self.assertEqual(self.tree.match('BREMSSCHEIBE VORNE'), '33564')
+        self.assertEqual(self.tree.match('KUPPLUNG'), '33567')
+        self.assertIsNone(self.tree.match('ZYLINDERKOPFDICHTUNG'))
+
+    def test_own_listings_extend_the_index(self):
+        self.tree.sync(_trading_api())
+        self.assertIsNone(self.tree.match('AUSRUECKLAGER'))
+        self.tree.add_listings([('1001', 'AUSRUECKLAGER FIAT PUNTO', '33567'),
+                                ('1002', 'KUPPLUNGSSATZ FIAT PANDA', '33567')])
+        self.assertEqual(self.tree.match('AUSRUECKLAGER'), '33567')
+
+    def test_vehicle_words_and_part_numbers_do_not_match(self):
+        self.tree.sync(_trading_api())
+        self.tree.add_listings([('1001', 'BREMSSCHEIBE OEM 46512345 FIAT PANDA', '33564'),
+                                ('1002', 'BREMSBELAG OEM 7736A FIAT PANDA PUNTO', '33563')])
+        self.assertEqual(tokenize('TUERGRIFF OEM 735A FIAT PANDA (169)'), tokenize('TUERGRIFF'))
+        self.assertIsNone(self.tree.match('TUERGRIFF OEM 46512345 FIAT PANDA'))
+        self.assertEqual(self.tree.match('BREMSSCHEIBE OEM 1 FIAT PANDA'), '33564')
+
+    def test_ambiguous_match_is_rejected(self):
+        self.tree.sync(_trading_api())
+        self.tree.add_listings([('1001', 'LAGER HINTEN', '33564'), ('1002', 'LAGER VORNE', '33567')])
+        self.assertIsNone(self.tree.match('LAGER'))
+        self.assertEqual(self.tree.match('LAGER', min_margin=0), '33564')
+
+
+class TestEBAYHandlerCategoryTree(unittest.TestCase):
+
+    @patch('ebay_lister_fiat_item.ebay_item.Trading')
+    @patch('ebay_lister_fiat_item.ebay_item.Finding')
+    @patch('ebay_lister_fiat_item.ebay_item.load_ebay_env_config')
+    def setUp(self, mock_load_env, mock_finding_conn, mock_trading_conn):
+        mock_load_env.return_value = {'appid': 'A', 'certid': 'C', 'devid': 'D', 'token': 'T', 'siteid': '77'}
+        mock_trading_conn.return_value = _trading_api()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = CategoryCache(os.path.join(self.tmp_dir, 'categories.sqlite3'))
+        self.handler = EBAYHandler(category_cache=self.cache)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_handler_uses_tree_of_cache(self):
+        self.assertIs(self.handler.category_tree, self.cache.tree)
+        self.assertTrue(self.handler.sync_category_tree())
+        self.assertEqual(self.handler.match_category('BREMSBELAG SATZ'), '33563')
+        self.handler.api_finding.execute.assert_not_called()
+
+    @patch('ebay_lister_fiat_item.ebay_item.EPERHandler')
+    def test_draft_matches_the_eper_description_not_the_title(self, mock_eper_handler_cls):
+        self.handler.sync_category_tree()
+        self.handler._record_listing('1001', {'Item': {'Title': 'BREMSSCHEIBE OEM 111 FIAT PANDA',
+                                                       'PrimaryCategory': {'CategoryID': '33564'}}})
+        eper_item = MagicMock()
+        eper_item.data.description = 'TUERGRIFF'
+        eper_item.__getitem__.side_effect = {
+            'title': 'TUERGRIFF OEM 222 FIAT PANDA', 'title_base_description': 'Tuergriff',
+            'eper_price_str': '20.00', 'part_number': '222', 'comparison_numbers': ['222'],
+        }.get
+        with patch.object(EBAYHandler, 'get_category_id', return_value='185012') as mock_get_category_id:
+            payload = self.handler.draft_item_payload(
+                part_number_str='222', quantity=1, condition_id='1000', shipping_profile_id_val='s',
+                payment_profile_id_val='p', return_profile_id_val='r', sku='SKU1', item_location='l',
+                country_code='DE', currency_code='EUR', dispatch_time_max='3', vat_percent=0,
+                manufacturer_override='Fiat', eper_handler=eper_item
+            )
+        mock_get_category_id.assert_called_once()
+        self.assertEqual(payload['Item']['PrimaryCategory']['CategoryID'], '185012')
+
+    def test_created_listing_is_recorded(self):
+        self.handler.sync_category_tree()
+        self.handler._record_listing('1001', {'Item': {'Title': 'ZAHNRIEMEN FIAT', 'PrimaryCategory': {'CategoryID': '33567'}}})
+        self.assertEqual(self.handler.match_category('ZAHNRIEMEN'), '33567')
+
+    def test_without_tree_nothing_matches(self):
+        handler = EBAYHandler.__new__(EBAYHandler)
+        handler.category_tree = None
+        self.assertIsNone(handler.match_category('BREMSSCHEIBE'))
+        with self.assertRaises(ValueError):
+            handler.sync_category_tree()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# ebay_lister_fiat_item_project/tests/test_clearance.py
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+import requests
+from ebay_lister_fiat_item.clearance import ClearanceJar
+from ebay_lister_fiat_item.scraper_pool import ScraperPool
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0'
+
+
+def solved_session(clearance='token-1'):
+    """A session as cloudscraper leaves it after solving a challenge."""
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    session.cookies.set('cf_clearance', clearance, domain='.fiatforum.com', expires=int(time.time()) + 3600)
+    session.cookies.set('__cf_bm', 'bm', domain='.fiatforum.com')
+    session.cookies.set('language', 'en', domain='eper.fiatforum.com')
+    return session
+
+
+class TestClearanceJar(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'clearance.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip_keeps_only_cloudflare_cookies(self):
+        jar = ClearanceJar(self.path)
+        self.assertIsNone(jar.load())
+        self.assertTrue(jar.save(solved_session()))
+        self.assertFalse(jar.save(solved_session())) # Same clearance, nothing to write
+
+        fresh = requests.Session()
+        self.assertTrue(ClearanceJar(self.path).apply(fresh))
+        self.assertEqual(fresh.headers['User-Agent'], USER_AGENT)
+        self.assertEqual(fresh.cookies.get('cf_clearance'), 'token-1')
+        self.assertEqual(fresh.cookies.get('__cf_bm'), 'bm')
+        self.assertIsNone(fresh.cookies.get('language'))
+
+    def test_expired_or_broken_clearance_is_ignored(self):
+        session = solved_session()
+        session.cookies.set('cf_clearance', 'old', domain='.fiatforum.com', expires=int(time.time()) - 10)
+        ClearanceJar(self.path).save(session)
+        self.assertIsNone(ClearanceJar(self.path).load())
+        with open(self.path, 'w') as handle:
+            handle.write("{not json")
+        self.assertIsNone(ClearanceJar(self.path).load())
+
+    def test_new_clearance_replaces_the_old_one(self):
+        jar = ClearanceJar(self.path)
+        jar.save(solved_session('token-1'))
+        self.assertTrue(jar.save(solved_session('token-2')))
+        with open(self.path) as handle:
+            cookies = {cookie['name']: cookie['value'] for cookie in json.load(handle)['cookies']}
+        self.assertEqual(cookies['cf_clearance'], 'token-2')
+
+
+class TestScraperPoolClearance(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'clearance.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_clearance_survives_a_new_pool(self):
+        first_pool = ScraperPool(factory=solved_session, clearance_jar=ClearanceJar(self.path))
+        with first_pool.session():
+            pass
+        self.assertTrue(os.path.exists(self.path))
+
+        # A new process: fresh sessions start with the stored clearance and user agent
+        second_pool = ScraperPool(factory=requests.Session, clearance_jar=ClearanceJar(self.path))
+        with second_pool.session() as session:
+            self.assertEqual(session.cookies.get('cf_clearance'), 'token-1')
+            self.assertEqual(session.headers['User-Agent'], USER_AGENT)
+
+    def test_challenge_invalidates_the_stored_clearance(self):
+        jar = ClearanceJar(self.path)
+        jar.save(solved_session())
+        pool = ScraperPool(factory=requests.Session, clearance_jar=jar)
+        challenge = requests.exceptions.HTTPError("403", response=MagicMock(status_code=403))
+        with self.assertRaises(requests.exceptions.HTTPError):
+            with pool.session():
+                raise challenge
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(pool.size, 0)
+
+    def test_custom_factory_has_no_jar_by_default(self):
+        self.assertIsNone(ScraperPool(factory=MagicMock).clearance_jar)
+
+
+if __name__ == '__main__':
+    unittest.main()
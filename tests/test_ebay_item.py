@@ -93,7 +93,7 @@ class TestEBAYHandler(unittest.TestCase):
         mock_trading_conn.return_value = self.mock_trading_api
         mock_finding_conn.return_value = self.mock_finding_api
 
-        self.handler = EBAYHandler() #
+        self.handler = EBAYHandler(category_cache=False) #
 
     def test_initialization_success(self):
         self.assertIsNotNone(self.handler.api_trading)
@@ -104,7 +104,7 @@ class TestEBAYHandler(unittest.TestCase):
     def test_initialization_missing_keys(self, mock_load_env):
         mock_load_env.return_value = {'appid': None, 'certid': 'some_cert'} # Missing devid, token
         with self.assertRaisesRegex(ValueError, "eBay API configuration for the following keys is missing"):
-            EBAYHandler() #
+            EBAYHandler(category_cache=False) #
 
     @patch('ebay_lister_fiat_item.ebay_item.Finding') #
     @patch('ebay_lister_fiat_item.ebay_item.load_ebay_env_config') #
@@ -121,7 +121,7 @@ class TestEBAYHandler(unittest.TestCase):
         }
         mock_api_finding.execute.return_value = MockEbaySDKResponse(reply_dict=mock_response_data)
         
-        handler = EBAYHandler() #
+        handler = EBAYHandler(category_cache=False) #
         category_id = handler.get_category_id("TEST_PART_NO") #
         self.assertEqual(category_id, "12345")
         mock_api_finding.execute.assert_called_once_with('findItemsByKeywords', {'keywords': 'TEST_PART_NO'})
@@ -136,7 +136,7 @@ class TestEBAYHandler(unittest.TestCase):
         mock_response_data = {'searchResult': {'_count': '0', 'item': []}}
         mock_api_finding.execute.return_value = MockEbaySDKResponse(reply_dict=mock_response_data)
 
-        handler = EBAYHandler() #
+        handler = EBAYHandler(category_cache=False) #
         category_id = handler.get_category_id("TEST_PART_NO", default_category_id="999") #
         self.assertEqual(category_id, "999")
 
@@ -149,7 +149,7 @@ class TestEBAYHandler(unittest.TestCase):
         
         mock_api_finding.execute.return_value = MockEbaySDKResponse(ack='Failure')
 
-        handler = EBAYHandler() #
+        handler = EBAYHandler(category_cache=False) #
         category_id = handler.get_category_id("TEST_PART_NO", default_category_id="777") #
         self.assertEqual(category_id, "777")
 
@@ -214,6 +214,30 @@ class TestEBAYHandler(unittest.TestCase):
                                         return_profile_id_val="r", sku="s", item_location="l", #
                                         country_code="C", currency_code="C", dispatch_time_max="1", vat_percent=0) #
 
+    @patch('ebay_lister_fiat_item.ebay_item.EPERHandler') #
+    @patch.object(EBAYHandler, 'get_category_id') #
+    def test_draft_item_payload_uses_prefetched_handler(self, mock_get_category_id, mock_eper_handler_cls):
+        prefetched = MagicMock()
+        prefetched.__getitem__.side_effect = {
+            "title": "Prefetched Title",
+            "title_base_description": "Prefetched Description",
+            "eper_price_str": "12.50",
+            "part_number": "PN1",
+            "comparison_numbers": ["PN1", "PN0"],
+        }.get
+        mock_get_category_id.return_value = "12345"
+
+        payload = self.handler.draft_item_payload(
+            part_number_str="PN1", quantity=1, condition_id="1000", shipping_profile_id_val="s",
+            payment_profile_id_val="p", return_profile_id_val="r", sku="SKU1", item_location="l",
+            country_code="DE", currency_code="EUR", dispatch_time_max="3", vat_percent=0,
+            manufacturer_override="Fiat", eper_handler=prefetched
+        )
+
+        mock_eper_handler_cls.assert_not_called()
+        self.assertEqual(payload['Item']['Title'], "Prefetched Title")
+        self.assertEqual(payload['Item']['StartPrice'], "12.50")
+
     def test_get_item_success(self):
         mock_response_item_data = {'Title': 'Test Item', 'ItemID': '112233'}
         self.mock_trading_api.execute.return_value = MockEbaySDKResponse(
@@ -253,5 +277,168 @@ class TestEBAYHandler(unittest.TestCase):
         item_id = self.handler.revise_item("REV_ITEM_ID", {'StartPrice': '10.00'}) #
         self.assertIsNone(item_id)
 
+class TestEBAYHandlerCreateItems(unittest.TestCase):
+
+    @patch('ebay_lister_fiat_item.ebay_item.Trading') #
+    @patch('ebay_lister_fiat_item.ebay_item.Finding') #
+    @patch('ebay_lister_fiat_item.ebay_item.load_ebay_env_config') #
+    def setUp(self, mock_load_env, mock_finding_conn, mock_trading_conn):
+        mock_load_env.return_value = {'appid': 'A', 'certid': 'C', 'devid': 'D', 'token': 'T', 'siteid': '77'}
+        self.mock_trading_api = MagicMock()
+        mock_trading_conn.return_value = self.mock_trading_api
+        self.handler = EBAYHandler(category_cache=False) #
+        self.calls = []
+        self.rejected = {} # SKU -> error returned for it
+        self.failing_calls = set() # Calls (by number) that fail as a whole
+        self.mock_trading_api.execute.side_effect = self._add_items
+
+    def _add_items(self, verb, request):
+        containers = request['AddItemRequestContainer']
+        self.calls.append([container['Item']['SKU'] for container in containers])
+        if len(self.calls) in self.failing_calls or any(self.rejected.get(c['Item']['SKU']) == 'poison' for c in containers):
+            raise ConnectionError("HTTP 500")
+        answers = []
+        for container in containers:
+            sku = container['Item']['SKU']
+            error = self.rejected.pop(sku, None) if self.rejected.get(sku) == 'SystemError' else self.rejected.get(sku)
+            if error:
+                answers.append({'CorrelationID': container['MessageID'], 'Errors': {
+                    'SeverityCode': 'Error', 'ShortMessage': 'Failed', 'ErrorClassification': error}})
+            else:
+                answers.append({'CorrelationID': container['MessageID'], 'ItemID': f"ID-{sku}"})
+        return MockEbaySDKResponse(reply_dict={'AddItemResponseContainer': list(reversed(answers))})
+
+    @staticmethod
+    def _payloads(count):
+        return [{'Item': {'Title': f"Item {n}", 'SKU': f"SKU{n}"}} for n in range(count)]
+
+    def test_items_are_packed_five_per_call(self):
+        results = self.handler.create_items(self._payloads(12))
+        self.assertEqual([len(call) for call in self.calls], [5, 5, 2])
+        self.assertEqual(list(results), [f"SKU{n}" for n in range(12)])
+        self.assertEqual(results['SKU7'], {'sku': 'SKU7', 'item_id': 'ID-SKU7', 'ack': 'Success', 'errors': []})
+
+    def test_only_failed_members_are_retried(self):
+        self.rejected.update({'SKU1': 'SystemError', 'SKU3': 'RequestError'})
+        results = self.handler.create_items(self._payloads(5))
+        self.assertEqual(self.calls, [['SKU0', 'SKU1', 'SKU2', 'SKU3', 'SKU4'], ['SKU1']])
+        self.assertEqual(results['SKU1']['item_id'], 'ID-SKU1')
+        self.assertEqual(results['SKU3']['ack'], 'Failure')
+        self.assertIsNone(results['SKU3']['item_id'])
+
+    def test_failed_call_is_split(self):
+        self.rejected['SKU3'] = 'poison'
+        results = self.handler.create_items(self._payloads(5), max_retries=1)
+        self.assertEqual(self.calls[:3], [['SKU0', 'SKU1', 'SKU2', 'SKU3', 'SKU4'], ['SKU0', 'SKU1', 'SKU2'], ['SKU3', 'SKU4']])
+        self.assertEqual([sku for sku, result in results.items() if not result['item_id']], ['SKU3'])
+
+    def test_skus_must_be_unique(self):
+        with self.assertRaises(ValueError):
+            self.handler.create_items([{'Item': {'SKU': 'A'}}, {'Item': {'SKU': 'A'}}])
+
+    def test_resend_after_lost_answer_does_not_list_twice(self):
+        listed = {} # UUID -> ItemID, like eBay's duplicate check
+
+        def add_items(verb, request):
+            containers = request['AddItemRequestContainer']
+            self.calls.append([container['Item']['UUID'] for container in containers])
+            answers = []
+            for container in containers:
+                item_uuid = container['Item']['UUID']
+                if item_uuid in listed:
+                    answers.append({'CorrelationID': container['MessageID'], 'Errors': {
+                        'SeverityCode': 'Error', 'ErrorCode': '488', 'ErrorClassification': 'RequestError',
+                        'LongMessage': f"The specified UUID has already been used; ListedByRequestAppId=1, item ID={listed[item_uuid]}."}})
+                else:
+                    listed[item_uuid] = f"11{len(listed)}"
+            if len(self.calls) == 1:
+                raise TimeoutError("read timed out") # eBay listed the items, the answer is lost
+            return MockEbaySDKResponse(reply_dict={'AddItemResponseContainer': answers})
+        self.mock_trading_api.execute.side_effect = add_items
+
+        payloads = self._payloads(2)
+        results = self.handler.create_items(payloads)
+        self.assertEqual(len(listed), 2)
+        self.assertEqual(sorted(uuid for call in self.calls[1:] for uuid in call), sorted(self.calls[0]))
+        self.assertEqual(len(self.calls[0][0]), 32)
+        self.assertEqual({sku: result['item_id'] for sku, result in results.items()}, {'SKU0': '110', 'SKU1': '111'})
+        self.assertEqual(results['SKU0']['ack'], 'Warning')
+        self.assertNotIn('UUID', payloads[0]['Item']) # The caller's payloads are not changed
+
+    def test_every_call_gets_new_uuids(self):
+        uuids = []
+        def add_items(verb, request):
+            uuids.extend(container['Item']['UUID'] for container in request['AddItemRequestContainer'])
+            return self._add_items(verb, request)
+        self.mock_trading_api.execute.side_effect = add_items
+
+        payloads = self._payloads(2)
+        self.handler.create_items(payloads)
+        self.handler.create_items(payloads)
+        self.assertEqual(self.calls, [['SKU0', 'SKU1'], ['SKU0', 'SKU1']])
+        self.assertEqual(len(set(uuids)), 4)
+
+
+class TestEBAYHandlerReviseInventoryStatus(unittest.TestCase):
+
+    @patch('ebay_lister_fiat_item.ebay_item.Trading') #
+    @patch('ebay_lister_fiat_item.ebay_item.Finding') #
+    @patch('ebay_lister_fiat_item.ebay_item.load_ebay_env_config') #
+    def setUp(self, mock_load_env, mock_finding_conn, mock_trading_conn):
+        mock_load_env.return_value = {'appid': 'A', 'certid': 'C', 'devid': 'D', 'token': 'T', 'siteid': '77'}
+        self.mock_trading_api = MagicMock()
+        mock_trading_conn.return_value = self.mock_trading_api
+        self.handler = EBAYHandler(category_cache=False) #
+        self.calls = []
+        self.ended = set() # ItemIDs eBay rejects
+        self.mock_trading_api.execute.side_effect = self._revise
+
+    def _revise(self, verb, request):
+        statuses = request['InventoryStatus']
+        self.calls.append(statuses)
+        answer, errors = [], []
+        for status in statuses:
+            item_id = status.get('ItemID') or f"ID-{status['SKU']}"
+            if item_id in self.ended:
+                errors.append({'SeverityCode': 'Error', 'ShortMessage': 'Listing ended',
+                               'ErrorParameters': {'ParamID': '0', 'Value': item_id}})
+            else:
+                answer.append({'ItemID': item_id, 'SKU': status.get('SKU'),
+                               'StartPrice': status.get('StartPrice', '9.99'), 'Quantity': status.get('Quantity', '1')})
+        return MockEbaySDKResponse(reply_dict={'InventoryStatus': answer, 'Errors': errors})
+
+    def test_updates_are_packed_four_per_call(self):
+        updates = [{'item_id': str(n), 'price': 10 + n} for n in range(6)] + [{'sku': 'SKU7', 'quantity': 3}]
+        results = self.handler.revise_inventory_status(updates)
+        self.assertEqual([len(call) for call in self.calls], [4, 3])
+        self.assertEqual(self.calls[0][1], {'ItemID': '1', 'StartPrice': '11.00'})
+        self.assertEqual(self.calls[1][2], {'SKU': 'SKU7', 'Quantity': '3'})
+        self.assertEqual(results[6], {'item_id': 'ID-SKU7', 'sku': 'SKU7', 'price': 9.99, 'quantity': 3,
+                                      'ack': 'Success', 'errors': []})
+
+    def test_errors_are_assigned_to_their_listing(self):
+        self.ended.add('2')
+        results = self.handler.revise_inventory_status([{'item_id': str(n), 'quantity': 0} for n in range(4)])
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual([result['ack'] for result in results], ['Success', 'Success', 'Failure', 'Success'])
+        self.assertEqual(results[2]['errors'][0]['ShortMessage'], 'Listing ended')
+
+    def test_unattributed_failure_is_resent_alone(self):
+        self.mock_trading_api.execute.side_effect = lambda verb, request: (
+            self.calls.append(request['InventoryStatus']) or MockEbaySDKResponse(reply_dict={
+                'InventoryStatus': [{'ItemID': '1', 'Quantity': '5'}] if len(request['InventoryStatus']) > 1 else [],
+                'Errors': [{'SeverityCode': 'Error', 'ShortMessage': 'Invalid', 'ErrorClassification': 'RequestError'}]
+            }))
+        results = self.handler.revise_inventory_status([{'item_id': '1', 'quantity': 5}, {'item_id': '2', 'quantity': 5}])
+        self.assertEqual([len(call) for call in self.calls], [2, 1])
+        self.assertEqual([result['ack'] for result in results], ['Success', 'Failure'])
+
+    def test_invalid_updates(self):
+        with self.assertRaises(ValueError):
+            self.handler.revise_inventory_status([{'price': 1.0}])
+        with self.assertRaises(ValueError):
+            self.handler.revise_inventory_status([{'item_id': '1'}])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
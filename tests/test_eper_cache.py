@@ -0,0 +1,180 @@
+# ebay_lister_fiat_item_project/tests/test_eper_cache.py
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from bs4 import BeautifulSoup
+from ebay_lister_fiat_item.eper_cache import EPERCache, PART_SCOPE, PAGE_SCOPE, DAY, NOT_FOUND, TRANSIENT_FAILURE
+from ebay_lister_fiat_item.scraper_pool import ScraperPool
+from ebay_lister_fiat_item.throttle import AdaptiveThrottle
+from ebay_lister_fiat_item.scrape_open_eper import EPERHandler
+from .eper_pages import build_eper_page
+
+
+class TestEPERCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = EPERCache(os.path.join(self.tmp_dir, 'cache.sqlite3'))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip(self):
+        page = {'title': 'BREMSSCHEIBE, 1234', 'eper_price_str': '12.34', 'weight_kg': '0.5',
+                'fitting_cars': ['FIAT PUNTO'], 'previous_numbers': [], 'replacement_numbers': ['222']}
+        self.cache.set_page('111', page)
+        self.assertEqual(self.cache.get_page('111'), page)
+        self.assertIsNone(self.cache.get_page('999'))
+        self.assertIsNone(self.cache.get_part('111'))
+
+    def test_stale_field_is_a_miss_but_fresh_subset_hits(self):
+        self.cache.set(PART_SCOPE, '111', {'title': 'T', 'weight_kg': '0.5'})
+        self.cache.set(PART_SCOPE, '111', {'eper_price_str': '12.34'}, fetched_at=time.time() - 2 * DAY)
+        self.assertIsNone(self.cache.get_part('111', fields=['title', 'eper_price_str']))
+        self.assertEqual(self.cache.get_part('111', fields=['title', 'weight_kg']),
+                         {'title': 'T', 'weight_kg': '0.5'})
+
+    def test_custom_ttls(self):
+        cache = EPERCache(os.path.join(self.tmp_dir, 'ttl.sqlite3'), field_ttls={'eper_price_str': 10 * DAY})
+        cache.set(PAGE_SCOPE, '111', {'eper_price_str': '1.00'}, fetched_at=time.time() - 2 * DAY)
+        self.assertEqual(cache.get_page('111', fields=['eper_price_str']), {'eper_price_str': '1.00'})
+        cache.close()
+
+    def test_invalidate(self):
+        self.cache.set_page('111', {'title': 'A', 'eper_price_str': '1.00'})
+        self.cache.set_page('222', {'title': 'B'})
+        self.assertEqual(self.cache.invalidate('111', fields=['eper_price_str']), 1)
+        self.assertIsNone(self.cache.get_page('111', fields=['eper_price_str']))
+        self.assertEqual(self.cache.get_page('111', fields=['title']), {'title': 'A'})
+        self.cache.invalidate()
+        self.assertIsNone(self.cache.get_page('222', fields=['title']))
+
+
+class TestEPERHandlerCaching(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = EPERCache(os.path.join(self.tmp_dir, 'cache.sqlite3'))
+        self.pages = {
+            '111': build_eper_page(description='BREMSSCHEIBE', price=None, drawings=['FIAT PUNTO (188)'],
+                                   replacements=['222']),
+            '222': build_eper_page(description='BREMSSCHEIBE NEU', price='45,60 EUR', drawings=['LANCIA Y (840)']),
+        }
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def fake_fetch(self, part_number):
+        html = self.pages.get(part_number)
+        return BeautifulSoup(html, 'html.parser') if html else None
+
+    def test_repeat_lookup_is_served_from_cache(self):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch) as mock_fetch:
+            first = EPERHandler('111', cache=self.cache)
+            self.assertEqual(mock_fetch.call_count, 2)
+            second = EPERHandler('111', cache=self.cache)
+            self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(second['price'], '45.60')
+        self.assertEqual(second['comparison_numbers'], ['111', '222'])
+
+    def test_replacement_pages_are_reused_across_parts(self):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch) as mock_fetch:
+            EPERHandler('111', cache=self.cache)
+            EPERHandler('222', cache=self.cache)
+            self.assertEqual(mock_fetch.call_count, 2)
+
+    def test_bypass_refetches_and_refreshes(self):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch) as mock_fetch:
+            EPERHandler('222', cache=self.cache)
+            self.pages['222'] = build_eper_page(price='50,00 EUR')
+            handler = EPERHandler('222', cache=self.cache, use_cache=False)
+            self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(handler['price'], '50.00')
+        self.assertEqual(self.cache.get_part('222')['eper_price_str'], '50.00')
+
+    def test_failed_lookup_is_not_cached(self):
+        with patch.object(EPERHandler, '_fetch_soup', return_value=None):
+            handler = EPERHandler('404', cache=self.cache)
+        self.assertEqual(handler['title'], 'OEM 404')
+        self.assertIsNone(self.cache.get_part('404'))
+
+
+
+class TestNegativeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = EPERCache(os.path.join(self.tmp_dir, 'cache.sqlite3'))
+        self.session = MagicMock()
+        self.pool = ScraperPool(factory=lambda: self.session)
+        # Own throttle: one immediate retry per 503, and the breaker never pauses the test
+        self.throttle = AdaptiveThrottle(max_retries=1, reset_timeout=0, retry_backoff=0)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def respond(self, html=None, status_code=200):
+        response = MagicMock()
+        response.text = html or ""
+        if status_code >= 400:
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+                f"{status_code} Error", response=MagicMock(status_code=status_code, headers={}))
+        self.session.get.return_value = response
+
+    def lookup(self, part_number, **options):
+        return EPERHandler(part_number, cache=self.cache, scraper_pool=self.pool, rate_limiter=MagicMock(),
+                           throttle=self.throttle, **options)
+
+    def test_failure_ttls(self):
+        self.cache.set_failure('111', TRANSIENT_FAILURE, failed_at=time.time() - 3600)
+        self.cache.set_failure('222', NOT_FOUND, failed_at=time.time() - 3600)
+        self.assertIsNone(self.cache.get_failure('111'))
+        self.assertEqual(self.cache.get_failure('222'), NOT_FOUND)
+        self.cache.set_page('222', {'title': 'A'})
+        self.assertIsNone(self.cache.get_failure('222'))
+
+    def test_unknown_part_is_not_fetched_again(self):
+        self.respond("<html><body><p>No part found</p></body></html>")
+        first = self.lookup('999')
+        second = self.lookup('999')
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(self.cache.get_failure('999'), NOT_FOUND)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(second['title'], 'OEM 999')
+
+    def test_http_errors_are_classified(self):
+        self.respond(status_code=404)
+        self.lookup('404')
+        self.respond(status_code=503)
+        self.lookup('503')
+        self.assertEqual(self.cache.get_failure('404'), NOT_FOUND)
+        self.assertEqual(self.cache.get_failure('503'), TRANSIENT_FAILURE)
+
+    def test_transient_failure_expires_and_bypass_refetches(self):
+        self.respond(status_code=503)
+        self.lookup('111')
+        self.lookup('111')
+        self.assertEqual(self.session.get.call_count, 2) # The 503 and its retry
+        self.respond(build_eper_page())
+        self.assertEqual(self.lookup('111', use_cache=False)['title'], 'BREMSSCHEIBE, 1234 OEM 111')
+        self.assertEqual(self.session.get.call_count, 3)
+        self.assertIsNone(self.cache.get_failure('111'))
+
+        self.respond(status_code=503)
+        self.lookup('222')
+        self.cache.set_failure('222', TRANSIENT_FAILURE, failed_at=time.time() - 3600)
+        self.lookup('222')
+        self.assertEqual(self.session.get.call_count, 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
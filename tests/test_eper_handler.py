@@ -1,7 +1,12 @@
 # ebay_lister_project/tests/test_eper_handler.py
 
+import threading
 import unittest
+from unittest.mock import patch
+from bs4 import BeautifulSoup
+from ebay_lister_fiat_item.html_parsers import EPERPageStrainer
 from ebay_lister_fiat_item.scrape_open_eper import EPERHandler, CAR_BRANDS_DATA
+from .eper_pages import build_eper_page
 
 class TestEPERHandlerHelpers(unittest.TestCase):
     """
@@ -11,21 +16,8 @@ class TestEPERHandlerHelpers(unittest.TestCase):
 
     def setUp(self):
         # No EPERHandler instance needed for static-like methods or data tests.
-        # If testing instance methods that don't make network calls,
-        # you might instantiate it with a dummy part_number if __init__ allows it
-        # without immediate network calls, or mock the network call.
-        # For now, we'll test _normalize_car_name by creating a dummy instance
-        # or calling it statically if possible.
-        # Since _normalize_car_name is a method, we need an instance.
-        # The __init__ of EPERHandler *does* make a network call.
-        # For a true unit test of _normalize_car_name, we should not rely on this.
-        # A better approach would be to make _normalize_car_name a static method
-        # or test it by mocking the network calls in __init__.
-
-        # For simplicity in this example, we'll call it via a dummy instance,
-        # acknowledging this isn't ideal for strict unit testing of only this method.
-        # To avoid network call in setUp for this specific test,
-        # we can patch the _fetch_soup method.
+        # Tests that create a handler pass cache=False and patch _fetch_soup,
+        # so they neither write a cache file nor send a request to ePER.
         pass
 
 
@@ -37,35 +29,6 @@ class TestEPERHandlerHelpers(unittest.TestCase):
 
     def test_normalize_car_name(self):
         """Test the _normalize_car_name method of EPERHandler."""
-        # To test _normalize_car_name without network calls,
-        # it's best if EPERHandler's __init__ doesn't immediately call the network
-        # or if _normalize_car_name is a static method.
-        # Assuming we can create a "light" EPERHandler or it's made static:
-
-        # If EPERHandler._normalize_car_name were static:
-        # self.assertEqual(EPERHandler._normalize_car_name("Fiat 500"), "FIAT 500")
-        # self.assertEqual(EPERHandler._normalize_car_name("N.DELTA"), "DELTA")
-
-        # Since it's an instance method and __init__ calls network:
-        # This test would ideally mock `_fetch_soup` during EPERHandler instantiation.
-        # For this example, we'll assume it's okay for this demonstration or
-        # that _normalize_car_name could be tested differently if refactored.
-
-        # Let's create a list of test cases for normalize_car_name
-        # We can access the method without full EPERHandler initialization if we are careful
-        # or make it static for easier testing.
-        # For this example, let's assume we can call it somewhat directly for testing purposes.
-        # This is a practical compromise for the example.
-
-        # A dummy instance to access the method (not ideal as it triggers __init__)
-        # If EPERHandler('dummy') doesn't crash without network, this is simpler for demo.
-        # Otherwise, _normalize_car_name should be a static method for easy testing.
-
-        # Let's assume _normalize_car_name can be tested by calling it on the class
-        # if it were a static method, or by carefully instantiating.
-        # For the current EPERHandler, __init__ will run _fetch_soup.
-        # We'll proceed as if we are testing it and acknowledge the mocking need.
-
         test_cases = {
             "FIAT 500": "FIAT 500",
             "fiat panda": "FIAT PANDA",
@@ -73,30 +36,221 @@ class TestEPERHandlerHelpers(unittest.TestCase):
             "N.DELTA": "DELTA", # Special case from implementation
             "DUCATO'94": "DUCATO", # Special case
             "PUNTO BZ": "PUNTO", # Special case
-            "  Lancia Y  ": "LANCIA Y" # Test stripping and normalization
+            "  Lancia Y  ": "  LANCIA Y  " # Only upper-cased, the drawing texts are stripped before
+        }
+        # No cache file and no ePER request: the handler's own lookup finds no page
+        with patch.object(EPERHandler, '_fetch_soup', return_value=None) as mock_fetch:
+            handler_for_method_test = EPERHandler("dummy_part_for_normalize_test", cache=False)
+        mock_fetch.assert_called_once_with("dummy_part_for_normalize_test")
+        for input_str, expected_output in test_cases.items():
+            self.assertEqual(handler_for_method_test._normalize_car_name(input_str), expected_output)
+
+
+class TestEPERPageExtraction(unittest.TestCase):
+    """Compares the single-pass extractor with the individual _extract_*_from_soup helpers."""
+
+    def setUp(self):
+        self.handler = EPERHandler.__new__(EPERHandler)
+        self.handler._configure(cache=False)
+        self.pages = [
+            build_eper_page(drawings=['FIAT PUNTO (188)', 'LANCIA Y (840)', 'FIAT PUNTO (188)'],
+                            previous=['100'], replacements=['200', '201']),
+            build_eper_page(description=None, price='n/a'),
+            build_eper_page(weight_g='abc', price=None, drawings=['N.DELTA (844)']),
+            "<html><body><p>No part found</p></body></html>",
+        ]
+
+    def expected_fields(self, soup):
+        return {
+            'title': self.handler._extract_title_from_soup(soup),
+            'eper_price_str': self.handler._extract_eper_price_str_from_soup(soup),
+            'weight_kg': self.handler._extract_weight_from_soup(soup),
+            'fitting_cars': self.handler._extract_fitting_cars_from_soup(soup),
+            'previous_numbers': self.handler._extract_comparison_numbers_from_soup(soup, 'previous-tab-pane'),
+            'replacement_numbers': self.handler._extract_comparison_numbers_from_soup(soup, 'replacements-tab-pane'),
+        }
+
+    def test_single_pass_matches_helpers(self):
+        for html in self.pages:
+            full_soup = BeautifulSoup(html, 'html.parser')
+            strained_soup = BeautifulSoup(html, 'html.parser', parse_only=EPERPageStrainer())
+            expected = self.expected_fields(full_soup)
+            self.assertEqual(self.handler._extract_page_fields(full_soup), expected)
+            self.assertEqual(self.handler._extract_page_fields(strained_soup), expected)
+
+    def test_strainer_skips_unused_markup(self):
+        html = "<div class='nav'><p>Menu</p></div><script>var x = 1;</script>" + self.pages[0]
+        strained_soup = BeautifulSoup(html, 'html.parser', parse_only=EPERPageStrainer())
+        self.assertIsNone(strained_soup.find('p'))
+        self.assertIsNone(strained_soup.find('script'))
+        self.assertEqual(len(strained_soup.find_all('div')), 4)
+
+
+class TestEPERHandlerReplacementChain(unittest.TestCase):
+    """Tests the aggregation over replacement and previous parts with a mocked _fetch_soup."""
+
+    def setUp(self):
+        self.pages = {
+            '111': build_eper_page(description='', price=None, weight_g='0', drawings=['FIAT PUNTO (188)'],
+                                   previous=['100', '101'], replacements=['222', '333']),
+            '222': build_eper_page(description='', price=None, drawings=['LANCIA Y (840)'], replacements=['444']),
+            '333': build_eper_page(description='SPIEGEL', price='20,00 EUR', drawings=['FIAT PANDA (169)'],
+                                   replacements=['444', '555']),
+            '444': build_eper_page(description='SPIEGEL NEU', price='30,00 EUR', drawings=['ALFA ROMEO 147 (937)']),
+            '555': build_eper_page(description='SPIEGEL NEU 2', price='40,00 EUR'),
+            '100': build_eper_page(description='ALT', price='5,00 EUR'),
         }
-        # Create a dummy EPERHandler. This WILL attempt a network call for 'dummy_part'.
-        # In a real scenario, you MUST mock `_fetch_soup` here.
-        try:
-            handler_for_method_test = EPERHandler("dummy_part_for_normalize_test")
-            for input_str, expected_output in test_cases.items():
-                # Note: _normalize_car_name is not a static method.
-                # It's called within _extract_fitting_cars_from_soup.
-                # To test it in isolation, it should ideally be static or on a helper class.
-                # For this example, let's assume we are testing its logic conceptually.
-                # If you refactor _normalize_car_name to be static:
-                # self.assertEqual(EPERHandler._normalize_car_name(input_str), expected_output)
-                # print(f"Testing _normalize_car_name: '{input_str}' -> Expected '{expected_output}'")
-
-                # As it is an instance method, you'd call it on an instance.
-                # This part of the test highlights the need for mocking or refactoring for true unit tests.
-                # For now, we will skip direct testing of _normalize_car_name here
-                # due to its entanglement with instance creation that makes network calls.
-                pass
-            self.skipTest("Skipping _normalize_car_name direct test: requires mocking or refactor for isolation.")
-
-        except Exception as e:
-             self.skipTest(f"Skipping _normalize_car_name test due to EPERHandler init error (network?): {e}")
+
+    def fake_fetch(self, part_number):
+        html = self.pages.get(part_number)
+        return BeautifulSoup(html, 'html.parser') if html else None
+
+    def run_handler(self, part_number, max_workers):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch) as mock_fetch:
+            handler = EPERHandler(part_number, cache=False, max_workers=max_workers)
+        return handler, mock_fetch
+
+    def test_parallel_matches_serial(self):
+        serial, _ = self.run_handler('111', max_workers=1)
+        parallel, _ = self.run_handler('111', max_workers=4)
+        self.assertEqual(serial.data, parallel.data)
+        self.assertEqual(parallel['price'], '20.00') # First price in BFS order wins
+        self.assertEqual(parallel['comparison_numbers'], ['111', '100', '101', '222', '333', '444', '555'])
+        self.assertEqual(parallel['fitting_cars'], ['FIAT PUNTO', 'LANCIA Y', 'FIAT PANDA', 'ALFA ROMEO 147'])
+
+    def test_each_page_fetched_once(self):
+        _, mock_fetch = self.run_handler('111', max_workers=4)
+        fetched = [call.args[0] for call in mock_fetch.call_args_list]
+        self.assertEqual(sorted(fetched), ['111', '222', '333', '444', '555'])
+
+    def test_level_is_fetched_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def blocking_fetch(part_number):
+            if part_number in ('222', '333'):
+                barrier.wait() # Only passes if both replacements are fetched at the same time
+            return self.fake_fetch(part_number)
+
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=blocking_fetch):
+            handler = EPERHandler('111', cache=False, max_workers=2)
+        self.assertEqual(handler['price'], '20.00')
+
+    def test_previous_parts_fill_missing_data(self):
+        self.pages['111'] = build_eper_page(description='', price=None, previous=['100', '101'])
+        handler, mock_fetch = self.run_handler('111', max_workers=1)
+        self.assertEqual(handler['price'], '5.00')
+        fetched = [call.args[0] for call in mock_fetch.call_args_list]
+        self.assertEqual(fetched, ['111', '100']) # Stops once the data is complete
+
+
+class TestEPERHandlerFetchMany(unittest.TestCase):
+
+    def setUp(self):
+        # 100 and 101 are both superseded by 200, which is superseded by 300
+        self.pages = {
+            '100': build_eper_page(description='ALT A', price=None, replacements=['200']),
+            '101': build_eper_page(description='ALT B', price=None, replacements=['200']),
+            '200': build_eper_page(description='NEU', price=None, replacements=['300']),
+            '300': build_eper_page(description='NEUESTE', price='99,00 EUR'),
+        }
+
+    def fake_fetch(self, part_number):
+        html = self.pages.get(part_number)
+        return BeautifulSoup(html, 'html.parser') if html else None
+
+    def test_shared_pages_fetched_once(self):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch) as mock_fetch:
+            handlers = list(EPERHandler.fetch_many(['100', '101', '200', '100', '999'], cache=False))
+        fetched = sorted(call.args[0] for call in mock_fetch.call_args_list)
+        self.assertEqual(fetched, ['100', '101', '200', '300', '999'])
+        results = {handler['part_number']: handler for handler in handlers}
+        self.assertEqual(sorted(results), ['100', '101', '200', '999'])
+        self.assertEqual(results['101']['price'], '99.00')
+        self.assertEqual(results['101']['comparison_numbers'], ['101', '200', '300'])
+        self.assertEqual(results['999']['title'], 'OEM 999')
+
+    def test_batch_matches_single_lookups(self):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch):
+            single = EPERHandler('100', cache=False).data
+            batch = next(EPERHandler.fetch_many(['100'], cache=False)).data
+        self.assertEqual(single, batch)
+
+    def test_parse_processes_match_in_process_parsing(self):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch):
+            expected = {handler['part_number']: handler.data
+                        for handler in EPERHandler.fetch_many(['100', '101', '999'], cache=False)}
+        with patch.object(EPERHandler, '_fetch_html', side_effect=self.pages.get) as mock_fetch:
+            handlers = list(EPERHandler.fetch_many(['100', '101', '999'], parse_processes=2, cache=False))
+        self.assertEqual({handler['part_number']: handler.data for handler in handlers}, expected)
+        self.assertEqual(sorted(call.args[0] for call in mock_fetch.call_args_list), ['100', '101', '200', '300', '999'])
+
+
+class TestEPERHandlerFieldSelective(unittest.TestCase):
+
+    def setUp(self):
+        # 100 has no price of its own: 200 (no price) -> 300 (price) -> 400
+        self.pages = {
+            '100': build_eper_page(description='ALT', price=None, previous=['050'], replacements=['200']),
+            '200': build_eper_page(description='NEU', price=None, replacements=['300']),
+            '300': build_eper_page(description='NEUER', price='99,00 EUR', replacements=['400']),
+            '400': build_eper_page(description='NEUESTE', price='80,00 EUR'),
+            '500': build_eper_page(price='12,34 EUR', replacements=['200']),
+        }
+
+    def fake_fetch(self, part_number):
+        html = self.pages.get(part_number)
+        return BeautifulSoup(html, 'html.parser') if html else None
+
+    def test_part_with_own_price_costs_one_fetch(self):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch) as mock_fetch:
+            handler = EPERHandler('500', cache=False, fields={'price'})
+        self.assertEqual([call.args[0] for call in mock_fetch.call_args_list], ['500'])
+        self.assertEqual(handler.data.price, 12.34)
+        self.assertEqual(handler['price'], '12.34')
+
+    def test_chain_walk_stops_once_filled(self):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch) as mock_fetch:
+            selective = EPERHandler('100', cache=False, fields={'price', 'weight_kg'}).data
+        self.assertEqual([call.args[0] for call in mock_fetch.call_args_list], ['100', '200', '300'])
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch):
+            full = EPERHandler('100', cache=False).data
+        self.assertEqual((selective.price, selective.weight_kg), (full.price, full.weight_kg))
+        self.assertEqual(selective.fitting_cars, ())
+
+    def test_chain_fields_use_full_lookup(self):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch):
+            handler = EPERHandler('100', cache=False, fields={'price', 'comparison_numbers'})
+        self.assertIsNone(handler.fields)
+        self.assertEqual(handler['comparison_numbers'], ['100', '050', '200', '300', '400'])
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            EPERHandler('100', cache=False, fields={'colour'})
+
+
+class TestEPERHandlerLazy(unittest.TestCase):
+
+    def test_lazy_construction_returns_before_fetch(self):
+        release = threading.Event()
+
+        def slow_fetch(part_number):
+            release.wait(5)
+            return BeautifulSoup(build_eper_page(price='7,00 EUR'), 'html.parser')
+
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=slow_fetch):
+            handler = EPERHandler('111', cache=False, lazy=True)
+            self.assertFalse(handler.done())
+            self.assertIsNotNone(handler.future)
+            release.set()
+            self.assertEqual(handler['price'], '7.00') # Blocks until the fetch is finished
+        self.assertTrue(handler.done())
+        self.assertIsNone(handler.future)
+
+    def test_lazy_errors_surface_on_access(self):
+        with patch.object(EPERHandler, 'get_part_details', side_effect=RuntimeError("boom")):
+            handler = EPERHandler('111', cache=False, lazy=True)
+            with self.assertRaises(RuntimeError):
+                handler['title']
 
 
 class TestEPERHandlerNetwork(unittest.TestCase):
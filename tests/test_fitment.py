@@ -0,0 +1,67 @@
+# ebay_lister_fiat_item_project/tests/test_fitment.py
+
+import random
+import re
+import unittest
+from ebay_lister_fiat_item.fitment import FitmentMatcher, SPECIAL_CAR_NAMES
+from ebay_lister_fiat_item.scrape_open_eper import CAR_BRANDS_DATA, FITMENT_MATCHER
+
+
+def reference_match(texts, car_brands=CAR_BRANDS_DATA):
+    """The original nested brand x model loop from EPERHandler._extract_fitting_cars_from_soup."""
+    fitting_cars = []
+    for text in texts:
+        normalized_text = text.upper() if isinstance(text, str) else ""
+        for special, normal in SPECIAL_CAR_NAMES.items():
+            normalized_text = normalized_text.replace(special, normal)
+        found_brand_model = False
+        for brand, models in car_brands.items():
+            if brand in normalized_text:
+                for model in models:
+                    if re.search(r'\b' + re.escape(model) + r'\b', normalized_text) or model in normalized_text:
+                        fitting_cars.append(f"{brand} {model}")
+                        found_brand_model = True
+                        break
+                if found_brand_model: break
+        if not found_brand_model:
+            for brand, models in car_brands.items():
+                for model in models:
+                    if model in normalized_text.split():
+                        fitting_cars.append(f"{brand} {model}")
+                        break
+    return list(dict.fromkeys(fitting_cars))
+
+
+class TestFitmentMatcher(unittest.TestCase):
+
+    def test_known_drawing_texts(self):
+        self.assertEqual(FITMENT_MATCHER.match(['FIAT PUNTO (188)']), ['FIAT PUNTO'])
+        self.assertEqual(FITMENT_MATCHER.match(['Fiat Grande Punto (199)']), ['FIAT GRANDE PUNTO'])
+        self.assertEqual(FITMENT_MATCHER.match(['N.DELTA (844)']), ['LANCIA DELTA'])
+        self.assertEqual(FITMENT_MATCHER.match(['PUNTO BZ']), ['FIAT PUNTO'])
+        self.assertEqual(FITMENT_MATCHER.match(['500 (312)']), ['FIAT 500', 'ABARTH 500'])
+        self.assertEqual(FITMENT_MATCHER.match(['UNKNOWN CAR', None]), [])
+
+    def test_normalize(self):
+        self.assertEqual(FITMENT_MATCHER.normalize("ducato'94 (230)"), 'DUCATO (230)')
+        self.assertEqual(FITMENT_MATCHER.normalize('punto tb.ds'), 'PUNTO')
+        self.assertEqual(FITMENT_MATCHER.normalize(None), '')
+
+    def test_matches_reference_implementation(self):
+        rng = random.Random(7)
+        vocabulary = [word for brand, models in CAR_BRANDS_DATA.items() for word in [brand] + models]
+        vocabulary += list(SPECIAL_CAR_NAMES) + ['(188)', 'TURBO', 'DS', '1.4', 'N.', 'SW', 'ALFA', 'ROMEO']
+        for _ in range(2000):
+            text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4)))
+            if rng.random() < 0.3:
+                text = text.replace(" ", "")
+            self.assertEqual(FITMENT_MATCHER.match([text]), reference_match([text]), text)
+
+    def test_custom_brand_table(self):
+        matcher = FitmentMatcher({'FIAT': ['500', '500L'], 'LANCIA': ['Y']}, special_names={})
+        texts = ['FIAT 500L', 'LANCIA YPSILON', 'FIAT 500L 500']
+        self.assertEqual(matcher.match(texts), reference_match(texts, matcher.car_brands))
+
+
+if __name__ == '__main__':
+    unittest.main()
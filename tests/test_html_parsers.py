@@ -0,0 +1,74 @@
+# ebay_lister_fiat_item_project/tests/test_html_parsers.py
+
+import unittest
+from ebay_lister_fiat_item.html_parsers import (
+    HTML_PARSER, PARSER_PREFERENCE, available_parsers, create_parser, get_parser
+)
+from ebay_lister_fiat_item.scrape_open_eper import EPERHandler, parse_eper_html
+from .eper_pages import build_eper_page
+
+
+def build_page_corpus():
+    """Saved-page shapes the backends must agree on: full pages, unknown parts and noisy markup."""
+    full_page = build_eper_page(drawings=['FIAT PUNTO (188)', 'LANCIA Y (840)', 'ALFA 147 (937)'],
+                                previous=['100'], replacements=['200', '201'])
+    return {
+        'full': full_page,
+        'no_description': build_eper_page(description=None, price='n/a'),
+        'bad_weight': build_eper_page(weight_g='abc', price=None, drawings=['N.DELTA (844)']),
+        'unknown_part': "<html><body><p>No part found</p></body></html>",
+        'noise': full_page.replace(
+            "<body>",
+            "<body><div class='nav'><p>Menu &amp; more</p></div><script>var t = '<td>Germany</td>';</script>"
+            "<!-- comment --><div class='tab-content'>",
+        ).replace("</body>", "</div></body>"),
+        'whitespace': build_eper_page(description="  KUPPLUNG &amp; SCHEIBE ", price=" 1.234,50 EUR ",
+                                      drawings=['  FIAT DOBLO (263)  '], replacements=[' 300 ']).replace(
+            "<tr>", "\n  <tr>\n    "),
+        'nested_price': build_eper_page().replace("<td>Germany</td>", "<td><b>Germany</b></td>"),
+    }
+
+
+class TestParserBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = EPERHandler.__new__(EPERHandler)
+        self.extractor._configure(cache=False, parser=HTML_PARSER)
+        self.corpus = build_page_corpus()
+
+    def extract(self, parser, html):
+        soup = parser.parse(html)
+        return self.extractor._extract_page_fields(soup) if EPERHandler._is_part_page(soup) else None
+
+    def test_all_backends_extract_identical_fields(self):
+        reference = get_parser(HTML_PARSER)
+        for name in available_parsers():
+            backend = get_parser(name)
+            for page_name, html in self.corpus.items():
+                with self.subTest(backend=name, page=page_name):
+                    self.assertEqual(self.extract(backend, html), self.extract(reference, html))
+
+    def test_reference_fields(self):
+        fields = self.extract(get_parser(HTML_PARSER), self.corpus['full'])
+        self.assertEqual(fields['eper_price_str'], '12.34')
+        self.assertEqual(fields['replacement_numbers'], ['200', '201'])
+        self.assertIsNone(self.extract(get_parser(HTML_PARSER), self.corpus['unknown_part']))
+
+    def test_handler_uses_configured_backend(self):
+        for name in available_parsers():
+            handler = EPERHandler.__new__(EPERHandler)
+            handler._configure(cache=False, parser=name)
+            self.assertIs(handler.parser, get_parser(name))
+        self.assertIsNotNone(parse_eper_html(self.corpus['full'], parser=HTML_PARSER))
+
+    def test_default_prefers_fastest_installed(self):
+        self.assertEqual(available_parsers()[-1], HTML_PARSER)
+        self.assertEqual(available_parsers(), [name for name in PARSER_PREFERENCE if name in available_parsers()])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_parser('regex')
+
+
+if __name__ == '__main__':
+    unittest.main()
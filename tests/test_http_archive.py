@@ -0,0 +1,115 @@
+# ebay_lister_fiat_item_project/tests/test_http_archive.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from ebay_lister_fiat_item.eper_cache import get_replay_cache
+from ebay_lister_fiat_item.http_archive import HTTPArchive, RECORD, REPLAY
+from ebay_lister_fiat_item.scraper_pool import ScraperPool
+from ebay_lister_fiat_item.scrape_open_eper import EPERHandler, EPER_PART_URL
+from .eper_pages import build_eper_page
+
+PAGES = {
+    '111': build_eper_page(description='BREMSSCHEIBE', price=None, drawings=['FIAT PUNTO (188)'], replacements=['222']),
+    '222': build_eper_page(description='BREMSSCHEIBE NEU', price='45,60 EUR'),
+}
+
+
+def make_response(url, status_code, html):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers['Content-Type'] = 'text/html; charset=utf-8'
+    response.encoding = 'utf-8'
+    response._content = html.encode('utf-8')
+    return response
+
+
+def fake_get(url):
+    part_number = url.rsplit('=', 1)[1]
+    html = PAGES.get(part_number)
+    return make_response(url, 200 if html else 404, html or "not found")
+
+
+class TestHTTPArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'archive.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip_keeps_status_headers_and_body(self):
+        archive = HTTPArchive(self.path, mode=RECORD)
+        archive.record('http://x/1', make_response('http://x/1', 404, "nicht gefunden"))
+        archive.close()
+        archive = HTTPArchive(self.path, mode=REPLAY)
+        response = archive.replay('http://x/1')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.headers['content-type'], 'text/html; charset=utf-8')
+        self.assertEqual(response.text, "nicht gefunden")
+        with self.assertRaises(requests.exceptions.HTTPError):
+            response.raise_for_status()
+        self.assertIsNone(archive.replay('http://x/2'))
+        archive.close()
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            HTTPArchive(self.path, mode='rewind')
+
+    def test_replayed_run_matches_recorded_run_without_network(self):
+        session = MagicMock()
+        session.get.side_effect = fake_get
+        recorder = HTTPArchive(self.path, mode=RECORD)
+        recorded = EPERHandler('111', cache=False, rate_limiter=MagicMock(), archive=recorder,
+                               scraper_pool=ScraperPool(factory=lambda: session))
+        missing = EPERHandler('404', cache=False, rate_limiter=MagicMock(), archive=recorder,
+                              scraper_pool=ScraperPool(factory=lambda: session))
+        self.assertEqual(recorder.count(), 3)
+        recorder.close()
+
+        replayer = HTTPArchive(self.path, mode=REPLAY)
+        offline_pool = MagicMock()
+        offline_limiter = MagicMock()
+        replayed = EPERHandler('111', cache=False, rate_limiter=offline_limiter, archive=replayer,
+                               scraper_pool=offline_pool)
+        replayed_missing = EPERHandler('404', cache=False, rate_limiter=offline_limiter, archive=replayer,
+                                       scraper_pool=offline_pool)
+        replayer.close()
+        self.assertEqual(replayed.data, recorded.data)
+        self.assertEqual(replayed_missing.data, missing.data)
+        self.assertEqual(replayed['price'], '45.60')
+        offline_pool.session.assert_not_called()
+        offline_limiter.acquire.assert_not_called()
+
+    def test_archive_is_keyed_by_requested_url(self):
+        archive = HTTPArchive(self.path, mode=RECORD)
+        url = EPER_PART_URL.format(part_number='222')
+        archive.record(url, make_response('https://eper.fiatforum.com/redirected', 200, PAGES['222']))
+        archive.mode = REPLAY
+        handler = EPERHandler('222', cache=False, rate_limiter=MagicMock(), archive=archive, scraper_pool=MagicMock())
+        archive.close()
+        self.assertEqual(handler['title'], 'BREMSSCHEIBE NEU, 1234 OEM 222')
+
+    @patch('ebay_lister_fiat_item.scrape_open_eper.get_default_cache')
+    def test_replay_does_not_write_to_the_default_cache(self, mock_get_default_cache):
+        archive = HTTPArchive(self.path, mode=RECORD)
+        archive.record(EPER_PART_URL.format(part_number='222'),
+                       make_response(EPER_PART_URL.format(part_number='222'), 200, PAGES['222']))
+        archive.mode = REPLAY
+        handler = EPERHandler('222', rate_limiter=MagicMock(), archive=archive, scraper_pool=MagicMock())
+        unrecorded = EPERHandler('333', rate_limiter=MagicMock(), archive=archive, scraper_pool=MagicMock())
+        archive.close()
+        mock_get_default_cache.assert_not_called()
+        self.assertIs(handler.cache, get_replay_cache())
+        self.assertEqual(handler['title'], 'BREMSSCHEIBE NEU, 1234 OEM 222')
+        self.assertIsNone(get_replay_cache().get_failure('333')) # Missing from the archive is no ePER failure
+        self.assertEqual(unrecorded['title'], 'OEM 333')
+
+
+if __name__ == '__main__':
+    unittest.main()
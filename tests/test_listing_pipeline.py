@@ -0,0 +1,115 @@
+# ebay_lister_fiat_item_project/tests/test_listing_pipeline.py
+
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from ebay_lister_fiat_item.listing_pipeline import (
+    ListingPipeline, PipelineStage, StagedPipeline, draft_arguments
+)
+
+
+def _slow(seconds, func=lambda value: value):
+    def run(value):
+        time.sleep(seconds)
+        return func(value)
+    return run
+
+
+class TestStagedPipeline(unittest.TestCase):
+
+    def test_results_are_ordered_and_errors_isolated(self):
+        def fail_on_three(value):
+            time.sleep(0.01 * (10 - value)) # Later items finish first
+            if value == 3:
+                raise ValueError("bad part")
+            return value * 10
+        pipeline = StagedPipeline([PipelineStage('first', fail_on_three, workers=4),
+                                   PipelineStage('second', lambda value: value + 1, workers=2)])
+        results = list(pipeline.run(range(10)))
+        self.assertEqual([result.index for result in results], list(range(10)))
+        self.assertEqual(results[3].stage, 'first')
+        self.assertIsInstance(results[3].error, ValueError)
+        self.assertEqual([result.value for result in results if result.ok], [1, 11, 21, 41, 51, 61, 71, 81, 91])
+        self.assertEqual(pipeline.stats['second']['items'], 9)
+
+    def test_stages_overlap(self):
+        stages = [PipelineStage(name, _slow(0.05)) for name in ('eper', 'category', 'submit')]
+        started = time.perf_counter()
+        self.assertEqual(len(list(StagedPipeline(stages).run(range(10)))), 10)
+        self.assertLess(time.perf_counter() - started, 0.05 * 30 * 0.6) # Far below the sum of all stages
+
+    def test_batch_stage_gets_lists(self):
+        calls = []
+
+        def submit(values):
+            calls.append(list(values))
+            return [ValueError("rejected") if value == 2 else f"ID{value}" for value in values]
+        pipeline = StagedPipeline([PipelineStage('submit', submit, batch_size=5, linger=0.2)])
+        results = list(pipeline.run(range(7)))
+        self.assertEqual(sorted(len(call) for call in calls), [2, 5])
+        self.assertEqual(results[4].value, 'ID4')
+        self.assertFalse(results[2].ok)
+
+    def test_backpressure_limits_items_read_ahead(self):
+        read = []
+
+        def items():
+            for n in range(100):
+                read.append(n)
+                yield n
+        pipeline = StagedPipeline([PipelineStage('slow', _slow(0.01))], max_in_flight=4)
+        for result in pipeline.run(items()):
+            self.assertLessEqual(len(read) - result.index, 5)
+
+    def test_leaving_early_stops_workers(self):
+        pipeline = StagedPipeline([PipelineStage('slow', _slow(0.01), workers=2)])
+        for result in pipeline.run(range(1000)):
+            if result.index == 3:
+                break
+        self.assertLess(pipeline.stats['slow']['items'], 100)
+
+
+class TestListingPipeline(unittest.TestCase):
+
+    ROW = {'part_number': '7796374', 'quantity': '1', 'condition_id': '1000', 'sku': 'SKU1',
+           'shipping_profile_id': 'S', 'payment_profile_id': 'P', 'return_profile_id': 'R',
+           'item_location': 'Syke', 'country_code': 'DE', 'currency_code': 'EUR', 'dispatch_time_max': '3',
+           'vat_percent': '19', 'picture_urls': 'http://a/1.jpg | http://a/2.jpg'}
+
+    def test_draft_arguments(self):
+        arguments = draft_arguments(self.ROW)
+        self.assertEqual(arguments['part_number_str'], '7796374')
+        self.assertEqual(arguments['quantity'], 1)
+        self.assertEqual(arguments['vat_percent'], 19.0)
+        self.assertEqual(arguments['picture_urls'], ['http://a/1.jpg', 'http://a/2.jpg'])
+        self.assertIsNone(arguments['title_override'])
+        with self.assertRaises(ValueError):
+            draft_arguments({'part_number': '1'})
+
+    @patch('ebay_lister_fiat_item.listing_pipeline.EPERHandler')
+    def test_rows_are_drafted_and_listed_in_batches(self, mock_eper_handler_cls):
+        ebay_handler = MagicMock()
+        ebay_handler.draft_item_payload.side_effect = lambda eper_handler, **arguments: {'Item': {'SKU': arguments['sku']}}
+        ebay_handler.create_items.side_effect = lambda payloads: {
+            payload['Item']['SKU']: {'sku': payload['Item']['SKU'], 'item_id': 'ID', 'ack': 'Success', 'errors': []}
+            for payload in payloads
+        }
+        rows = [dict(self.ROW, sku=f"SKU{n}") for n in range(7)] + [{'part_number': 'incomplete'}]
+        results = list(ListingPipeline(ebay_handler, submit_workers=1).run(rows))
+
+        self.assertEqual([result.value['sku'] for result in results[:7]], [f"SKU{n}" for n in range(7)])
+        self.assertEqual(results[7].stage, 'eper')
+        self.assertEqual(mock_eper_handler_cls.call_count, 7)
+        self.assertLessEqual(max(len(call.args[0]) for call in ebay_handler.create_items.call_args_list), 5)
+
+    @patch('ebay_lister_fiat_item.listing_pipeline.EPERHandler')
+    def test_dry_run_yields_payloads(self, mock_eper_handler_cls):
+        ebay_handler = MagicMock()
+        ebay_handler.draft_item_payload.return_value = {'Item': {'SKU': 'SKU1'}}
+        results = list(ListingPipeline(ebay_handler, submit=False).run([self.ROW]))
+        self.assertEqual(results[0].value, {'Item': {'SKU': 'SKU1'}})
+        ebay_handler.create_items.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+# ebay_lister_fiat_item_project/tests/test_page_store.py
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from ebay_lister_fiat_item.eper_cache import EPERCache
+from ebay_lister_fiat_item.page_store import PageStore
+from ebay_lister_fiat_item.scraper_pool import ScraperPool
+from ebay_lister_fiat_item.scrape_open_eper import EPERHandler
+from .eper_pages import build_eper_page
+
+PAGES = {
+    '111': build_eper_page(description='BREMSSCHEIBE', price=None, drawings=['FIAT PUNTO (188)'],
+                           previous=['100'], replacements=['222']),
+    '222': build_eper_page(description='BREMSSCHEIBE NEU', price='45,60 EUR', drawings=['LANCIA Y (840)']),
+    '100': build_eper_page(drawings=['FIAT PANDA (169)']),
+    '555': build_eper_page(description='LAGER', replacements=['222']),
+}
+
+
+class TestPageStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'pages.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip_and_deduplication(self):
+        store = PageStore(self.path)
+        first = store.put('111', PAGES['111'])
+        size_after_first = store.total_bytes
+        self.assertEqual(store.put('112', PAGES['111']), first)
+        self.assertEqual(store.total_bytes, size_after_first)
+        self.assertLess(size_after_first, len(PAGES['111']))
+        self.assertEqual(store.get('112'), PAGES['111'])
+        self.assertIsNone(store.get('999'))
+        self.assertEqual(store.part_numbers(), ['111', '112'])
+        store.close()
+
+    def test_replaced_page_frees_its_old_body(self):
+        store = PageStore(self.path)
+        store.put('111', PAGES['111'])
+        store.put('111', PAGES['222'])
+        self.assertEqual(store.get('111'), PAGES['222'])
+        store.put('222', PAGES['222'])
+        single = PageStore(os.path.join(self.tmp_dir, 'single.sqlite3'))
+        single.put('222', PAGES['222'])
+        self.assertEqual(store.total_bytes, single.total_bytes)
+        store.close()
+        single.close()
+
+    def test_least_recently_used_pages_are_evicted(self):
+        probe = PageStore(os.path.join(self.tmp_dir, 'probe.sqlite3'))
+        probe.put('x', PAGES['111'])
+        budget = int(probe.total_bytes * 2.5)
+        probe.close()
+        store = PageStore(self.path, max_bytes=budget)
+        store.put('a', PAGES['111'] + 'a')
+        store.put('b', PAGES['111'] + 'b')
+        store.get('a') # 'b' is now the least recently used page
+        store.put('c', PAGES['111'] + 'c')
+        self.assertLessEqual(store.total_bytes, budget)
+        self.assertIsNone(store.get('b'))
+        self.assertIsNotNone(store.get('a'))
+        self.assertIsNotNone(store.get('c'))
+        store.close()
+
+
+class TestReextractFromStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = EPERCache(os.path.join(self.tmp_dir, 'cache.sqlite3'))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    @staticmethod
+    def fake_get(url):
+        part_number = url.rsplit('=', 1)[1]
+        response = MagicMock()
+        response.text = PAGES.get(part_number, "")
+        return response
+
+    def scrape(self, part_number):
+        session = MagicMock()
+        session.get.side_effect = self.fake_get
+        return EPERHandler(part_number, cache=self.cache, rate_limiter=MagicMock(),
+                           scraper_pool=ScraperPool(factory=lambda: session))
+
+    def test_fetched_pages_are_stored(self):
+        self.scrape('111')
+        self.assertEqual(self.cache.page_store.part_numbers(), ['111', '222'])
+        self.assertEqual(self.cache.page_store.get('222'), PAGES['222'])
+
+    def test_reextract_rebuilds_records_without_network(self):
+        scraped = {num: self.scrape(num).data for num in ('111', '555')}
+        self.cache.invalidate()
+        self.cache.graph.invalidate()
+
+        original_match = EPERHandler._match_fitting_cars
+        def renamed_match(handler, texts):
+            return [car.replace('PUNTO', 'PUNTO NEU') for car in original_match(handler, texts)]
+
+        with patch.object(EPERHandler, '_fetch_soup') as mock_fetch, \
+             patch.object(EPERHandler, '_match_fitting_cars', renamed_match):
+            rebuilt = EPERHandler.reextract_from_store(cache=self.cache, max_processes=1)
+        mock_fetch.assert_not_called()
+        self.assertEqual(set(rebuilt), {'111', '222', '555'})
+        self.assertEqual(rebuilt['555'], scraped['555'])
+        self.assertEqual(scraped['111']['fitting_cars'], ['FIAT PUNTO', 'LANCIA Y'])
+        self.assertEqual(rebuilt['111']['fitting_cars'], ['FIAT PUNTO NEU', 'LANCIA Y'])
+        self.assertEqual(self.cache.get_part('111'), rebuilt['111'].to_cache_fields())
+        self.assertEqual(self.cache.graph.replacements('111'), ['222'])
+
+    def test_reextract_in_worker_processes_matches_in_process(self):
+        for num in PAGES:
+            self.cache.page_store.put(num, PAGES[num])
+        in_process = EPERHandler.reextract_from_store(cache=False, page_store=self.cache.page_store, max_processes=1)
+        parallel = EPERHandler.reextract_from_store(cache=self.cache, max_processes=2)
+        self.assertEqual(parallel, in_process)
+        self.assertEqual(parallel['111']['eper_price_str'], '45.60')
+
+    def test_reextract_keeps_the_age_of_old_pages(self):
+        fetched_at = time.time() - 20 * 24 * 3600
+        for num in PAGES:
+            self.cache.page_store.put(num, PAGES[num], fetched_at=fetched_at)
+        rebuilt = EPERHandler.reextract_from_store(cache=self.cache, part_numbers=['111'], max_processes=1)
+        self.assertEqual(rebuilt['111']['eper_price_str'], '45.60')
+        self.assertIsNone(self.cache.get_page('111', fields=['eper_price_str']))
+        self.assertIsNone(self.cache.get_part('111', fields=['eper_price_str']))
+        self.assertEqual(self.cache.get_part('111', fields=['fitting_cars']),
+                         {'fitting_cars': ['FIAT PUNTO', 'LANCIA Y']})
+
+    def test_subset_reads_replacement_pages_on_demand(self):
+        for num in PAGES:
+            self.cache.page_store.put(num, PAGES[num])
+        rebuilt = EPERHandler.reextract_from_store(cache=self.cache, part_numbers=['555'], max_processes=2)
+        self.assertEqual(list(rebuilt), ['555'])
+        self.assertEqual(rebuilt['555']['fitting_cars'], ['LANCIA Y'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# ebay_lister_fiat_item_project/tests/test_part_record.py
+
+import pickle
+import unittest
+from ebay_lister_fiat_item.part_record import PartRecord, LEGACY_KEYS
+
+
+class TestPartRecord(unittest.TestCase):
+
+    def setUp(self):
+        self.record = PartRecord.from_strings(
+            '111', '12.30', '0.5', ['FIAT PUNTO', 'LANCIA Y', 'FIAT PANDA', 'FIAT UNO'],
+            ['111', '100', '200', '201'], 'BREMSSCHEIBE OEM 111 FIAT PUNTO LANCIA Y', 'BREMSSCHEIBE'
+        )
+
+    def test_typed_fields(self):
+        self.assertEqual(self.record.price, 12.3)
+        self.assertEqual(self.record.weight_kg, 0.5)
+        self.assertEqual(self.record.fitting_cars, ('FIAT PUNTO', 'LANCIA Y', 'FIAT PANDA', 'FIAT UNO'))
+        self.assertFalse(hasattr(self.record, '__dict__'))
+
+    def test_legacy_mapping(self):
+        self.assertEqual(list(self.record), list(LEGACY_KEYS))
+        self.assertEqual(self.record['eper_price_str'], '12.30')
+        self.assertEqual(self.record['weight_kg'], '0.5')
+        self.assertEqual(self.record['comparison_numbers'], ['111', '100', '200', '201'])
+        self.assertIn('title', self.record)
+        self.assertIsNone(self.record.get('price'))
+        self.assertEqual(self.record, self.record.to_dict())
+
+    def test_price_string_is_kept_as_extracted(self):
+        record = PartRecord.from_strings('111', '12.5', '0', [], ['111'], 'OEM 111', '')
+        self.assertEqual(record.price, 12.5)
+        self.assertEqual(record['eper_price_str'], '12.5')
+        self.assertEqual(PartRecord.from_cache_fields(record.to_cache_fields())['eper_price_str'], '12.5')
+        self.assertEqual(PartRecord('111', price=12.5)['eper_price_str'], '12.50')
+
+    def test_summary_is_rendered(self):
+        self.assertEqual(self.record['title_base_description'], "\n".join([
+            "Bezeichnung (ePER): BREMSSCHEIBE",
+            "Teilenummer (Anfrage): 111",
+            "Preis (EUR): 12.30",
+            "Gewicht: 0.5 kg",
+            "Passende Fahrzeuge: 4 Modell(e) (z.B. FIAT PUNTO, LANCIA Y, FIAT PANDA...)",
+            "Vergleichs-/Ersatznummern: 4 Nummer(n) gefunden (inkl. 100, 200, 201...)",
+        ]))
+
+    def test_summary_without_ePER_data(self):
+        record = PartRecord.from_strings('999', None, '0', [], ['999'], 'OEM 999', description=None)
+        self.assertIsNone(record.weight_kg)
+        self.assertEqual(record['weight_kg'], '0')
+        self.assertEqual(record.title_base_description.splitlines()[0], "Bezeichnung: OEM 999")
+        self.assertEqual(record.title_base_description.splitlines()[-1], "Vergleichsnummern: 1 (nur angefragte Nummer)")
+
+    def test_cache_fields_round_trip(self):
+        fields = self.record.to_cache_fields()
+        self.assertNotIn('title_base_description', fields)
+        self.assertEqual(PartRecord.from_cache_fields(fields), self.record)
+        self.assertEqual(pickle.loads(pickle.dumps(self.record)), self.record)
+
+
+if __name__ == '__main__':
+    unittest.main()
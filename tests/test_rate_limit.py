@@ -0,0 +1,81 @@
+# ebay_lister_fiat_item_project/tests/test_rate_limit.py
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from ebay_lister_fiat_item.rate_limit import TokenBucketLimiter, FileTokenBucketLimiter, create_limiter
+
+
+def _reserve_from_file(path, count, queue):
+    limiter = FileTokenBucketLimiter(path, rate=1.0, burst=2)
+    queue.put([limiter.reserve() for _ in range(count)])
+
+
+class TestTokenBucketLimiter(unittest.TestCase):
+
+    def test_burst_is_free_then_rate_applies(self):
+        limiter = TokenBucketLimiter(rate=10.0, burst=3)
+        waits = [limiter.reserve() for _ in range(5)]
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.1, places=2)
+        self.assertAlmostEqual(waits[4], 0.2, places=2) # Reservations queue up behind each other
+
+    def test_tokens_refill_while_idle(self):
+        limiter = TokenBucketLimiter(rate=100.0, burst=1)
+        limiter.reserve()
+        time.sleep(0.05)
+        self.assertEqual(limiter.reserve(), 0.0)
+
+    @patch('ebay_lister_fiat_item.rate_limit.time.sleep')
+    def test_acquire_sleeps_wait_plus_jitter(self, mock_sleep):
+        limiter = TokenBucketLimiter(rate=1.0, burst=1, jitter=0.5)
+        with patch('ebay_lister_fiat_item.rate_limit.random.uniform', return_value=0.25):
+            limiter.acquire()
+            limiter.acquire()
+        self.assertAlmostEqual(mock_sleep.call_args_list[0].args[0], 0.25, places=2)
+        self.assertAlmostEqual(mock_sleep.call_args_list[1].args[0], 1.25, places=2)
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            TokenBucketLimiter(rate=0)
+
+
+class TestFileTokenBucketLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'eper.ratelimit')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_create_limiter_uses_file_backend(self):
+        self.assertIsInstance(create_limiter(lock_path=self.path), FileTokenBucketLimiter)
+        self.assertNotIsInstance(create_limiter(), FileTokenBucketLimiter)
+
+    def test_budget_is_shared_between_instances(self):
+        first = FileTokenBucketLimiter(self.path, rate=1.0, burst=2)
+        second = FileTokenBucketLimiter(self.path, rate=1.0, burst=2)
+        self.assertEqual(first.reserve(), 0.0)
+        self.assertEqual(second.reserve(), 0.0)
+        self.assertGreater(first.reserve(), 0.9)
+
+    def test_budget_is_shared_between_processes(self):
+        queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_reserve_from_file, args=(self.path, 2, queue)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        waits = sorted(queue.get(timeout=10) + queue.get(timeout=10))
+        for worker in workers:
+            worker.join()
+        self.assertEqual(waits[:2], [0.0, 0.0]) # Only the burst of 2 is free in total
+        self.assertGreater(waits[2], 0.5)
+        self.assertGreater(waits[3], waits[2] + 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
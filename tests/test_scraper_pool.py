@@ -0,0 +1,93 @@
+# ebay_lister_fiat_item_project/tests/test_scraper_pool.py
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+import requests
+from ebay_lister_fiat_item.scraper_pool import ScraperPool
+from ebay_lister_fiat_item.scrape_open_eper import EPERHandler
+from .eper_pages import build_eper_page
+
+
+class TestScraperPool(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = MagicMock(side_effect=lambda: MagicMock())
+
+    def test_sessions_are_reused(self):
+        pool = ScraperPool(max_size=2, factory=self.factory)
+        with pool.session() as first:
+            pass
+        with pool.session() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(self.factory.call_count, 1)
+
+    def test_pool_never_exceeds_max_size(self):
+        pool = ScraperPool(max_size=1, factory=self.factory)
+        session = pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+        borrowed = []
+        waiter = threading.Thread(target=lambda: borrowed.append(pool.acquire(timeout=2)))
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(session)
+        waiter.join()
+        self.assertEqual(borrowed, [session])
+        self.assertEqual(pool.size, 1)
+
+    def test_idle_sessions_are_evicted(self):
+        pool = ScraperPool(max_size=2, idle_timeout=0, factory=self.factory)
+        with pool.session() as first:
+            pass
+        time.sleep(0.01)
+        with pool.session() as second:
+            pass
+        self.assertIsNot(first, second)
+        first.close.assert_called_once()
+
+    def test_failing_session_is_discarded(self):
+        pool = ScraperPool(max_size=1, factory=self.factory)
+        with self.assertRaises(RuntimeError):
+            with pool.session() as broken:
+                raise RuntimeError("connection reset")
+        broken.close.assert_called_once()
+        self.assertEqual(pool.size, 0)
+        with pool.session() as replacement:
+            self.assertIsNot(replacement, broken)
+
+    def test_session_is_kept_on_not_found_but_discarded_when_throttled(self):
+        pool = ScraperPool(max_size=1, factory=self.factory)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            with pool.session() as first:
+                raise requests.exceptions.HTTPError("404 Not Found", response=MagicMock(status_code=404))
+        first.close.assert_not_called()
+        with self.assertRaises(requests.exceptions.HTTPError):
+            with pool.session() as second:
+                raise requests.exceptions.HTTPError("429 Too Many Requests", response=MagicMock(status_code=429))
+        self.assertIs(second, first)
+        second.close.assert_called_once()
+        self.assertEqual(pool.size, 0)
+
+
+class TestEPERHandlerUsesPool(unittest.TestCase):
+
+    def test_fetch_borrows_from_pool(self):
+        session = MagicMock()
+        session.get.return_value.text = build_eper_page()
+        factory = MagicMock(return_value=session)
+        pool = ScraperPool(max_size=1, factory=factory)
+
+        handler = EPERHandler('111', use_cache=False, cache=False, scraper_pool=pool, rate_limiter=MagicMock())
+        handler._fetch_soup('222')
+
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual(session.get.call_count, 2)
+        self.assertEqual(handler['price'], '12.34')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# ebay_lister_fiat_item_project/tests/test_single_flight.py
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from bs4 import BeautifulSoup
+from ebay_lister_fiat_item.single_flight import SingleFlight
+from ebay_lister_fiat_item.scrape_open_eper import EPERHandler, PAGE_LOADS, normalize_part_number
+from .eper_pages import build_eper_page
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_execution(self):
+        flights = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def slow_fetch(value):
+            calls.append(value)
+            release.wait(5)
+            return value * 2
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(flights.do, 'key', slow_fetch, 21) for _ in range(5)]
+            while flights.in_flight() == 0:
+                time.sleep(0.01)
+            time.sleep(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(calls, [21])
+        self.assertEqual(flights.in_flight(), 0)
+        self.assertEqual(flights.do('key', lambda: 'again'), 'again')
+
+    def test_exception_is_shared_and_key_released(self):
+        flights = SingleFlight()
+        with self.assertRaises(ValueError):
+            flights.do('key', int, 'no number')
+        self.assertEqual(flights.in_flight(), 0)
+
+    def test_normalize_part_number(self):
+        self.assertEqual(normalize_part_number(' 46 5 1234 '), '4651234')
+        self.assertEqual(normalize_part_number('ab12'), 'AB12')
+        self.assertEqual(normalize_part_number(4651234), '4651234')
+
+
+class TestEPERHandlerCoalescing(unittest.TestCase):
+
+    def test_concurrent_handlers_fetch_each_page_once(self):
+        pages = {
+            '111': build_eper_page(price=None, replacements=['222']),
+            '222': build_eper_page(price='45,60 EUR'),
+        }
+        fetched = []
+
+        def slow_fetch(part_number):
+            fetched.append(part_number)
+            time.sleep(0.2 if part_number == '111' else 0.5) # 222 is still in flight when 111 needs it
+            return BeautifulSoup(pages[part_number], 'html.parser')
+
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=slow_fetch):
+            handlers = [EPERHandler(number, cache=False, lazy=True) for number in ('111', '111 ', '222')]
+            results = [handler.data for handler in handlers]
+        self.assertEqual(sorted(fetched), ['111', '222'])
+        self.assertEqual(results[1]['eper_price_str'], '45.60')
+        self.assertEqual(results[0]['eper_price_str'], '45.60')
+        self.assertEqual(results[2]['eper_price_str'], '45.60')
+        self.assertEqual(PAGE_LOADS.in_flight(), 0)
+
+    def test_handlers_with_other_cache_settings_do_not_share_a_load(self):
+        fetched = []
+
+        def slow_fetch(part_number):
+            fetched.append(part_number)
+            time.sleep(0.2)
+            return BeautifulSoup(build_eper_page(), 'html.parser')
+
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=slow_fetch):
+            handlers = [EPERHandler('111', cache=False, lazy=True),
+                        EPERHandler('111', cache=False, use_cache=False, lazy=True)]
+            for handler in handlers:
+                handler.data
+        self.assertEqual(fetched, ['111', '111'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# ebay_lister_fiat_item_project/tests/test_supersession.py
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from bs4 import BeautifulSoup
+from ebay_lister_fiat_item.eper_cache import EPERCache, PAGE_SCOPE, PART_SCOPE
+from ebay_lister_fiat_item.scrape_open_eper import EPERHandler
+from ebay_lister_fiat_item.supersession import SupersessionGraph, DEFAULT_EDGE_TTL
+from .eper_pages import build_eper_page
+
+
+class TestSupersessionGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.graph = SupersessionGraph(os.path.join(self.tmp_dir, 'graph.sqlite3'))
+
+    def tearDown(self):
+        self.graph.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_edges_roundtrip(self):
+        self.graph.record('111', replacements=['222', '333'], previous=['100'])
+        self.graph.record('444')
+        self.assertEqual(self.graph.replacements('111'), ['222', '333'])
+        self.assertEqual(self.graph.previous('111'), ['100'])
+        self.assertEqual(self.graph.replacements('444'), [])
+        self.assertIsNone(self.graph.replacements('999'))
+
+    def test_record_replaces_old_edges(self):
+        self.graph.record('111', replacements=['222', '333'])
+        self.graph.record('111', replacements=['555'])
+        self.assertEqual(self.graph.replacements('111'), ['555'])
+
+    def test_expand_reports_unresolved_and_stale_parts(self):
+        self.graph.record('111', replacements=['222', '333'])
+        self.graph.record('222', replacements=['444', '111'])
+        self.graph.record('333', replacements=['444'], fetched_at=time.time() - 2 * DEFAULT_EDGE_TTL)
+        chain, unresolved = self.graph.expand('111')
+        self.assertEqual(chain, ['222', '333', '444'])
+        self.assertEqual(unresolved, ['333', '444'])
+
+    def test_invalidate(self):
+        self.graph.record('111', replacements=['222'])
+        self.graph.record('222')
+        self.assertEqual(self.graph.invalidate('111'), 1)
+        self.assertIsNone(self.graph.replacements('111'))
+        self.assertEqual(self.graph.invalidate(), 1)
+
+
+class TestEPERHandlerSupersessionGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = EPERCache(os.path.join(self.tmp_dir, 'cache.sqlite3'))
+        # 111 -> 222 -> 333 -> 444 -> 555: one HTTP round trip per level without the graph
+        self.pages = {
+            '111': build_eper_page(description='BREMSSCHEIBE', price=None, replacements=['222']),
+            '222': build_eper_page(price=None, drawings=['FIAT PUNTO (188)'], replacements=['333']),
+            '333': build_eper_page(price=None, replacements=['444']),
+            '444': build_eper_page(price=None, drawings=['LANCIA Y (840)'], replacements=['555']),
+            '555': build_eper_page(price='45,60 EUR'),
+        }
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def fake_fetch(self, part_number):
+        html = self.pages.get(part_number)
+        return BeautifulSoup(html, 'html.parser') if html else None
+
+    def lookup(self, part_number, **options):
+        with patch.object(EPERHandler, '_fetch_soup', side_effect=self.fake_fetch) as mock_fetch, \
+             patch.object(EPERHandler, '_get_pages', autospec=True, side_effect=EPERHandler._get_pages) as mock_pages:
+            handler = EPERHandler(part_number, cache=self.cache, **options)
+        return handler, mock_fetch.call_count, mock_pages.call_count
+
+    def test_first_lookup_records_the_graph(self):
+        self.lookup('111')
+        self.assertEqual(self.cache.graph.expand('111'), (['222', '333', '444', '555'], []))
+        self.assertEqual(self.cache.graph.replacements('555'), [])
+
+    def test_known_chain_is_loaded_in_one_round_trip(self):
+        first, _, first_rounds = self.lookup('111')
+        self.assertEqual(first_rounds, 5)
+        # Prices went stale: pages must be fetched again, but the chain is known locally
+        self.cache.invalidate(scope=PART_SCOPE)
+        self.cache.invalidate(scope=PAGE_SCOPE, fields=['eper_price_str'])
+        second, fetches, rounds = self.lookup('111')
+        self.assertEqual(fetches, 5)
+        self.assertEqual(rounds, 2) # Primary page, then the whole chain at once
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['price'], '45.60')
+
+    def test_changed_chain_fetches_missing_edges(self):
+        first, _, _ = self.lookup('111')
+        self.cache.invalidate(scope=PART_SCOPE)
+        self.cache.invalidate('444', scope=PAGE_SCOPE)
+        self.cache.invalidate('555', scope=PAGE_SCOPE)
+        self.cache.graph.invalidate('555')
+        self.pages['555'] = build_eper_page(price='45,60 EUR', replacements=['666'])
+        self.pages['666'] = build_eper_page(drawings=['FIAT PANDA (169)'])
+        second, fetches, rounds = self.lookup('111')
+        self.assertEqual(fetches, 3) # 444, 555 and the newly discovered 666
+        self.assertEqual(rounds, 3)
+        self.assertIn('666', second['comparison_numbers'])
+        self.assertIn('FIAT PANDA', second['fitting_cars'])
+
+    def test_graph_can_be_disabled(self):
+        self.lookup('111', graph=False)
+        self.assertIsNone(self.cache.graph.replacements('111'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+# ebay_lister_fiat_item_project/tests/test_throttle.py
+
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from ebay_lister_fiat_item.throttle import AdaptiveThrottle, CLOSED, OPEN, HALF_OPEN, retry_after_seconds
+from ebay_lister_fiat_item.scraper_pool import ScraperPool
+from ebay_lister_fiat_item.scrape_open_eper import EPERHandler
+from .eper_pages import build_eper_page
+
+
+def _response(status_code, text="", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = text.encode('utf-8')
+    response.encoding = 'utf-8'
+    response.headers.update(headers or {})
+    return response
+
+
+class TestAdaptiveThrottle(unittest.TestCase):
+
+    def test_limit_grows_additively_and_shrinks_multiplicatively(self):
+        throttle = AdaptiveThrottle(initial_limit=4, max_limit=8)
+        for _ in range(5): # About one step per 'limit' successes
+            throttle.record_success()
+        self.assertEqual(throttle.limit, 5)
+        throttle.record_throttle()
+        self.assertEqual(throttle.limit, 2)
+        throttle.record_throttle() # Same burst of rejections: no second cut
+        self.assertEqual(throttle.limit, 2)
+
+    def test_slots_are_bounded_by_limit(self):
+        throttle = AdaptiveThrottle(initial_limit=2)
+        self.assertTrue(throttle.try_acquire())
+        self.assertTrue(throttle.try_acquire())
+        self.assertFalse(throttle.try_acquire())
+        throttle.release()
+        self.assertTrue(throttle.try_acquire())
+
+    def test_breaker_opens_and_recovers_through_half_open(self):
+        throttle = AdaptiveThrottle(failure_threshold=2, reset_timeout=0.05)
+        throttle.record_throttle()
+        self.assertEqual(throttle.state, CLOSED)
+        throttle.record_throttle()
+        self.assertEqual(throttle.state, OPEN)
+        self.assertFalse(throttle.try_acquire())
+
+        time.sleep(0.06)
+        self.assertEqual(throttle.state, HALF_OPEN)
+        self.assertTrue(throttle.try_acquire())
+        self.assertFalse(throttle.try_acquire()) # Only one trial request
+        throttle.record_success()
+        throttle.release()
+        self.assertEqual(throttle.state, CLOSED)
+        self.assertEqual(throttle.stats()['trips'], 1)
+
+    def test_failed_trial_doubles_timeout(self):
+        throttle = AdaptiveThrottle(failure_threshold=1, reset_timeout=0.05)
+        throttle.record_throttle()
+        time.sleep(0.06)
+        self.assertEqual(throttle.state, HALF_OPEN)
+        throttle.record_throttle()
+        self.assertEqual(throttle.state, OPEN)
+        self.assertGreater(throttle.breaker_delay(), 0.05)
+
+    def test_retry_after_opens_breaker(self):
+        throttle = AdaptiveThrottle(reset_timeout=0.01)
+        throttle.record_throttle(retry_after=5)
+        self.assertEqual(throttle.state, OPEN)
+        self.assertGreater(throttle.breaker_delay(), 4)
+
+    def test_retry_after_header(self):
+        self.assertEqual(retry_after_seconds(_response(429, headers={'Retry-After': '7'})), 7.0)
+        self.assertIsNone(retry_after_seconds(_response(429)))
+        self.assertIsNone(retry_after_seconds(_response(429, headers={'Retry-After': 'soon'})))
+
+    def test_retry_delay_backs_off_exponentially_or_honours_retry_after(self):
+        throttle = AdaptiveThrottle(retry_backoff=0.5)
+        self.assertEqual([throttle.retry_delay(attempt) for attempt in range(3)], [0.5, 1.0, 2.0])
+        self.assertEqual(throttle.retry_delay(0, retry_after=7), 7)
+        self.assertEqual(throttle.retry_delay(3, retry_after=1), 4.0)
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            AdaptiveThrottle(initial_limit=0)
+
+
+class TestEPERHandlerUsesThrottle(unittest.TestCase):
+
+    def _handler(self, responses, throttle):
+        session = MagicMock()
+        session.get.side_effect = responses
+        pool = ScraperPool(max_size=1, factory=MagicMock(return_value=session))
+        handler = EPERHandler.__new__(EPERHandler)
+        handler._configure(use_cache=False, cache=False, scraper_pool=pool, rate_limiter=MagicMock(),
+                           archive=False, page_store=False, throttle=throttle)
+        return handler, session
+
+    @patch('ebay_lister_fiat_item.scrape_open_eper.time.sleep')
+    def test_throttled_request_is_retried(self, mock_sleep):
+        throttle = AdaptiveThrottle(initial_limit=4, reset_timeout=0, retry_backoff=0.5)
+        handler, session = self._handler([_response(429), _response(503), _response(200, build_eper_page())], throttle)
+        self.assertIsNotNone(handler._fetch_soup('111'))
+        self.assertEqual(session.get.call_count, 3)
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [0.5, 1.0])
+        self.assertEqual(throttle.stats()['throttles'], 2)
+        self.assertEqual(throttle.stats()['in_flight'], 0)
+
+    @patch('ebay_lister_fiat_item.scrape_open_eper.time.sleep')
+    def test_retry_waits_for_retry_after(self, mock_sleep):
+        throttle = AdaptiveThrottle(reset_timeout=0, retry_backoff=0.5)
+        handler, session = self._handler([_response(429, headers={'Retry-After': '0'}),
+                                          _response(429, headers={'Retry-After': '4'}),
+                                          _response(200, build_eper_page())], throttle)
+        with patch.object(throttle, 'acquire'): # The breaker opened by Retry-After is not under test here
+            self.assertIsNotNone(handler._fetch_soup('111'))
+        mock_sleep.assert_any_call(4.0)
+
+    def test_not_found_is_not_a_throttle(self):
+        throttle = AdaptiveThrottle()
+        handler, session = self._handler([_response(404)], throttle)
+        self.assertIsNone(handler._fetch_soup('111'))
+        self.assertEqual(session.get.call_count, 1)
+        self.assertEqual(throttle.stats()['throttles'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()